@@ -1,8 +1,8 @@
 from django.contrib import admin
 
-from .models import (Barter, MaterialBarter, PlantBarter, ProduceBarter,
-                     SeedBarter, ToolBarter)
+from .models import (Barter, MaterialBarter, PlantBarter, PostalCode,
+                     ProduceBarter, SeedBarter, ToolBarter)
 
 
 admin.site.register([Barter, MaterialBarter, PlantBarter, ProduceBarter,
-                     SeedBarter, ToolBarter])
\ No newline at end of file
+                     SeedBarter, ToolBarter, PostalCode])
\ No newline at end of file
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class BartersAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'barters_app'
+
+    def ready(self):
+        from . import signals
@@ -0,0 +1,85 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from barters_app.models import BARTER_TYPE_CHOICES
+from common.conditional import get_not_modified_response
+
+BARTER_TYPES = [barter_type for barter_type, label in BARTER_TYPE_CHOICES]
+
+# listings nest each barter's creator, so user edits have a version of their own
+CREATOR_VERSION = 'creators'
+
+# cached along with the data so cache hits still answer conditional requests
+VALIDATOR_HEADERS = ['ETag', 'Last-Modified']
+
+
+def get_version_key(barter_type):
+    return f'barters:version:{barter_type}'
+
+
+def get_versions(barter_types):
+    '''return the current cache version of each barter type's listings'''
+    keys = [get_version_key(barter_type) for barter_type in barter_types]
+    versions = cache.get_many(keys)
+
+    for key in keys:
+        if versions.get(key) is None:
+            # versions start from the clock so one lost to eviction never repeats an old one
+            cache.add(key, time.time_ns(), timeout=None)
+            versions[key] = cache.get(key)
+
+    return [versions[key] for key in keys]
+
+
+def bump_version(barter_type):
+    '''invalidate every cached response that includes barters of this type'''
+    key = get_version_key(barter_type)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_cache_key(request, barter_type, barter_id):
+    # a listing of all barters can contain every type
+    versions = get_versions(([barter_type] if barter_type else BARTER_TYPES) + [CREATOR_VERSION])
+    query = sorted(request.query_params.lists())
+    digest = hashlib.md5(f'{barter_type}|{barter_id}|{query}|{versions}'.encode()).hexdigest()
+    return f'barters:response:{digest}'
+
+
+def cache_anonymous_response(view):
+    '''
+    cache the data of successful responses to anonymous requests per url and query string.
+    The key includes the version of every barter type the response can contain,
+    so saving a seed barter only invalidates responses that could list seed barters.
+    '''
+    @wraps(view)
+    def wrapper(request, barter_type=None, barter_id=None):
+        if request.user.is_authenticated or (barter_type and barter_type not in BARTER_TYPES):
+            return view(request, barter_type=barter_type, barter_id=barter_id)
+
+        key = get_cache_key(request, barter_type, barter_id)
+        cached = cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            response = Response(data, headers=headers)
+            return get_not_modified_response(request, response) or response
+
+        response = view(request, barter_type=barter_type, barter_id=barter_id)
+        if response.status_code == status.HTTP_200_OK:
+            headers = {
+                header: response[header]
+                for header in VALIDATOR_HEADERS if response.has_header(header)
+            }
+            cache.set(key, (response.data, headers), timeout=settings.BARTER_CACHE_TIMEOUT)
+
+        return response
+
+    return wrapper
@@ -0,0 +1,54 @@
+from barters_app.constants import BARTER_CONFIG
+from barters_app.models import Barter
+from barters_app.serializers import BarterSerializer, get_values_serializer
+from common.renderers import CamelCaseJSONRenderer
+
+# rows fetched from the database cursor at a time, memory use is bounded by this and not the table size
+EXPORT_CHUNK_SIZE = 1000
+
+
+class JSONLinesRenderer(CamelCaseJSONRenderer):
+    '''
+    Lets DRF negotiate the export's JSON Lines format, from ?format=jsonl or
+    Accept: application/x-ndjson. Exports stream their own content, only
+    error responses are rendered here, as a single line.
+    '''
+    media_type = 'application/x-ndjson'
+    format = 'jsonl'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return super().render(data, accepted_media_type, renderer_context) + b'\n'
+
+
+def get_export_queryset(barter_type=None):
+    '''active barters of one type, or of every type, oldest first so an export is stable'''
+    if barter_type:
+        barters = BARTER_CONFIG[barter_type]['model'].objects.active()
+    else:
+        barters = Barter.objects.active()
+    return barters.order_by('id')
+
+
+def export_barters(barter_type=None, export_format='json', chunk_size=EXPORT_CHUNK_SIZE):
+    '''
+    yield every active barter as bytes, shaped like the retrieve endpoint's rows,
+    either as the pieces of one JSON array or as JSON Lines, one barter per line.
+
+    Rows are read with iterator(), which skips the queryset's result cache,
+    and each is rendered as soon as it is read, so only one chunk is ever held in memory.
+    '''
+    serializer_class = BARTER_CONFIG[barter_type]['serializer'] if barter_type else BarterSerializer
+    values_serializer = get_values_serializer(serializer_class)
+    barters = values_serializer.get_values(get_export_queryset(barter_type), 'id')
+    renderer = CamelCaseJSONRenderer()
+
+    if export_format == 'jsonl':
+        for row in barters.iterator(chunk_size=chunk_size):
+            yield renderer.render(values_serializer.to_representation(row)) + b'\n'
+        return
+
+    separator = b'['
+    for row in barters.iterator(chunk_size=chunk_size):
+        yield separator + renderer.render(values_serializer.to_representation(row))
+        separator = b','
+    yield b'[]' if separator == b'[' else b']'
@@ -0,0 +1,93 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.utils import timezone
+
+from barters_app.models import Barter
+
+# query params handled by retrieve itself rather than as field filters
+RESERVED_PARAMS = ['cursor', 'page_size', 'near', 'radius_km', 'q', 'active', 'format']
+
+DATE_LOOKUPS = ['gt', 'gte', 'lt', 'lte']
+
+# field name: lookups allowed on it.
+# Only plain comparisons are offered, so every filter stays a sargable
+# predicate on the bare column (no LIKE, LOWER() or casts).
+# Each field has an index over listed barters in Barter.Meta.indexes; add one with any new field.
+BARTER_FILTERS = {
+    'barter_type': ['exact', 'in'],
+    'creator': ['exact', 'in'],
+    'is_free': ['exact'],
+    'quantity_units': ['exact', 'in'],
+    'postal_code': ['exact', 'in'],
+    'date_created': DATE_LOOKUPS,
+    'date_updated': DATE_LOOKUPS,
+    'date_expires': DATE_LOOKUPS,
+    'genus': ['exact'],
+    'species': ['exact'],
+    'common_name': ['exact'],
+}
+
+
+def parse_filter_value(field, value):
+    '''convert a query param string into a value for the model field, or raise ValueError'''
+    if field.choices:
+        # accept the stored code or the label shown by the serializer, e.g. 'OZ' or 'ounce'
+        choices = {label: code for code, label in field.choices}
+        choices.update({code: code for code in choices.values()})
+        if value not in choices:
+            raise ValueError(
+                f"Invalid '{field.name}' value '{value}'. "
+                f"Choices are {', '.join(code for code, label in field.choices)}."
+            )
+        return choices[value]
+
+    if isinstance(field, models.BooleanField):
+        # query strings from the frontend carry JSON style booleans
+        value = {'true': True, 'false': False}.get(value, value)
+
+    try:
+        value = field.to_python(value)
+    except ValidationError:
+        raise ValueError(f"Invalid '{field.name}' value '{value}'.")
+
+    if isinstance(field, models.DateTimeField) and timezone.is_naive(value):
+        value = timezone.make_aware(value)
+
+    return value
+
+
+def get_filter_names():
+    return [
+        name if lookup == 'exact' else f'{name}__{lookup}'
+        for name, lookups in BARTER_FILTERS.items() for lookup in lookups
+    ]
+
+
+def filter_barters(queryset, query_params):
+    '''
+    apply whitelisted field filters from the query params to a barter queryset.
+    Params look like ORM lookups: 'is_free=true', 'quantity_units__in=PK,OZ',
+    'date_created__gte=2022-08-01'. Anything not in BARTER_FILTERS raises ValueError.
+    '''
+    filters = {}
+    for param, values in query_params.lists():
+        if param in RESERVED_PARAMS:
+            continue
+
+        field_name, _, lookup = param.partition('__')
+        lookup = lookup or 'exact'
+        if lookup not in BARTER_FILTERS.get(field_name, []):
+            raise ValueError(f"Invalid filter '{param}'. Filters are {', '.join(get_filter_names())}.")
+
+        field = Barter._meta.get_field(field_name)
+        if lookup == 'in':
+            value = [
+                parse_filter_value(field, item)
+                for value in values for item in value.split(',') if item
+            ]
+        else:
+            value = parse_filter_value(field, values[-1])
+
+        filters[f'{field.attname}__{lookup}'] = value
+
+    return queryset.filter(**filters)
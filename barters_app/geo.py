@@ -0,0 +1,142 @@
+import math
+
+from django.db.models import F, Q
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+
+EARTH_RADIUS_KM = 6371.0088
+
+# barters are bucketed into fixed cells of GRID_CELL_DEGREES x GRID_CELL_DEGREES
+# so a radius search can narrow down to a handful of indexed cells first
+GRID_CELL_DEGREES = 0.25
+GRID_ROWS = int(180 / GRID_CELL_DEGREES)
+GRID_COLUMNS = int(360 / GRID_CELL_DEGREES)
+
+DEFAULT_RADIUS_KM = 10
+MAX_RADIUS_KM = 100
+
+
+def get_grid_row(latitude):
+    return min(int((latitude + 90) // GRID_CELL_DEGREES), GRID_ROWS - 1)
+
+
+def get_grid_column(longitude):
+    return int(((longitude + 180) % 360) // GRID_CELL_DEGREES)
+
+
+def get_grid_cell(latitude, longitude):
+    '''return the id of the grid cell containing the coordinates, or None if either is missing'''
+    if latitude is None or longitude is None:
+        return None
+    return get_grid_row(latitude) * GRID_COLUMNS + get_grid_column(longitude)
+
+
+def get_bounding_box(latitude, longitude, radius_km):
+    '''
+    return (min_lat, max_lat, min_lon, max_lon) around a point.
+    Longitudes may run past +/-180 when the box crosses the antimeridian,
+    and are None when the box reaches a pole.
+    '''
+    angular_radius = radius_km / EARTH_RADIUS_KM
+    delta_lat = math.degrees(angular_radius)
+    min_lat, max_lat = latitude - delta_lat, latitude + delta_lat
+
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90), min(max_lat, 90), None, None
+
+    delta_lon = math.degrees(
+        math.asin(math.sin(angular_radius) / math.cos(math.radians(latitude)))
+    )
+    return min_lat, max_lat, longitude - delta_lon, longitude + delta_lon
+
+
+def get_grid_cells(min_lat, max_lat, min_lon, max_lon):
+    '''return the ids of every grid cell overlapping the bounding box'''
+    first_column = int((min_lon + 180) // GRID_CELL_DEGREES)
+    last_column = int((max_lon + 180) // GRID_CELL_DEGREES)
+    columns = {column % GRID_COLUMNS for column in range(first_column, last_column + 1)}
+
+    return [
+        row * GRID_COLUMNS + column
+        for row in range(get_grid_row(min_lat), get_grid_row(max_lat) + 1)
+        for column in sorted(columns)
+    ]
+
+
+def haversine_km(lat_1, lon_1, lat_2, lon_2):
+    '''great-circle distance between two points in kilometers'''
+    delta_lat = math.radians(lat_2 - lat_1)
+    delta_lon = math.radians(lon_2 - lon_1)
+    a = (
+        math.sin(delta_lat / 2) ** 2 +
+        math.cos(math.radians(lat_1)) * math.cos(math.radians(lat_2)) *
+        math.sin(delta_lon / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def get_distance_expression(latitude, longitude):
+    '''haversine distance in kilometers from a point to each row's latitude / longitude'''
+    delta_lat = Radians(F('latitude') - latitude)
+    delta_lon = Radians(F('longitude') - longitude)
+    a = (
+        Power(Sin(delta_lat / 2.0), 2) +
+        Cos(Radians(F('latitude'))) * math.cos(math.radians(latitude)) *
+        Power(Sin(delta_lon / 2.0), 2)
+    )
+    return 2.0 * EARTH_RADIUS_KM * ASin(Sqrt(a))
+
+
+def parse_near(near, radius_km=None):
+    '''
+    parse the 'near' and 'radius_km' query params into floats
+    near - 'latitude,longitude'
+    '''
+    try:
+        latitude, longitude = [float(value) for value in near.split(',')]
+    except ValueError:
+        raise ValueError(f"Invalid 'near' value '{near}'. Expected 'latitude,longitude'.")
+
+    if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        raise ValueError(f"Invalid 'near' value '{near}'. Coordinates out of range.")
+
+    if radius_km is None:
+        radius_km = DEFAULT_RADIUS_KM
+    try:
+        radius_km = float(radius_km)
+    except ValueError:
+        raise ValueError(f"Invalid 'radius_km' value '{radius_km}'.")
+
+    if not 0 < radius_km <= MAX_RADIUS_KM:
+        raise ValueError(f"'radius_km' must be greater than 0 and at most {MAX_RADIUS_KM}.")
+
+    return latitude, longitude, radius_km
+
+
+def filter_near(queryset, latitude, longitude, radius_km):
+    '''
+    limit a barter queryset to rows within radius_km of a point.
+    The indexed grid cells and the bounding box prefilter the rows,
+    then the exact haversine distance is checked in the database.
+    '''
+    min_lat, max_lat, min_lon, max_lon = get_bounding_box(latitude, longitude, radius_km)
+
+    queryset = queryset.filter(latitude__range=(min_lat, max_lat))
+
+    # near the poles every longitude is in range, the latitude band is enough
+    if min_lon is not None:
+        queryset = queryset.filter(
+            grid_cell__in=get_grid_cells(min_lat, max_lat, min_lon, max_lon)
+        )
+
+        if min_lon < -180:
+            queryset = queryset.filter(
+                Q(longitude__gte=min_lon + 360) | Q(longitude__lte=max_lon))
+        elif max_lon > 180:
+            queryset = queryset.filter(
+                Q(longitude__gte=min_lon) | Q(longitude__lte=max_lon - 360))
+        else:
+            queryset = queryset.filter(longitude__range=(min_lon, max_lon))
+
+    return queryset.alias(
+        distance_km=get_distance_expression(latitude, longitude)
+    ).filter(distance_km__lte=radius_km)
@@ -0,0 +1,135 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from barters_app.models import (BARTER_TYPE_CHOICES, QUANTITY_UNIT_CHOICES,
+                                Barter, SeedBarter)
+from common.utils import get_uuid_hex
+from users_app.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the barter table with generated rows inside a transaction that is rolled back, '
+        'then print EXPLAIN plans and timings for the hot barter queries '
+        'against an unindexed copy of the table (before) and the real table (after).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000000)
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.generate_barters(options['rows'], options['batch_size'])
+
+            table = Barter._meta.db_table
+            unindexed_table = f'{table}_noindex'
+            with connection.cursor() as cursor:
+                # CREATE TABLE ... AS SELECT copies the rows but none of the indexes
+                cursor.execute(
+                    f'CREATE TABLE {connection.ops.quote_name(unindexed_table)} '
+                    f'AS SELECT * FROM {connection.ops.quote_name(table)}'
+                )
+                cursor.execute('ANALYZE')
+
+            for name, queryset in self.get_queries():
+                sql, params = queryset.query.sql_with_params()
+                unindexed_sql = sql.replace(
+                    connection.ops.quote_name(table),
+                    connection.ops.quote_name(unindexed_table)
+                )
+
+                self.stdout.write(self.style.MIGRATE_HEADING(name))
+                self.stdout.write(sql % tuple(repr(param) for param in params))
+                for label, query_sql in [('before', unindexed_sql), ('after', sql)]:
+                    plan, elapsed = self.explain(query_sql, params)
+                    self.stdout.write(f'  {label} ({elapsed * 1000:.2f} ms)')
+                    for line in plan:
+                        self.stdout.write(f'    {line}')
+                self.stdout.write('')
+
+            # leave the database as it was
+            transaction.set_rollback(True)
+
+    def generate_barters(self, rows, batch_size):
+        '''insert rows with raw executemany, bulk_create would stamp one date_created on all of them'''
+        creator = User.objects.create_user(
+            email=f'benchmark_{get_uuid_hex()}@gardenbarter.com',
+            password='pass3412'
+        )
+
+        now = timezone.now()
+        barter_types = [choice for choice, label in BARTER_TYPE_CHOICES]
+        quantity_units = [choice for choice, label in QUANTITY_UNIT_CHOICES]
+        postal_codes = [f'{code:05d}' for code in range(90000, 90500)]
+
+        columns = [
+            'uuid', 'creator_id', 'title', 'description', 'date_created', 'date_updated',
+            'date_expires', 'quantity', 'quantity_units', 'will_trade_for', 'is_free',
+            'postal_code', 'barter_type', 'is_archived',
+        ]
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            connection.ops.quote_name(Barter._meta.db_table),
+            ', '.join(connection.ops.quote_name(column) for column in columns),
+            ', '.join(['%s'] * len(columns)),
+        )
+
+        self.stdout.write(f'Generating {rows} barters...')
+        with connection.cursor() as cursor:
+            for start in range(0, rows, batch_size):
+                batch = []
+                for i in range(start, min(start + batch_size, rows)):
+                    date_created = now - timedelta(seconds=rows - i)
+                    date_expires = date_created + timedelta(days=random.randint(-7, 7))
+                    date_created = connection.ops.adapt_datetimefield_value(date_created)
+                    batch.append((
+                        get_uuid_hex(),
+                        creator.id,
+                        f'benchmark barter {i}',
+                        f'benchmark barter description {i}',
+                        date_created,
+                        date_created,
+                        connection.ops.adapt_datetimefield_value(date_expires),
+                        1,
+                        random.choice(quantity_units),
+                        'item that will be traded',
+                        random.random() < 0.2,
+                        random.choice(postal_codes),
+                        random.choice(barter_types),
+                        False,
+                    ))
+                cursor.executemany(sql, batch)
+
+    def get_queries(self):
+        barter = Barter.objects.order_by('?').first()
+        now = timezone.now()
+
+        return [
+            ('detail by uuid', Barter.objects.filter(uuid=barter.uuid)),
+            ('first page of all barters', Barter.objects.active().order_by('-date_created', '-id')[:21]),
+            ('first page of seed barters', SeedBarter.objects.active().order_by('-date_created', '-id')[:21]),
+            ('deep page of seed barters', SeedBarter.objects.active().filter(
+                Q(date_created__lt=barter.date_created) |
+                Q(date_created=barter.date_created, id__lt=barter.id)
+            ).order_by('-date_created', '-id')[:21]),
+            ('expired barters', Barter.objects.listed().filter(date_expires__lte=now).values('id')),
+            ('barters by postal code', Barter.objects.filter(postal_code=barter.postal_code)),
+        ]
+
+    def explain(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+            plan = [' '.join(str(column) for column in row) for row in cursor.fetchall()]
+
+            start = time.perf_counter()
+            cursor.execute(sql, params)
+            cursor.fetchall()
+            elapsed = time.perf_counter() - start
+
+        return plan, elapsed
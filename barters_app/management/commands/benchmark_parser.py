@@ -0,0 +1,91 @@
+import io
+import json
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from djangorestframework_camel_case import parser as regex_parsers
+from rest_framework.test import APIRequestFactory
+
+from common import parsers
+
+
+class Command(BaseCommand):
+    help = (
+        'Parse large barters/create/ style bodies, a nested formData JSON object and a urlencoded form, '
+        'with djangorestframework_camel_case\'s parsers (before) and common.parsers (after), '
+        'check both give the same data and print the time per parse.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        form_data = self.get_form_data(options['items'])
+        json_body = json.dumps({'formData': form_data}).encode()
+        # forms are flat, and django refuses more than DATA_UPLOAD_MAX_NUMBER_FIELDS of them
+        form_fields = [
+            (key, value) for item in form_data['relatedBarters'] for key, value in item.items()
+            if not isinstance(value, dict)
+        ]
+        form_body = urlencode(form_fields[:settings.DATA_UPLOAD_MAX_NUMBER_FIELDS]).encode()
+
+        benchmarks = [
+            ('json', json_body, 'application/json',
+             regex_parsers.CamelCaseJSONParser(), parsers.CamelCaseJSONParser()),
+            ('urlencoded form', form_body, 'application/x-www-form-urlencoded',
+             regex_parsers.CamelCaseFormParser(), parsers.CamelCaseFormParser()),
+        ]
+        for name, body, media_type, before, after in benchmarks:
+            if self.parse(before, body, media_type) != self.parse(after, body, media_type):
+                raise CommandError(f'the {name} parsers disagree on the body')
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{name}, {len(body)} bytes'))
+            before_time = self.time_parse(before, body, media_type, options['iterations'])
+            parsers.underscoreize_key.cache_clear()
+            cold_time = self.time_parse(after, body, media_type, 1)
+            after_time = self.time_parse(after, body, media_type, options['iterations'])
+
+            self.stdout.write(f'  before: {before_time * 1000:.2f} ms')
+            self.stdout.write(f'  after (empty key cache): {cold_time * 1000:.2f} ms')
+            self.stdout.write(f'  after: {after_time * 1000:.2f} ms ({before_time / after_time:.1f}x faster)')
+
+    def get_form_data(self, items):
+        '''a seed barter form with a list of nested objects, keyed like the frontend sends them'''
+        return {
+            'barterType': 'seed',
+            'title': 'benchmark barter',
+            'description': 'benchmark barter description',
+            'postalCode': '90210',
+            'crossStreet1': 'Sunset Blvd',
+            'crossStreet2': 'Doheny Dr',
+            'willTradeFor': 'item that will be traded',
+            'isFree': False,
+            'quantity': 1,
+            'quantityUnits': 'PK',
+            'relatedBarters': [
+                {
+                    'barterType': 'seed',
+                    'commonName': f'tomato {i}',
+                    'genus': 'Solanum',
+                    'species': 'lycopersicum',
+                    'yearPackaged': '2022-01-01',
+                    'dateExpires': '2022-09-01T00:00:00Z',
+                    'creatorDetails': {'firstName': 'Ann', 'lastName': 'Gardener', 'postalCode': '90210'},
+                }
+                for i in range(items)
+            ],
+        }
+
+    def parse(self, parser, body, media_type):
+        # form parsers read the encoding and upload handlers off the request
+        request = APIRequestFactory().post('/', body, content_type=media_type)
+        return parser.parse(io.BytesIO(body), media_type, {'request': request, 'encoding': 'utf-8'})
+
+    def time_parse(self, parser, body, media_type, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            self.parse(parser, body, media_type)
+        return (time.perf_counter() - start) / iterations
@@ -0,0 +1,89 @@
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer as RegexCamelCaseJSONRenderer
+
+from barters_app.models import QUANTITY_UNIT_CHOICES, SeedBarter
+from barters_app.serializers import SeedBarterSerializer
+from common import renderers
+from common.utils import get_uuid_hex
+from users_app.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Render a page of serialized seed barters with djangorestframework_camel_case\'s '
+        'CamelCaseJSONRenderer (before) and common.renderers.CamelCaseJSONRenderer (after), '
+        'check both give the same bytes and print the time per render. Nothing is saved.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--barters', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=20)
+
+    def handle(self, *args, **options):
+        data = self.get_payload(options['barters'])
+
+        before = RegexCamelCaseJSONRenderer()
+        after = renderers.CamelCaseJSONRenderer()
+        if before.render(data) != after.render(data):
+            raise CommandError('the renderers disagree on the payload')
+
+        self.stdout.write(
+            f'{options["barters"]} barters, {len(after.render(data))} bytes, '
+            f'encoded with {"orjson" if renderers.orjson else "json"}'
+        )
+        before_time = self.time_render(before, data, options['iterations'])
+        renderers.camelize_key.cache_clear()
+        cold_time = self.time_render(after, data, 1)
+        after_time = self.time_render(after, data, options['iterations'])
+
+        self.stdout.write(f'  before: {before_time * 1000:.2f} ms')
+        self.stdout.write(f'  after (empty key cache): {cold_time * 1000:.2f} ms')
+        self.stdout.write(f'  after: {after_time * 1000:.2f} ms ({before_time / after_time:.1f}x faster)')
+
+    def get_payload(self, count):
+        '''serialize unsaved barters shaped like a retrieve response'''
+        creator = User(id=1, email=f'benchmark_{get_uuid_hex()}@gardenbarter.com', username='benchmark')
+        now = timezone.now()
+        quantity_units = [choice for choice, label in QUANTITY_UNIT_CHOICES]
+
+        barters = []
+        for i in range(count):
+            date_created = now - timedelta(minutes=i)
+            barters.append(SeedBarter(
+                id=i + 1,
+                creator=creator,
+                title=f'benchmark barter {i}',
+                description=f'benchmark barter description {i}',
+                date_created=date_created,
+                date_updated=date_created,
+                date_expires=date_created + timedelta(days=7),
+                postal_code='90210',
+                latitude=34.0901,
+                longitude=-118.4065,
+                cross_street_1='Sunset Blvd',
+                cross_street_2='Doheny Dr',
+                will_trade_for='item that will be traded',
+                is_free=False,
+                quantity=random.randint(1, 10),
+                quantity_units=random.choice(quantity_units),
+                genus='Solanum',
+                species='lycopersicum',
+                common_name='tomato',
+            ))
+
+        return {
+            'barters': SeedBarterSerializer(barters, many=True).data,
+            'next': 'NTE4fDIwMjItMDgtMDFUMDA6MDA6MDBa',
+            'prev': None,
+        }
+
+    def time_render(self, renderer, data, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            renderer.render(data)
+        return (time.perf_counter() - start) / iterations
@@ -0,0 +1,95 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from barters_app.constants import BARTER_CONFIG
+from barters_app.models import QUANTITY_UNIT_CHOICES
+from barters_app.serializers import get_values_serializer
+from common.renderers import CamelCaseJSONRenderer
+from common.utils import get_uuid_hex
+from users_app.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Insert barters inside a transaction that is rolled back, then serialize them '
+        'with the barter type\'s serializer (before) and the BarterValuesSerializer fast path '
+        'used by retrieve (after), check both render the same bytes and print rows per second. '
+        'Both timings include the query.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--barters', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument('--barter-type', choices=list(BARTER_CONFIG), default='seed')
+
+    def handle(self, *args, **options):
+        config = BARTER_CONFIG[options['barter_type']]
+        serializer_class = config['serializer']
+        values_serializer = get_values_serializer(serializer_class)
+
+        with transaction.atomic():
+            self.generate_barters(config['model'], options['barters'])
+            barters = config['model'].objects.order_by('-date_created', '-id')
+
+            def serialize():
+                return serializer_class(barters.select_related('creator'), many=True).data
+
+            def serialize_values():
+                return values_serializer.serialize(values_serializer.get_values(barters))
+
+            renderer = CamelCaseJSONRenderer()
+            if renderer.render(serialize()) != renderer.render(serialize_values()):
+                raise CommandError('the fast path output differs from the serializer')
+
+            self.stdout.write(f'{options["barters"]} {options["barter_type"]} barters')
+            before_time = self.time(serialize, options['iterations'])
+            after_time = self.time(serialize_values, options['iterations'])
+            self.stdout.write(f'  before: {before_time * 1000:.2f} ms, {options["barters"] / before_time:.0f} rows/s')
+            self.stdout.write(
+                f'  after: {after_time * 1000:.2f} ms, {options["barters"] / after_time:.0f} rows/s '
+                f'({before_time / after_time:.1f}x faster)'
+            )
+
+            # leave the database as it was
+            transaction.set_rollback(True)
+
+    def generate_barters(self, BarterModel, count):
+        '''bulk_create skips Barter.save(), so the fields it fills in are set here'''
+        creator = User.objects.create_user(
+            email=f'benchmark_{get_uuid_hex()}@gardenbarter.com',
+            password='pass3412'
+        )
+        now = timezone.now()
+        quantity_units = [choice for choice, label in QUANTITY_UNIT_CHOICES]
+
+        BarterModel.objects.bulk_create([
+            BarterModel(
+                creator=creator,
+                barter_type=BarterModel.BARTER_TYPE,
+                title=f'benchmark barter {i}',
+                description=f'benchmark barter description {i}',
+                date_expires=now + timedelta(days=7),
+                quantity=i % 10 + 1,
+                quantity_units=quantity_units[i % len(quantity_units)],
+                will_trade_for='item that will be traded',
+                postal_code='90210',
+                latitude=34.0901,
+                longitude=-118.4065,
+                cross_street_1='Sunset Blvd',
+                genus='Solanum',
+                species='lycopersicum',
+                common_name='tomato',
+                year_packaged=2022,
+            )
+            for i in range(count)
+        ], batch_size=500)
+
+    def time(self, serialize, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            serialize()
+        return (time.perf_counter() - start) / iterations
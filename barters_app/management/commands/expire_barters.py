@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from barters_app.cache import bump_version
+from barters_app.models import Barter
+
+
+class Command(BaseCommand):
+    help = (
+        'Archive (or with --delete, delete) barters whose date_expires has passed. '
+        'Rows are handled in small batches, each in its own short transaction, '
+        'so the write lock is never held for long.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--delete', action='store_true',
+                            help='delete expired barters instead of archiving them')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--pause', type=float, default=0.0,
+                            help='seconds to wait between batches')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+
+        # each partial expiry index holds either the unarchived or the archived rows,
+        # so every batch is a short range scan over one of them
+        expired_querysets = [Barter.objects.listed().filter(date_expires__lte=now)]
+        if options['delete']:
+            # barters archived by earlier runs are deleted too
+            expired_querysets.append(Barter.objects.filter(is_archived=True, date_expires__lte=now))
+
+        total = 0
+        for expired_barters in expired_querysets:
+            total += self.expire(expired_barters, options)
+
+        action = 'Deleted' if options['delete'] else 'Archived'
+        self.stdout.write(self.style.SUCCESS(f'{action} {total} expired barters'))
+
+    def expire(self, expired_barters, options):
+        '''archive or delete the barters batch by batch, return how many there were'''
+        batch_size = options['batch_size']
+
+        total = 0
+        while True:
+            with transaction.atomic():
+                barter_ids = list(
+                    expired_barters.order_by('date_expires').values_list('id', flat=True)[:batch_size]
+                )
+                if not barter_ids:
+                    break
+
+                batch = Barter.objects.filter(id__in=barter_ids)
+                barter_types = set(batch.values_list('barter_type', flat=True))
+                if options['delete']:
+                    batch.delete()
+                else:
+                    batch.update(is_archived=True)
+
+            # update() sends no signals, so cached listings are invalidated here
+            for barter_type in barter_types:
+                bump_version(barter_type)
+
+            total += len(barter_ids)
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        return total
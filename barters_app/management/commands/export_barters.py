@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from barters_app.constants import BARTER_CONFIG
+from barters_app.export import EXPORT_CHUNK_SIZE, export_barters
+
+
+class Command(BaseCommand):
+    help = (
+        'Write every active barter, shaped like the barters/export/ endpoint, '
+        'as one JSON array or as JSON Lines, to a file or stdout. '
+        'Rows are written as they are read, so memory use does not grow with the table.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--barter-type', choices=list(BARTER_CONFIG))
+        parser.add_argument('--format', choices=['json', 'jsonl'], default='jsonl', dest='export_format')
+        parser.add_argument('--chunk-size', type=int, default=EXPORT_CHUNK_SIZE)
+        parser.add_argument('--output', help='file to write to, defaults to stdout')
+
+    def handle(self, *args, **options):
+        chunks = export_barters(options['barter_type'], options['export_format'], options['chunk_size'])
+
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk.decode(), ending='')
@@ -0,0 +1,86 @@
+import csv
+import io
+import zipfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from barters_app.models import PostalCode
+
+# a handful of rows for development and tests, not a usable table
+SAMPLE_POSTAL_CODES_FILE = settings.BASE_DIR / 'barters_app' / 'data' / 'postal_codes_sample.txt'
+
+# column positions in the GeoNames postal code dump
+COUNTRY_CODE_COLUMN = 0
+POSTAL_CODE_COLUMN = 1
+LATITUDE_COLUMN = 9
+LONGITUDE_COLUMN = 10
+
+
+class Command(BaseCommand):
+    help = (
+        'Replace the postal code centroid table with the rows of a GeoNames postal code dump '
+        '(tab separated .txt, or the .zip from https://download.geonames.org/export/zip/). '
+        'Barters are only located by postal code once this has been run, '
+        f'{SAMPLE_POSTAL_CODES_FILE.name} in barters_app/data only holds a few rows for development.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--country', default='US')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        batch_size = options['batch_size']
+
+        try:
+            lines = self.open_lines(path)
+        except (OSError, zipfile.BadZipFile) as error:
+            raise CommandError(f"Can't read postal codes from '{path}': {error}")
+
+        with transaction.atomic():
+            PostalCode.objects.all().delete()
+
+            batch = []
+            for postal_code in self.parse(lines, options['country']):
+                batch.append(postal_code)
+                if len(batch) >= batch_size:
+                    self.insert(batch)
+                    batch = []
+            self.insert(batch)
+
+            # rolled back, an empty file never replaces a loaded table
+            loaded = PostalCode.objects.count()
+            if not loaded:
+                raise CommandError(f"No {options['country']} postal codes found in '{path}'")
+
+        self.stdout.write(self.style.SUCCESS(f'Loaded {loaded} postal codes from {path}'))
+
+    def open_lines(self, path):
+        '''stream text lines from a plain or zipped GeoNames file'''
+        if zipfile.is_zipfile(path):
+            archive = zipfile.ZipFile(path)
+            # the GeoNames archives hold the data file next to a readme.txt
+            name = next(name for name in archive.namelist() if name.lower() != 'readme.txt')
+            return io.TextIOWrapper(archive.open(name), encoding='utf-8')
+        return open(path, encoding='utf-8')
+
+    def parse(self, lines, country):
+        with lines:
+            for row in csv.reader(lines, delimiter='\t', quoting=csv.QUOTE_NONE):
+                if len(row) <= LONGITUDE_COLUMN or row[COUNTRY_CODE_COLUMN] != country:
+                    continue
+                try:
+                    yield PostalCode(
+                        postal_code=row[POSTAL_CODE_COLUMN].strip().upper(),
+                        latitude=float(row[LATITUDE_COLUMN]),
+                        longitude=float(row[LONGITUDE_COLUMN]),
+                    )
+                except ValueError:
+                    continue
+
+    def insert(self, batch):
+        # duplicate postal codes keep the first centroid in the file
+        PostalCode.objects.bulk_create(batch, ignore_conflicts=True)
@@ -0,0 +1,125 @@
+# Generated by Django 4.0.4 on 2026-10-18 16:14
+
+from django.db import migrations, models
+
+
+BARTER_TYPE_MODELS = {
+    'seed': 'SeedBarter',
+    'plant': 'PlantBarter',
+    'produce': 'ProduceBarter',
+    'material': 'MaterialBarter',
+    'tool': 'ToolBarter',
+}
+
+
+def copy_child_tables_to_barter_type(apps, schema_editor):
+    '''the child table a row lives in wins over whatever barter_type it was saved with'''
+    Barter = apps.get_model('barters_app', 'Barter')
+
+    for barter_type, model_name in BARTER_TYPE_MODELS.items():
+        ChildModel = apps.get_model('barters_app', model_name)
+        Barter.objects.filter(
+            id__in=ChildModel.objects.values('barter_ptr_id')
+        ).update(barter_type=barter_type)
+
+
+def copy_barter_type_to_child_tables(apps, schema_editor):
+    Barter = apps.get_model('barters_app', 'Barter')
+
+    for barter_type, model_name in BARTER_TYPE_MODELS.items():
+        ChildModel = apps.get_model('barters_app', model_name)
+        barter_ids = Barter.objects.filter(
+            barter_type=barter_type).values_list('id', flat=True)
+
+        # raw saves insert the child row only, the parent row already exists
+        for barter_id in barter_ids.iterator():
+            ChildModel(barter_ptr_id=barter_id).save_base(raw=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barters_app', '0023_remove_plantbarter_common_name_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            copy_child_tables_to_barter_type,
+            copy_barter_type_to_child_tables,
+        ),
+        migrations.DeleteModel(
+            name='MaterialBarter',
+        ),
+        migrations.DeleteModel(
+            name='PlantBarter',
+        ),
+        migrations.DeleteModel(
+            name='ProduceBarter',
+        ),
+        migrations.DeleteModel(
+            name='SeedBarter',
+        ),
+        migrations.DeleteModel(
+            name='ToolBarter',
+        ),
+        migrations.AlterField(
+            model_name='barter',
+            name='barter_type',
+            field=models.CharField(choices=[('seed', 'Seed'), ('plant', 'Plant'), ('produce', 'Produce'), ('material', 'Material'), ('tool', 'Tool')], db_index=True, default='', max_length=10, verbose_name='barter type'),
+        ),
+        migrations.CreateModel(
+            name='MaterialBarter',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('barters_app.barter',),
+        ),
+        migrations.CreateModel(
+            name='PlantBarter',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('barters_app.barter',),
+        ),
+        migrations.CreateModel(
+            name='ProduceBarter',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('barters_app.barter',),
+        ),
+        migrations.CreateModel(
+            name='SeedBarter',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('barters_app.barter',),
+        ),
+        migrations.CreateModel(
+            name='ToolBarter',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('barters_app.barter',),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.0.4 on 2026-10-18 16:15
+
+from uuid import uuid4
+
+import common.utils
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_unique_uuids(apps, schema_editor):
+    '''
+    0018 added uuid with a default evaluated once, so the rows that existed then share one value.
+    Each of those gets a fresh uuid before the column is made unique, rows whose uuid is already
+    their own keep it since it's in barter urls
+    '''
+    Barter = apps.get_model('barters_app', 'Barter')
+
+    shared_uuids = (
+        Barter.objects.values('uuid').annotate(rows=Count('id')).filter(rows__gt=1).values('uuid')
+    )
+    for barter_id in Barter.objects.filter(uuid__in=shared_uuids).values_list('id', flat=True).iterator():
+        Barter.objects.filter(id=barter_id).update(uuid=uuid4().hex)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barters_app', '0024_single_table_barter_types'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='barter',
+            name='barter_type',
+            field=models.CharField(choices=[('seed', 'Seed'), ('plant', 'Plant'), ('produce', 'Produce'), ('material', 'Material'), ('tool', 'Tool')], default='', max_length=10, verbose_name='barter type'),
+        ),
+        migrations.RunPython(fill_unique_uuids, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='barter',
+            name='uuid',
+            field=models.CharField(default=common.utils.get_uuid_hex, max_length=32, unique=True, verbose_name='uuid'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(fields=['-date_created', '-id'], name='barter_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(fields=['barter_type', '-date_created', '-id'], name='barter_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(fields=['date_expires'], name='barter_expires_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(fields=['postal_code'], name='barter_postal_code_idx'),
+        ),
+    ]
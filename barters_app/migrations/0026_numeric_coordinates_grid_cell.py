@@ -0,0 +1,73 @@
+# Generated by Django 4.0.4 on 2026-10-18 16:17
+
+import django.core.validators
+from django.db import migrations, models
+
+# the grid as of this migration, copied so later changes to barters_app.geo don't change what it writes
+GRID_CELL_DEGREES = 0.25
+GRID_ROWS = int(180 / GRID_CELL_DEGREES)
+GRID_COLUMNS = int(360 / GRID_CELL_DEGREES)
+
+
+def get_grid_cell(latitude, longitude):
+    row = min(int((latitude + 90) // GRID_CELL_DEGREES), GRID_ROWS - 1)
+    column = int(((longitude + 180) % 360) // GRID_CELL_DEGREES)
+    return row * GRID_COLUMNS + column
+
+
+def clean_coordinate_strings(apps, schema_editor):
+    '''null out blank or unparseable coordinates so the columns can be cast to floats'''
+    Barter = apps.get_model('barters_app', 'Barter')
+
+    for barter in Barter.objects.exclude(latitude=None, longitude=None).iterator():
+        coordinates = []
+        for value in [barter.latitude, barter.longitude]:
+            try:
+                coordinates.append(str(float(value)))
+            except (TypeError, ValueError):
+                coordinates.append(None)
+
+        if None in coordinates:
+            coordinates = [None, None]
+
+        Barter.objects.filter(id=barter.id).update(
+            latitude=coordinates[0], longitude=coordinates[1])
+
+
+def fill_grid_cells(apps, schema_editor):
+    Barter = apps.get_model('barters_app', 'Barter')
+
+    for barter in Barter.objects.exclude(latitude=None).exclude(longitude=None).iterator():
+        Barter.objects.filter(id=barter.id).update(
+            grid_cell=get_grid_cell(barter.latitude, barter.longitude))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barters_app', '0025_barter_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(clean_coordinate_strings, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='barter',
+            name='grid_cell',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='grid cell'),
+        ),
+        migrations.AlterField(
+            model_name='barter',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-90), django.core.validators.MaxValueValidator(90)], verbose_name='latitude'),
+        ),
+        migrations.AlterField(
+            model_name='barter',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, validators=[django.core.validators.MinValueValidator(-180), django.core.validators.MaxValueValidator(180)], verbose_name='longitude'),
+        ),
+        migrations.RunPython(fill_grid_cells, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(fields=['grid_cell', 'latitude', 'longitude'], name='barter_grid_cell_idx'),
+        ),
+    ]
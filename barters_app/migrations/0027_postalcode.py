@@ -0,0 +1,21 @@
+# Generated by Django 4.0.4 on 2026-10-18 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barters_app', '0026_numeric_coordinates_grid_cell'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostalCode',
+            fields=[
+                ('postal_code', models.CharField(max_length=12, primary_key=True, serialize=False, verbose_name='postal code')),
+                ('latitude', models.FloatField(verbose_name='latitude')),
+                ('longitude', models.FloatField(verbose_name='longitude')),
+            ],
+        ),
+    ]
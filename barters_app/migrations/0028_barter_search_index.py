@@ -0,0 +1,88 @@
+# Generated by Django 4.0.4 on 2026-10-18 16:20
+
+from django.db import migrations
+
+# the search index as of this migration, copied so later changes to barters_app.search
+# don't change what it creates. barters_app.search.install_search_index brings it up to date after migrate
+SQLITE_INSTALL = [
+    '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS barters_app_barter_fts USING fts5(
+        title, description, will_trade_for, genus, species, common_name,
+        content='barters_app_barter', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS barters_app_barter_fts_insert AFTER INSERT ON barters_app_barter BEGIN
+        INSERT INTO barters_app_barter_fts(rowid, title, description, will_trade_for, genus, species, common_name)
+        VALUES (new.id, new.title, new.description, new.will_trade_for, new.genus, new.species, new.common_name);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS barters_app_barter_fts_delete AFTER DELETE ON barters_app_barter BEGIN
+        INSERT INTO barters_app_barter_fts(barters_app_barter_fts, rowid, title, description, will_trade_for, genus, species, common_name)
+        VALUES ('delete', old.id, old.title, old.description, old.will_trade_for, old.genus, old.species, old.common_name);
+    END
+    ''',
+    '''
+    CREATE TRIGGER IF NOT EXISTS barters_app_barter_fts_update AFTER UPDATE ON barters_app_barter BEGIN
+        INSERT INTO barters_app_barter_fts(barters_app_barter_fts, rowid, title, description, will_trade_for, genus, species, common_name)
+        VALUES ('delete', old.id, old.title, old.description, old.will_trade_for, old.genus, old.species, old.common_name);
+        INSERT INTO barters_app_barter_fts(rowid, title, description, will_trade_for, genus, species, common_name)
+        VALUES (new.id, new.title, new.description, new.will_trade_for, new.genus, new.species, new.common_name);
+    END
+    ''',
+    "INSERT INTO barters_app_barter_fts(barters_app_barter_fts) VALUES ('rebuild')",
+]
+
+SQLITE_UNINSTALL = [
+    'DROP TRIGGER IF EXISTS barters_app_barter_fts_insert',
+    'DROP TRIGGER IF EXISTS barters_app_barter_fts_delete',
+    'DROP TRIGGER IF EXISTS barters_app_barter_fts_update',
+    'DROP TABLE IF EXISTS barters_app_barter_fts',
+]
+
+POSTGRES_INSTALL = [
+    '''
+    CREATE INDEX IF NOT EXISTS barters_app_barter_search_idx ON barters_app_barter USING GIN ((
+        to_tsvector('english',
+            coalesce(barters_app_barter.title, '') || ' ' ||
+            coalesce(barters_app_barter.description, '') || ' ' ||
+            coalesce(barters_app_barter.will_trade_for, '') || ' ' ||
+            coalesce(barters_app_barter.genus, '') || ' ' ||
+            coalesce(barters_app_barter.species, '') || ' ' ||
+            coalesce(barters_app_barter.common_name, ''))
+    ))
+    ''',
+]
+
+POSTGRES_UNINSTALL = [
+    'DROP INDEX IF EXISTS barters_app_barter_search_idx',
+]
+
+
+def run_for_vendor(sqlite_statements, postgres_statements):
+    def run(apps, schema_editor):
+        statements = {
+            'sqlite': sqlite_statements,
+            'postgresql': postgres_statements,
+        }.get(schema_editor.connection.vendor, [])
+
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barters_app', '0027_postalcode'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(SQLITE_INSTALL, POSTGRES_INSTALL),
+            run_for_vendor(SQLITE_UNINSTALL, POSTGRES_UNINSTALL),
+        ),
+    ]
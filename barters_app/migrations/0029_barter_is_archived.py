@@ -0,0 +1,42 @@
+# Generated by Django 4.0.4 on 2026-10-18 16:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barters_app', '0028_barter_search_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='barter',
+            name='barter_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='barter',
+            name='barter_type_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='barter',
+            name='barter_expires_idx',
+        ),
+        migrations.AddField(
+            model_name='barter',
+            name='is_archived',
+            field=models.BooleanField(default=False, verbose_name='archived'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['-date_created', '-id'], name='barter_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['barter_type', '-date_created', '-id'], name='barter_type_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['date_expires'], name='barter_expires_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.4 on 2026-10-18 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barters_app', '0029_barter_is_archived'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(condition=models.Q(('is_archived', True)), fields=['date_expires'], name='barter_archived_expires_idx'),
+        ),
+    ]
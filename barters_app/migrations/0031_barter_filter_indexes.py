@@ -0,0 +1,45 @@
+# Generated by Django 4.0.4 on 2026-10-18 17:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('barters_app', '0030_barter_archived_expires_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['creator', '-date_created', '-id'], name='barter_creator_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(condition=models.Q(('is_archived', False), ('is_free', True)), fields=['-date_created', '-id'], name='barter_free_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(condition=models.Q(('is_archived', False), ('is_free', False)), fields=['-date_created', '-id'], name='barter_priced_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['quantity_units', '-date_created', '-id'], name='barter_units_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['date_updated'], name='barter_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['genus'], name='barter_genus_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['species'], name='barter_species_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='barter',
+            index=models.Index(condition=models.Q(('is_archived', False)), fields=['common_name'], name='barter_common_name_idx'),
+        ),
+    ]
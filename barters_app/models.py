@@ -1,4 +1,7 @@
+import logging
+
 from django.db import models
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.contrib.contenttypes.models import ContentType
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth import get_user_model
@@ -6,8 +9,11 @@ from datetime import datetime, timedelta
 from django.utils import timezone
 from messages_app.models import Conversation
 from common.utils import get_uuid_hex
+from barters_app.geo import get_grid_cell
 from django.db import connection, reset_queries
 
+logger = logging.getLogger(__name__)
+
 QUANTITY_UNIT_CHOICES = [
     ('NA', ''),
     ('PL', 'plant'),
@@ -56,8 +62,77 @@ class AllBarters(models.Manager):
         return all_barters
 
 
+class PostalCode(models.Model):
+    '''Centroid of a postal code area, loaded with the load_postal_codes command.'''
+
+    postal_code = models.CharField(_('postal code'), max_length=12, primary_key=True)
+    latitude = models.FloatField(_('latitude'))
+    longitude = models.FloatField(_('longitude'))
+
+    empty_table_logged = False
+
+    def __str__(self):
+        return self.postal_code
+
+    @classmethod
+    def get_centroid(cls, postal_code):
+        '''return (latitude, longitude) for a postal code, or None if it isn't loaded'''
+        return cls.get_centroids([postal_code]).get(postal_code)
+
+    @classmethod
+    def get_centroids(cls, postal_codes):
+        '''return {postal code: (latitude, longitude)} for each of the postal codes that is loaded, in one query'''
+        candidates = {}
+        for postal_code in postal_codes:
+            normalized = postal_code.strip().upper()
+            # ZIP+4 codes share the centroid of their 5 digit ZIP code
+            candidates[postal_code] = [normalized, normalized.split('-')[0]]
+
+        centroids = {
+            code: (latitude, longitude)
+            for code, latitude, longitude in cls.objects.filter(
+                postal_code__in={code for codes in candidates.values() for code in codes}
+            ).values_list('postal_code', 'latitude', 'longitude')
+        }
+        # logged once per process, so a missing table is hard to miss without flooding the log
+        if candidates and not centroids and not cls.empty_table_logged and not cls.objects.exists():
+            cls.empty_table_logged = True
+            logger.error(
+                'The postal code table is empty, so barters are saved without coordinates '
+                'and radius searches miss them. Load it with the load_postal_codes command.'
+            )
+        return {
+            postal_code: next(centroids[code] for code in codes if code in centroids)
+            for postal_code, codes in candidates.items()
+            if any(code in centroids for code in codes)
+        }
+
+
+class BarterQuerySet(models.QuerySet):
+    def listed(self):
+        '''barters that haven't been archived by the expire_barters command'''
+        return self.filter(is_archived=False)
+
+    def active(self):
+        '''listed barters that haven't expired yet'''
+        return self.listed().filter(date_expires__gt=timezone.now())
+
+
+class BarterTypeManager(models.Manager.from_queryset(BarterQuerySet)):
+    '''Limit a typed barter model to the rows carrying its barter_type.'''
+
+    def get_queryset(self):
+        return super().get_queryset().filter(barter_type=self.model.BARTER_TYPE)
+
+
 class Barter(models.Model):
-    uuid = models.CharField(_('uuid'), max_length=32, default=get_uuid_hex)
+    # set on each typed proxy model below, used as the barter_type discriminator
+    BARTER_TYPE = None
+
+    loaded_barter_type = None
+    loaded_location = None
+
+    uuid = models.CharField(_('uuid'), max_length=32, default=get_uuid_hex, unique=True)
 
     creator = models.ForeignKey(
         get_user_model(), on_delete=models.CASCADE, related_name='barters')
@@ -82,10 +157,14 @@ class Barter(models.Model):
     is_free = models.BooleanField(_('free'), default=False)
 
     postal_code = models.CharField(_('postal code'), max_length=12)
-    latitude = models.CharField(
-        _('latitude'), max_length=10, null=True, blank=True)
-    longitude = models.CharField(
-        _('longitude'), max_length=10, null=True, blank=True)
+    latitude = models.FloatField(
+        _('latitude'), null=True, blank=True,
+        validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(
+        _('longitude'), null=True, blank=True,
+        validators=[MinValueValidator(-180), MaxValueValidator(180)])
+    grid_cell = models.PositiveIntegerField(
+        _('grid cell'), null=True, blank=True, editable=False)
     cross_street_1 = models.CharField(
         _('cross street 1'), max_length=255, null=True, blank=True)
     cross_street_2 = models.CharField(
@@ -97,8 +176,13 @@ class Barter(models.Model):
     conversations = models.ManyToManyField(
         Conversation, related_name='barters', blank=True)
 
+    # set by the expire_barters command, archived barters are left out of every listing
+    # until they're saved again, which renews them
+    is_archived = models.BooleanField(_('archived'), default=False)
+
     # objects = models.Manager()
     # barter_list = AllBarters()
+    objects = BarterQuerySet.as_manager()
 
 
     genus = models.CharField(_('genus'), max_length=255, null=True, blank=True, default=None)
@@ -112,9 +196,79 @@ class Barter(models.Model):
         _('dimensions'), help_text='Height x Width x Depth', max_length=64, null=True, blank=True, default=None)
 
 
+    class Meta:
+        indexes = [
+            # listings page newest first on (date_created, id),
+            # typed listings filter on barter_type before paging
+            # archived rows are never listed, so they are left out of these indexes
+            models.Index(
+                fields=['-date_created', '-id'], name='barter_created_idx',
+                condition=models.Q(is_archived=False)),
+            models.Index(
+                fields=['barter_type', '-date_created', '-id'], name='barter_type_created_idx',
+                condition=models.Q(is_archived=False)),
+            models.Index(
+                fields=['date_expires'], name='barter_expires_idx',
+                condition=models.Q(is_archived=False)),
+            # expire_barters --delete ranges over the archived rows separately
+            models.Index(
+                fields=['date_expires'], name='barter_archived_expires_idx',
+                condition=models.Q(is_archived=True)),
+            models.Index(fields=['postal_code'], name='barter_postal_code_idx'),
+            # the retrieve filters in barters_app.filters, each on a listed barter's bare column.
+            # The few valued ones page on (date_created, id) within the filtered value
+            models.Index(
+                fields=['creator', '-date_created', '-id'], name='barter_creator_created_idx',
+                condition=models.Q(is_archived=False)),
+            # a boolean filter compiles to a bare "is_free" term rather than a comparison,
+            # which only a partial index on each value can match
+            models.Index(
+                fields=['-date_created', '-id'], name='barter_free_created_idx',
+                condition=models.Q(is_archived=False, is_free=True)),
+            models.Index(
+                fields=['-date_created', '-id'], name='barter_priced_created_idx',
+                condition=models.Q(is_archived=False, is_free=False)),
+            models.Index(
+                fields=['quantity_units', '-date_created', '-id'], name='barter_units_created_idx',
+                condition=models.Q(is_archived=False)),
+            models.Index(
+                fields=['date_updated'], name='barter_updated_idx',
+                condition=models.Q(is_archived=False)),
+            models.Index(
+                fields=['genus'], name='barter_genus_idx',
+                condition=models.Q(is_archived=False)),
+            models.Index(
+                fields=['species'], name='barter_species_idx',
+                condition=models.Q(is_archived=False)),
+            models.Index(
+                fields=['common_name'], name='barter_common_name_idx',
+                condition=models.Q(is_archived=False)),
+            # radius searches look up a few grid cells, then range over latitude
+            models.Index(fields=['grid_cell', 'latitude', 'longitude'], name='barter_grid_cell_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remember the stored type, saving a re-typed barter invalidates the cache of both types
+        instance.loaded_barter_type = instance.__dict__.get('barter_type')
+        instance.loaded_location = instance.get_location()
+        return instance
+
+    def get_location(self):
+        return tuple(self.__dict__.get(field) for field in ['postal_code', 'latitude', 'longitude'])
 
     def save(self, *args, **kwargs):
-
+        self.prepare_for_save()
+        super(Barter, self).save(*args, **kwargs)
+        self.loaded_location = self.get_location()
+
+    def prepare_for_save(self, centroids=None):
+        '''
+        check the barter and fill in the fields derived from the others, as save() does.
+        bulk_create skips save(), so bulk inserts call this on each barter first, passing
+        centroids from PostalCode.get_centroids to look every postal code up in one query.
+        '''
         if not self.title:
             raise ValueError('Title cannot be blank')
 
@@ -125,32 +279,82 @@ class Barter(models.Model):
         if not self.postal_code:
             raise ValueError("Please provide postal code.")
 
+        # the barter form posts blank strings for unknown coordinates
+        self.latitude = float(self.latitude) if self.latitude not in (None, '') else None
+        self.longitude = float(self.longitude) if self.longitude not in (None, '') else None
+
+        # coordinates left as they were when the postal code changes belong to the old one,
+        # so they're looked up again unless new ones were sent
+        if (self.loaded_location and self.postal_code != self.loaded_location[0]
+                and (self.latitude, self.longitude) == self.loaded_location[1:]):
+            self.latitude = self.longitude = None
+
+        # fill in missing coordinates from the postal code so the barter can be found by radius searches
+        if self.latitude is None or self.longitude is None:
+            if centroids is None:
+                centroid = PostalCode.get_centroid(self.postal_code)
+            else:
+                centroid = centroids.get(self.postal_code)
+            if centroid:
+                self.latitude, self.longitude = centroid
+        self.grid_cell = get_grid_cell(self.latitude, self.longitude)
+
+        # a typed barter is always saved as its own type, so it never drops out of its proxy's manager
+        if self.BARTER_TYPE:
+            self.barter_type = self.BARTER_TYPE
+
+        # every save renews the barter, so an archived one is listed again
         self.date_expires = timezone.now() + timedelta(days=BARTER_LIFESPAN_DAYS)
-
-        super(Barter, self).save(*args, **kwargs)
+        self.is_archived = False
 
     def __str__(self):
         return self.barter_type.title() + ' - ' + self.title
 
     @property
     def is_expired(self):
-        return datetime.now() > self.date_expires
+        return self.date_expires is not None and timezone.now() > self.date_expires
 
 
 class SeedBarter(Barter):
-    pass
+    BARTER_TYPE = 'seed'
+
+    objects = BarterTypeManager()
+
+    class Meta:
+        proxy = True
 
 
 class PlantBarter(Barter):
-    pass
+    BARTER_TYPE = 'plant'
+
+    objects = BarterTypeManager()
+
+    class Meta:
+        proxy = True
+
 
 class ProduceBarter(Barter):
-    pass
+    BARTER_TYPE = 'produce'
+
+    objects = BarterTypeManager()
+
+    class Meta:
+        proxy = True
 
 
 class MaterialBarter(Barter):
-    pass
+    BARTER_TYPE = 'material'
+
+    objects = BarterTypeManager()
+
+    class Meta:
+        proxy = True
 
 
 class ToolBarter(Barter):
-    pass
\ No newline at end of file
+    BARTER_TYPE = 'tool'
+
+    objects = BarterTypeManager()
+
+    class Meta:
+        proxy = True
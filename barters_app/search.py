@@ -0,0 +1,125 @@
+import re
+
+from django.db.models.expressions import RawSQL
+
+BARTER_TABLE = 'barters_app_barter'
+FTS_TABLE = 'barters_app_barter_fts'
+POSTGRES_SEARCH_INDEX = 'barters_app_barter_search_idx'
+
+SEARCH_FIELDS = ['title', 'description', 'will_trade_for', 'genus', 'species', 'common_name']
+
+# bm25 column weights, in SEARCH_FIELDS order
+SEARCH_WEIGHTS = [10.0, 1.0, 2.0, 5.0, 5.0, 5.0]
+
+SQLITE_TRIGGERS = {
+    f'{FTS_TABLE}_insert': f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {BARTER_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, {', '.join(SEARCH_FIELDS)})
+            VALUES (new.id, {', '.join(f'new.{field}' for field in SEARCH_FIELDS)});
+        END
+    ''',
+    f'{FTS_TABLE}_delete': f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {BARTER_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(SEARCH_FIELDS)})
+            VALUES ('delete', old.id, {', '.join(f'old.{field}' for field in SEARCH_FIELDS)});
+        END
+    ''',
+    f'{FTS_TABLE}_update': f'''
+        CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE ON {BARTER_TABLE} BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {', '.join(SEARCH_FIELDS)})
+            VALUES ('delete', old.id, {', '.join(f'old.{field}' for field in SEARCH_FIELDS)});
+            INSERT INTO {FTS_TABLE}(rowid, {', '.join(SEARCH_FIELDS)})
+            VALUES (new.id, {', '.join(f'new.{field}' for field in SEARCH_FIELDS)});
+        END
+    ''',
+}
+
+POSTGRES_SEARCH_VECTOR = "to_tsvector('english', {})".format(
+    " || ' ' || ".join(f'coalesce({BARTER_TABLE}.{field}, \'\')' for field in SEARCH_FIELDS)
+)
+
+
+def install_search_index(connection):
+    '''
+    create the full text index for barters if it is missing.
+    On SQLite this is an external content FTS5 table kept in sync by triggers.
+    SQLite drops the triggers whenever a migration rebuilds the barter table,
+    so this also runs after every migrate and rebuilds the index if they were gone.
+    '''
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE tbl_name IN (%s, %s)",
+                [BARTER_TABLE, FTS_TABLE]
+            )
+            existing = {name for name, in cursor.fetchall()}
+            if FTS_TABLE in existing and existing.issuperset(SQLITE_TRIGGERS):
+                return
+
+            cursor.execute(
+                f'''CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+                    {', '.join(SEARCH_FIELDS)},
+                    content='{BARTER_TABLE}', content_rowid='id',
+                    tokenize='porter unicode61'
+                )'''
+            )
+
+            for trigger_sql in SQLITE_TRIGGERS.values():
+                cursor.execute(trigger_sql)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+    elif connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {POSTGRES_SEARCH_INDEX} '
+                f'ON {BARTER_TABLE} USING GIN (({POSTGRES_SEARCH_VECTOR}))'
+            )
+
+
+def uninstall_search_index(connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for trigger_name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger_name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f'DROP INDEX IF EXISTS {POSTGRES_SEARCH_INDEX}')
+
+
+def get_search_terms(query):
+    '''split free text into words, dropping any search syntax the user typed'''
+    return re.findall(r'\w+', query)
+
+
+def filter_search(queryset, query, connection):
+    '''
+    limit a barter queryset to rows matching every word of the query,
+    annotated with a 'rank' where lower is a better match.
+    The last word is matched as a prefix so results update as the user types.
+    '''
+    terms = get_search_terms(query)
+    if not terms:
+        raise ValueError(f"Invalid search query '{query}'.")
+
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{term}"' for term in terms) + '*'
+        weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {BARTER_TABLE}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[match],
+        ).annotate(rank=RawSQL(f'bm25({FTS_TABLE}, {weights})', ()))
+
+    if connection.vendor == 'postgresql':
+        ts_query = ' & '.join(terms) + ':*'
+
+        return queryset.extra(
+            where=[f"{POSTGRES_SEARCH_VECTOR} @@ to_tsquery('english', %s)"],
+            params=[ts_query],
+        ).annotate(rank=RawSQL(
+            f"-ts_rank({POSTGRES_SEARCH_VECTOR}, to_tsquery('english', %s))", (ts_query,)
+        ))
+
+    raise ValueError(f"Text search isn't supported on the '{connection.vendor}' database backend.")
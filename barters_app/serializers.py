@@ -1,12 +1,29 @@
+from functools import lru_cache
+
 from rest_framework import serializers
 from .models import *
 
 from users_app.serializers import UserDetailSerializer
 from .models import QUANTITY_UNIT_CHOICES
 QUANTITY_UNIT_CHOICES = dict(QUANTITY_UNIT_CHOICES)
+
+
+class CoordinateField(serializers.FloatField):
+    '''FloatField that reads the blank string sent by the barter form as null'''
+
+    def validate_empty_values(self, data):
+        if data == '':
+            data = None
+        return super().validate_empty_values(data)
+
+
 class BarterSerializer(serializers.ModelSerializer):
 
     creator = UserDetailSerializer(read_only=True)
+    latitude = CoordinateField(
+        allow_null=True, required=False, min_value=-90, max_value=90)
+    longitude = CoordinateField(
+        allow_null=True, required=False, min_value=-180, max_value=180)
 
     class Meta:
         model = Barter
@@ -34,19 +51,28 @@ class BarterSerializer(serializers.ModelSerializer):
              'dimensions',
              'year_packaged'
         ]
-        read_only_fields = ["uuid", "creator", "date_created", "date_updated", "date_expires", "barter_ptr"]
+        read_only_fields = ["uuid", "creator", "date_created", "date_updated", "date_expires"]
+
+    def to_internal_value(self, data):
+        # a list serializer validates every item with one child, which has no initial_data of its own
+        self.item_data = data
+        return super().to_internal_value(data)
 
     def validate_is_free(self, is_free):
         if is_free == None:
             raise serializers.ValidationError('is_free cannot be null')
-        if not is_free and not self.initial_data.get('will_trade_for'):
+        if not is_free and not self.item_data.get('will_trade_for'):
             raise serializers.ValidationError("Unless an item is free it must be traded for something. Check that the item's 'is_free' value is False.")
 
         return is_free
 
+    # stored codes shown by their label, e.g. 'OZ' as 'ounce', also applied by BarterValuesSerializer
+    representation_choices = {'quantity_units': QUANTITY_UNIT_CHOICES}
+
     def to_representation(self, instance):
         ret = super().to_representation(instance)
-        ret['quantity_units'] = QUANTITY_UNIT_CHOICES[ret['quantity_units']]
+        for field_name, choices in self.representation_choices.items():
+            ret[field_name] = choices[ret[field_name]]
         return ret
 
 class SeedBarterSerializer(BarterSerializer):
@@ -93,3 +119,90 @@ class ToolBarterSerializer(BarterSerializer):
         fields = BarterSerializer.Meta.fields + [
             'dimensions'
         ]
+
+
+# fields whose to_representation only converts the value to the builtin type the database already returns
+BUILTIN_FIELD_TYPES = [
+    (serializers.BooleanField, bool),
+    (serializers.CharField, str),
+    (serializers.IntegerField, int),
+    (serializers.FloatField, float),
+]
+
+
+class BarterValuesSerializer:
+    '''
+    Read only fast path for listing barters with a BarterSerializer class.
+
+    The serializer's fields are compiled once into (name, lookup, converter)
+    extractors, so rows come from queryset.values() dicts and skip DRF's per field
+    get_attribute / SkipField handling. Converters are builtins for fields that
+    only cast, precomputed maps for choices, and the field's own to_representation
+    for the rest, so the output equals serializer_class(barters, many=True).data.
+    '''
+
+    def __init__(self, serializer_class):
+        serializer = serializer_class()
+        self.lookups = []
+        self.extractors = self.compile(serializer)
+
+    def compile(self, serializer, prefix=''):
+        extractors = []
+        representation_choices = getattr(serializer, 'representation_choices', {})
+
+        for field in serializer._readable_fields:
+            lookup = prefix + '__'.join(field.source_attrs)
+            self.lookups.append(lookup)
+
+            if isinstance(field, serializers.BaseSerializer):
+                extractors.append((field.field_name, lookup, self.compile(field, prefix=f'{lookup}__')))
+                continue
+
+            converter = self.get_converter(field)
+            if field.field_name in representation_choices:
+                converter = self.get_choice_converter(converter, representation_choices[field.field_name])
+            extractors.append((field.field_name, lookup, converter))
+
+        return extractors
+
+    def get_converter(self, field):
+        if isinstance(field, serializers.ChoiceField):
+            choices = field.choice_strings_to_values
+            return lambda value: choices.get(str(value), value)
+
+        for field_class, builtin in BUILTIN_FIELD_TYPES:
+            # subclasses that override to_representation keep their own
+            if type(field).to_representation is field_class.to_representation:
+                return builtin
+
+        return field.to_representation
+
+    def get_choice_converter(self, converter, choices):
+        # precomputed for every value the database can hold, anything else fails like BarterSerializer
+        representations = {value: choices[converter(value)] for value in choices}
+        return lambda value: representations[value] if value in representations else choices[converter(value)]
+
+    def get_values(self, queryset, *extra_lookups):
+        '''the queryset as values() dicts holding the serializer's lookups, plus extra ones such as ordering fields'''
+        return queryset.values(*self.lookups, *[lookup for lookup in extra_lookups if lookup not in self.lookups])
+
+    def to_representation(self, row, extractors=None):
+        ret = {}
+        for field_name, lookup, converter in extractors or self.extractors:
+            value = row[lookup]
+            if value is None:
+                ret[field_name] = None
+            elif isinstance(converter, list):
+                ret[field_name] = self.to_representation(row, converter)
+            else:
+                ret[field_name] = converter(value)
+        return ret
+
+    def serialize(self, rows):
+        return [self.to_representation(row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def get_values_serializer(serializer_class):
+    '''compile each barter serializer class once per process'''
+    return BarterValuesSerializer(serializer_class)
@@ -0,0 +1,50 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save
+from django.dispatch import receiver
+
+from .cache import CREATOR_VERSION, bump_version
+from .constants import BARTER_CONFIG
+from .models import Barter
+from .serializers import BarterSerializer
+
+
+@receiver(post_migrate)
+def install_barter_search_index(sender, using, **kwargs):
+    from .search import install_search_index
+
+    if sender.name == 'barters_app':
+        install_search_index(connections[using])
+
+
+def invalidate_barter_cache(sender, instance, **kwargs):
+    barter_types = {instance.barter_type, instance.loaded_barter_type}
+    for barter_type in barter_types - {None}:
+        bump_version(barter_type)
+
+
+# typed barters are proxy models and send signals with their own class as the sender
+for BarterModel in [Barter] + [config['model'] for config in BARTER_CONFIG.values()]:
+    post_save.connect(invalidate_barter_cache, sender=BarterModel)
+    post_delete.connect(invalidate_barter_cache, sender=BarterModel)
+
+
+@lru_cache(maxsize=None)
+def get_creator_fields():
+    '''attnames of the user fields nested in barter listings as the creator'''
+    creator_serializer = BarterSerializer().fields['creator']
+    model_fields = creator_serializer.Meta.model._meta
+    return frozenset(
+        model_fields.get_field(field.source).attname
+        for field in creator_serializer.fields.values() if field.source != '*'
+    )
+
+
+# deleting a user deletes their barters, which invalidates the listings they were in
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_creator_cache(sender, instance, created, **kwargs):
+    # a new user has no barters yet, and fields the listings don't show, like password, don't matter
+    if not created and instance.get_changed_fields() & get_creator_fields():
+        bump_version(CREATOR_VERSION)
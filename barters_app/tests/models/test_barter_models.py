@@ -1,10 +1,20 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
 from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.utils import timezone
 
 from django.test import TransactionTestCase
 
 from django.db.utils import IntegrityError
 from users_app.models import *
 from barters_app.models import *
+from barters_app.geo import get_grid_cell
+from barters_app.management.commands.load_postal_codes import SAMPLE_POSTAL_CODES_FILE
+from barters_app.search import SQLITE_TRIGGERS, filter_search, install_search_index
 
 
 class BarterModelBaseTestCase(TransactionTestCase):
@@ -47,3 +57,212 @@ class BarterTestCase(BarterModelBaseTestCase):
                 postal_code='' # cannot be blank
             )
         
+
+class TypedBarterTestCase(BarterModelBaseTestCase):
+    def test_typed_barters_share_one_table(self):
+        seed_barter = SeedBarter.objects.create(
+            creator=self.user_1,
+            title='test title',
+            will_trade_for='tomatoes',
+            postal_code='55555'
+        )
+        ToolBarter.objects.create(
+            creator=self.user_1,
+            title='test title',
+            will_trade_for='tomatoes',
+            postal_code='55555'
+        )
+
+        # the barter_type is filled in from the proxy model
+        self.assertEqual(seed_barter.barter_type, 'seed')
+        self.assertEqual(Barter.objects.count(), 2)
+        self.assertEqual(list(SeedBarter.objects.all()), [seed_barter])
+        self.assertEqual(ToolBarter.objects.get().barter_type, 'tool')
+        self.assertEqual(PlantBarter.objects.count(), 0)
+
+        # a typed barter can't be saved as another type and drop out of its own manager
+        seed_barter.barter_type = 'tool'
+        seed_barter.save()
+        self.assertEqual(Barter.objects.get(id=seed_barter.id).barter_type, 'seed')
+        self.assertEqual(list(SeedBarter.objects.all()), [seed_barter])
+
+        # typed lookups filter on barter_type instead of joining a child table
+        sql = str(SeedBarter.objects.filter(uuid=seed_barter.uuid).query)
+        self.assertNotIn('JOIN', sql)
+        self.assertIn('"barter_type" = seed', sql)
+
+
+class PostalCodeTestCase(BarterModelBaseTestCase):
+    def test_load_postal_codes(self):
+        call_command('load_postal_codes', SAMPLE_POSTAL_CODES_FILE, stdout=StringIO())
+
+        self.assertEqual(PostalCode.objects.count(), 9)
+        self.assertEqual(PostalCode.get_centroid('94110'), (37.7484, -122.4156))
+        self.assertEqual(PostalCode.get_centroid(' 94110-2207 '), (37.7484, -122.4156))
+        self.assertIsNone(PostalCode.get_centroid('99999'))
+
+        # reloading replaces the table instead of duplicating it
+        call_command('load_postal_codes', SAMPLE_POSTAL_CODES_FILE, stdout=StringIO())
+        self.assertEqual(PostalCode.objects.count(), 9)
+
+        # a file without matching rows fails and leaves the table as it was
+        with self.assertRaises(CommandError):
+            call_command('load_postal_codes', SAMPLE_POSTAL_CODES_FILE, '--country', 'CA', stdout=StringIO())
+        self.assertEqual(PostalCode.objects.count(), 9)
+
+    @mock.patch.object(PostalCode, 'empty_table_logged', False)
+    def test_empty_postal_code_table_logged(self):
+        with self.assertLogs('barters_app.models', level='ERROR'):
+            self.assertIsNone(PostalCode.get_centroid('94110'))
+        with self.assertNoLogs('barters_app.models', level='ERROR'):
+            self.assertIsNone(PostalCode.get_centroid('94110'))
+
+        PostalCode.empty_table_logged = False
+
+        PostalCode.objects.create(postal_code='94110', latitude=37.7484, longitude=-122.4156)
+        with self.assertNoLogs('barters_app.models', level='ERROR'):
+            self.assertIsNone(PostalCode.get_centroid('55555'))
+
+    def test_barter_coordinates_from_postal_code(self):
+        PostalCode.objects.create(postal_code='94110', latitude=37.7484, longitude=-122.4156)
+
+        barter = SeedBarter.objects.create(
+            creator=self.user_1,
+            title='test title',
+            will_trade_for='tomatoes',
+            postal_code='94110',
+            latitude='',
+            longitude='',
+        )
+        self.assertEqual((barter.latitude, barter.longitude), (37.7484, -122.4156))
+        self.assertIsNotNone(barter.grid_cell)
+
+        # coordinates sent by the client win over the postal code centroid
+        barter = SeedBarter.objects.create(
+            creator=self.user_1,
+            title='test title',
+            will_trade_for='tomatoes',
+            postal_code='94110',
+            latitude=37.76,
+            longitude=-122.42,
+        )
+        self.assertEqual((barter.latitude, barter.longitude), (37.76, -122.42))
+
+        barter = SeedBarter.objects.create(
+            creator=self.user_1,
+            title='test title',
+            will_trade_for='tomatoes',
+            postal_code='55555',
+        )
+        self.assertIsNone(barter.latitude)
+        self.assertIsNone(barter.grid_cell)
+
+    def test_barter_coordinates_follow_postal_code(self):
+        PostalCode.objects.create(postal_code='94110', latitude=37.7484, longitude=-122.4156)
+        PostalCode.objects.create(postal_code='97214', latitude=45.5147, longitude=-122.6425)
+        barter = SeedBarter.objects.create(
+            creator=self.user_1,
+            title='test title',
+            will_trade_for='tomatoes',
+            postal_code='94110',
+        )
+
+        # a new postal code moves the barter to its centroid
+        barter = SeedBarter.objects.get(id=barter.id)
+        barter.postal_code = '97214'
+        barter.save()
+        barter = SeedBarter.objects.get(id=barter.id)
+        self.assertEqual((barter.latitude, barter.longitude), (45.5147, -122.6425))
+        self.assertEqual(barter.grid_cell, get_grid_cell(45.5147, -122.6425))
+
+        # unless coordinates are sent with it
+        barter.postal_code = '94110'
+        barter.latitude, barter.longitude = 45.52, -122.64
+        barter.save()
+        self.assertEqual((barter.latitude, barter.longitude), (45.52, -122.64))
+
+        # a postal code without a centroid leaves the barter unlocated rather than at the old place
+        barter.postal_code = '55555'
+        barter.save()
+        self.assertIsNone(barter.latitude)
+        self.assertIsNone(barter.grid_cell)
+
+
+class BarterSearchIndexTestCase(BarterModelBaseTestCase):
+    def test_install_search_index_restores_triggers(self):
+        # rebuilding the barter table in a migration drops the sqlite triggers
+        with connection.cursor() as cursor:
+            for trigger_name in SQLITE_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {trigger_name}')
+
+        barter = SeedBarter.objects.create(
+            creator=self.user_1,
+            title='rhubarb crowns',
+            will_trade_for='tomatoes',
+            postal_code='55555'
+        )
+        self.assertFalse(filter_search(Barter.objects.all(), 'rhubarb', connection).exists())
+
+        install_search_index(connection)
+
+        self.assertEqual(list(filter_search(Barter.objects.all(), 'rhubarb', connection)), [barter])
+
+
+class ExpireBartersTestCase(BarterModelBaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        for i in range(5):
+            SeedBarter.objects.create(
+                creator=self.user_1,
+                title=f'test title {i}',
+                will_trade_for='tomatoes',
+                postal_code='55555'
+            )
+
+        self.expired_ids = list(Barter.objects.order_by('id').values_list('id', flat=True)[:3])
+        Barter.objects.filter(id__in=self.expired_ids).update(
+            date_expires=timezone.now() - timedelta(days=1))
+
+    def test_is_expired(self):
+        self.assertTrue(Barter.objects.get(id=self.expired_ids[0]).is_expired)
+        self.assertFalse(Barter.objects.exclude(id__in=self.expired_ids).first().is_expired)
+        self.assertEqual(Barter.objects.active().count(), 2)
+
+    def test_expire_barters_archive(self):
+        call_command('expire_barters', '--batch-size', '2', stdout=StringIO())
+
+        self.assertEqual(
+            sorted(Barter.objects.filter(is_archived=True).values_list('id', flat=True)),
+            self.expired_ids
+        )
+        self.assertEqual(Barter.objects.listed().count(), 2)
+
+    def test_expire_barters_delete(self):
+        # rows archived by an earlier run are deleted as well
+        Barter.objects.filter(id=self.expired_ids[0]).update(is_archived=True)
+
+        call_command('expire_barters', '--delete', '--batch-size', '2', stdout=StringIO())
+
+        self.assertEqual(Barter.objects.count(), 2)
+        self.assertFalse(Barter.objects.filter(id__in=self.expired_ids).exists())
+
+    def test_expire_barters_use_expiry_indexes(self):
+        now = timezone.now()
+        plan = Barter.objects.listed().filter(date_expires__lte=now).order_by('date_expires').explain()
+        self.assertIn('barter_expires_idx', plan)
+
+        plan = Barter.objects.filter(is_archived=True, date_expires__lte=now).order_by('date_expires').explain()
+        self.assertIn('barter_archived_expires_idx', plan)
+
+    def test_saving_archived_barter_renews_it(self):
+        call_command('expire_barters', stdout=StringIO())
+
+        barter = SeedBarter.objects.get(id=self.expired_ids[0])
+        barter.title = 'edited title'
+        barter.save()
+
+        barter.refresh_from_db()
+        self.assertFalse(barter.is_archived)
+        self.assertFalse(barter.is_expired)
+        self.assertIn(barter, Barter.objects.active())
@@ -0,0 +1,131 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from barters_app import views
+from barters_app.cache import get_versions
+from barters_app.geo import get_grid_cell
+from barters_app.models import Barter, PostalCode, SeedBarter, ToolBarter
+from barters_app.search import filter_search
+
+
+class TestBarterBulkCreate(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        self.user = get_user_model().objects.create_user(
+            email='test_user_1@gardenbarter.com',
+            password='pass3412'
+        )
+        PostalCode.objects.create(postal_code='99999', latitude=45.5, longitude=-122.6)
+
+        self.barter_data = {
+            'title': 'motherwort seeds',
+            'description': 'test barter description',
+            'will_trade_for': 'item that will be traded',
+            'is_free': False,
+            'postal_code': '99999',
+            'barter_type': 'seed',
+            'latitude': '',
+            'longitude': '',
+            'genus': 'leonarus',
+            'species': 'cardiaca',
+            'common_name': 'motherwort',
+        }
+
+    def bulk_create(self, barters):
+        request = self.factory.post(reverse('barters_app:bulk_create'), {'barters': barters}, format='json')
+        force_authenticate(request, user=self.user)
+        return views.bulk_create(request)
+
+    def test_bulk_create(self):
+        barters = [dict(self.barter_data, title=f'seed packet {i}') for i in range(5)]
+        barters.append(dict(self.barter_data, barter_type='tool', title='shovel', dimensions='1x1x5'))
+
+        response = self.bulk_create(barters)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(SeedBarter.objects.count(), 5)
+        self.assertEqual(ToolBarter.objects.get().dimensions, '1x1x5')
+        self.assertEqual(
+            [barter['title'] for barter in response.data['barters']],
+            [barter['title'] for barter in barters]
+        )
+        self.assertEqual(response.data['barters'][0]['creator']['id'], self.user.id)
+
+        # the fields Barter.save() fills in are set on bulk inserts too
+        barter = SeedBarter.objects.get(title='seed packet 0')
+        self.assertEqual((barter.latitude, barter.longitude), (45.5, -122.6))
+        self.assertEqual(barter.grid_cell, get_grid_cell(45.5, -122.6))
+        self.assertIsNotNone(barter.date_expires)
+        self.assertIsNotNone(barter.date_created)
+        self.assertTrue(barter in Barter.objects.active())
+
+        # the search index triggers fire on bulk inserts
+        self.assertEqual(filter_search(Barter.objects.all(), 'shovel', connection).get().title, 'shovel')
+
+    @override_settings(BARTER_BULK_CREATE={'MAX_BARTERS': 500, 'BATCH_SIZE': 10})
+    def test_bulk_create_batches_inserts(self):
+        barters = [dict(self.barter_data, title=f'seed packet {i}') for i in range(25)]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.bulk_create(barters)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        inserts = [query for query in queries.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 3)
+        self.assertEqual(SeedBarter.objects.count(), 25)
+
+    def test_bulk_create_invalidates_cached_listings(self):
+        seed_version, tool_version = get_versions(['seed', 'tool'])
+
+        self.bulk_create([self.barter_data])
+
+        self.assertNotEqual(get_versions(['seed'])[0], seed_version)
+        self.assertEqual(get_versions(['tool'])[0], tool_version)
+
+    def test_bulk_create_reports_errors_per_barter(self):
+        barters = [
+            self.barter_data,
+            dict(self.barter_data, barter_type='shoe'),
+            dict(self.barter_data, title=''),
+            # caught by the checks in Barter.save(), serializers only see is_free when it's sent
+            dict(self.barter_data, barter_type='tool', will_trade_for=''),
+        ]
+        del barters[3]['is_free']
+
+        response = self.bulk_create(barters)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data['errors']
+        self.assertEqual(len(errors), 4)
+        self.assertEqual(errors[0], {})
+        self.assertIn('barter_type', errors[1])
+        self.assertIn('title', errors[2])
+        self.assertIn('non_field_errors', errors[3])
+        # nothing is created unless every barter is valid
+        self.assertEqual(Barter.objects.count(), 0)
+
+    def test_bulk_create_validates_is_free_per_barter(self):
+        response = self.bulk_create([
+            self.barter_data,
+            dict(self.barter_data, will_trade_for=''),
+        ])
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0], {})
+        self.assertIn('is_free', response.data['errors'][1])
+
+    @override_settings(BARTER_BULK_CREATE={'MAX_BARTERS': 2, 'BATCH_SIZE': 100})
+    def test_bulk_create_limits(self):
+        response = self.bulk_create([self.barter_data] * 3)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], ['Too many barters, at most 2 can be created at once.'])
+
+        response = self.bulk_create([])
+        self.assertEqual(response.data['errors'], ["Missing 'barters' list."])
@@ -0,0 +1,146 @@
+import json
+from io import StringIO
+
+from asgiref.sync import async_to_sync
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework_simplejwt.tokens import AccessToken
+
+from barters_app import views
+from barters_app.models import Barter, SeedBarter, ToolBarter
+from barters_app.serializers import BarterSerializer, SeedBarterSerializer
+from common.renderers import camelize
+
+
+class TestBarterExport(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            email='test_user_1@gardenbarter.com',
+            password='pass3412'
+        )
+
+        barter_data = {
+            'creator': cls.user,
+            'description': 'test barter description',
+            'will_trade_for': 'item that will be traded',
+            'postal_code': '99999',
+        }
+        cls.seed_barters = [SeedBarter.objects.create(title=f'seed barter {i}', **barter_data) for i in range(3)]
+        cls.tool_barter = ToolBarter.objects.create(title='tool barter', **barter_data)
+
+        expired_barter = SeedBarter.objects.create(title='expired barter', **barter_data)
+        SeedBarter.objects.filter(id=expired_barter.id).update(date_expires=timezone.now())
+
+    def setUp(self):
+        self.factory = APIRequestFactory()
+
+    def export(self, barter_type=None, **params):
+        kwargs = {'barter_type': barter_type} if barter_type else {}
+        request = self.factory.get(reverse('barters_app:export', kwargs=kwargs), params)
+        force_authenticate(request, user=self.user)
+        return views.export(request, barter_type=barter_type)
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_export_json_array(self):
+        response = self.export()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        active_barters = Barter.objects.active().order_by('id')
+        self.assertEqual(
+            json.loads(self.read(response)),
+            json.loads(json.dumps(camelize(BarterSerializer(active_barters, many=True).data)))
+        )
+
+    def test_export_json_lines(self):
+        response = self.export('seed', format='jsonl')
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = self.read(response).splitlines()
+        self.assertEqual(
+            [json.loads(line) for line in lines],
+            json.loads(json.dumps(camelize(SeedBarterSerializer(self.seed_barters, many=True).data)))
+        )
+
+    def test_export_empty(self):
+        Barter.objects.all().delete()
+
+        self.assertEqual(self.read(self.export()), '[]')
+        self.assertEqual(self.read(self.export(format='jsonl')), '')
+
+    def test_export_invalid_barter_type(self):
+        response = self.export('shoe')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], ["Invalid 'barter_type': 'shoe'"])
+
+    def test_export_requires_authentication(self):
+        request = self.factory.get(reverse('barters_app:export'))
+        response = views.export(request)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_export_command(self):
+        out = StringIO()
+        call_command('export_barters', '--barter-type', 'tool', '--chunk-size', '1', stdout=out)
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])['title'], 'tool barter')
+
+
+class TestBarterExportASGI(TransactionTestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test_user_1@gardenbarter.com',
+            password='pass3412'
+        )
+        for i in range(3):
+            SeedBarter.objects.create(
+                creator=self.user,
+                title=f'seed barter {i}',
+                will_trade_for='item that will be traded',
+                postal_code='99999',
+            )
+
+    def test_export_streams_under_asgi(self):
+        from garden_barter_proj.asgi import application
+
+        async def export():
+            communicator = ApplicationCommunicator(application, {
+                'type': 'http',
+                'method': 'GET',
+                'path': reverse('barters_app:export'),
+                'query_string': b'format=jsonl',
+                'headers': [
+                    (b'host', b'testserver'),
+                    (b'authorization', f'Bearer {AccessToken.for_user(self.user)}'.encode()),
+                ],
+            })
+            await communicator.send_input({'type': 'http.request', 'body': b''})
+
+            start = await communicator.receive_output(timeout=5)
+            body = b''
+            while True:
+                message = await communicator.receive_output(timeout=5)
+                body += message.get('body', b'')
+                if not message.get('more_body'):
+                    return start, body
+
+        # the rows are read from the database while the response streams
+        start, body = async_to_sync(export)()
+
+        self.assertEqual(start['status'], status.HTTP_200_OK)
+        self.assertEqual(
+            [json.loads(line)['title'] for line in body.decode().splitlines()],
+            ['seed barter 0', 'seed barter 1', 'seed barter 2']
+        )
@@ -0,0 +1,77 @@
+import io
+import json
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from djangorestframework_camel_case import parser as regex_parsers
+from rest_framework.exceptions import ParseError
+from rest_framework.test import APIRequestFactory
+
+from common import parsers
+
+
+class TestCamelCaseParsers(SimpleTestCase):
+    def setUp(self):
+        self.form_data = {
+            'formData': {
+                'barterType': 'seed',
+                'crossStreet1': 'Elm',
+                'isFree': False,
+                'quantity': 1.5,
+                'willTradeFor': None,
+                'relatedBarters': [{'commonName': 'tomato', 'yearPackaged': '2022'}, ['nestedList', 2]],
+                'HTTPResponseCode': 200,
+                'already_snake': 'value',
+            },
+            'barterId': 'abc',
+        }
+
+    def parse(self, parser, body, content_type):
+        request = APIRequestFactory().post('/', body, content_type=content_type)
+        return parser.parse(
+            io.BytesIO(request.read()), request.content_type,
+            {'request': request, 'encoding': 'utf-8'}
+        )
+
+    def test_underscoreize_key(self):
+        self.assertEqual(parsers.underscoreize_key('crossStreet1'), 'cross_street_1')
+        self.assertEqual(parsers.underscoreize_key('HTTPResponseCode'), 'http_response_code')
+        self.assertEqual(parsers.underscoreize_key('already_snake'), 'already_snake')
+
+    def test_json_parser(self):
+        body = json.dumps(self.form_data)
+        data = self.parse(parsers.CamelCaseJSONParser(), body, 'application/json')
+
+        self.assertEqual(data['form_data']['related_barters'][0]['common_name'], 'tomato')
+        self.assertEqual(data, self.parse(regex_parsers.CamelCaseJSONParser(), body, 'application/json'))
+
+    def test_json_parser_keeps_big_integers(self):
+        data = self.parse(parsers.CamelCaseJSONParser(), '{"bigNumber": 123456789012345678901234567890}', 'application/json')
+        self.assertEqual(data, {'big_number': 123456789012345678901234567890})
+
+    def test_json_parse_error(self):
+        with self.assertRaises(ParseError):
+            self.parse(parsers.CamelCaseJSONParser(), '{"barterId": ', 'application/json')
+
+    def test_form_parser(self):
+        body = 'barterType=seed&crossStreet1=Elm&relatedIds=1&relatedIds=2'
+        content_type = 'application/x-www-form-urlencoded'
+        data = self.parse(parsers.CamelCaseFormParser(), body, content_type)
+
+        self.assertEqual(data.getlist('related_ids'), ['1', '2'])
+        self.assertEqual(data, self.parse(regex_parsers.CamelCaseFormParser(), body, content_type))
+
+    def test_multipart_parser(self):
+        request = APIRequestFactory().post('/', {
+            'barterType': 'seed',
+            'relatedIds': ['1', '2'],
+            'seedPhoto': SimpleUploadedFile('seeds.txt', b'seeds'),
+        })
+        stream = io.BytesIO(request.read())
+        data_and_files = parsers.CamelCaseMultiPartParser().parse(
+            stream, request.META['CONTENT_TYPE'], {'request': request, 'encoding': 'utf-8'}
+        )
+
+        self.assertEqual(data_and_files.data.getlist('related_ids'), ['1', '2'])
+        self.assertEqual(data_and_files.data['barter_type'], 'seed')
+        self.assertEqual(data_and_files.files['seed_photo'].read(), b'seeds')
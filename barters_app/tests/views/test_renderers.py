@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+from uuid import uuid4
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from djangorestframework_camel_case.render import CamelCaseJSONRenderer as RegexCamelCaseJSONRenderer
+
+from common.renderers import CamelCaseJSONRenderer, camelize_key
+
+
+class TestCamelCaseJSONRenderer(SimpleTestCase):
+    def setUp(self):
+        self.payload = {
+            'barters': [
+                OrderedDict([
+                    ('uuid', uuid4().hex),
+                    ('date_created', timezone.now()),
+                    ('date_expires', None),
+                    ('quantity', Decimal('1.50')),
+                    ('is_free', False),
+                    ('cross_street_1', 'Elm'),
+                    ('creator', {'first_name': 'Ann', 'id': 1, 'user_permissions': []}),
+                ]),
+            ],
+            'next': 'abc',
+            'prev': None,
+            'nested_tuple': ({'inner_key': 'line\u2028separator'},),
+            'lazy_label': _('date updated'),
+            _('lazy_key'): 'value',
+            '_leading': {'double__under': 1, 'trailing_': 2.5, 3: 'int key'},
+            'uuid_value': uuid4(),
+            'elapsed_time': timedelta(seconds=90),
+            'naive_date': datetime(2022, 8, 1, 12, 30, 15, 123456),
+            'a_set': {'only_item'},
+        }
+
+    def test_camelize_key(self):
+        self.assertEqual(camelize_key('date_created'), 'dateCreated')
+        self.assertEqual(camelize_key('cross_street_1'), 'crossStreet1')
+        self.assertEqual(camelize_key('_leading'), 'Leading')
+        self.assertEqual(camelize_key('uuid'), 'uuid')
+
+    def test_renders_same_bytes_as_camel_case_renderer(self):
+        self.assertEqual(
+            CamelCaseJSONRenderer().render(self.payload),
+            RegexCamelCaseJSONRenderer().render(self.payload)
+        )
+
+    def test_renders_same_bytes_without_orjson(self):
+        with mock.patch('common.renderers.orjson', None):
+            self.assertEqual(
+                CamelCaseJSONRenderer().render(self.payload),
+                RegexCamelCaseJSONRenderer().render(self.payload)
+            )
+
+    def test_indented_render(self):
+        media_type = 'application/json; indent=4'
+        self.assertEqual(
+            CamelCaseJSONRenderer().render(self.payload, media_type),
+            RegexCamelCaseJSONRenderer().render(self.payload, media_type)
+        )
+
+    def test_rejects_non_finite_floats(self):
+        for value in [float('nan'), float('inf'), float('-inf')]:
+            payload = {'barters': [{'quantity': value}]}
+            with self.assertRaisesMessage(ValueError, 'Out of range float values are not JSON compliant'):
+                CamelCaseJSONRenderer().render(payload)
+            with self.assertRaises(ValueError):
+                RegexCamelCaseJSONRenderer().render(payload)
+
+        # without STRICT_JSON they're rendered as the library renderer does
+        payload = {'quantity': float('nan'), 'total': float('inf')}
+        with mock.patch.object(CamelCaseJSONRenderer, 'strict', False), \
+                mock.patch.object(RegexCamelCaseJSONRenderer, 'strict', False):
+            self.assertEqual(
+                CamelCaseJSONRenderer().render(payload),
+                RegexCamelCaseJSONRenderer().render(payload)
+            )
+
+    def test_render_none(self):
+        self.assertEqual(CamelCaseJSONRenderer().render(None), b'')
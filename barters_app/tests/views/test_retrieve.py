@@ -1,11 +1,15 @@
+from datetime import datetime, timedelta
 from weakref import ReferenceType
 from barters_app import views
 from barters_app.models import (Barter, MaterialBarter, PlantBarter, ProduceBarter,
-                                SeedBarter, ToolBarter)
+                                PostalCode, SeedBarter, ToolBarter)
 from django.contrib.auth import get_user_model
 from django.middleware.csrf import get_token as generate_csrf_token
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from barters_app.serializers import SeedBarterSerializer
 from barters_app.serializers import BarterSerializer
 from rest_framework import status
@@ -15,6 +19,10 @@ from users_app.serializers import UserDetailSerializer
 from users_app.utils import Token, generate_test_user
 from barters_app.tests.utils import enrich_request
 from barters_app.constants import BARTER_CONFIG
+from barters_app.filters import BARTER_FILTERS
+from barters_app.geo import haversine_km
+from barters_app.cache import BARTER_TYPES, CREATOR_VERSION, bump_version, get_versions
+from django.core.cache import cache
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework.test import force_authenticate
 
@@ -63,8 +71,10 @@ class TestBarterRetrieve(TestCase):
         self.access_token_2 = str(RefreshToken.for_user(self.user_2).access_token)
         self.access_token_3 = str(RefreshToken.for_user(self.user_3).access_token)
 
-        
-    def generate_request(self, barter_type=None, barter_id=None):
+    def setUp(self):
+        cache.clear()
+
+    def generate_request(self, barter_type=None, barter_id=None, params=None):
         '''return a Factory.get() request with the provided data'''
 
         kwargs = {}
@@ -76,11 +86,12 @@ class TestBarterRetrieve(TestCase):
 
         return self.factory.get(
             reverse('barters_app:retrieve', kwargs=kwargs),
+            data=params,
             format='json'
         )
 
     def test_retrieve_list_success(self):
-        request = self.generate_request()
+        request = self.generate_request(params={'page_size': 50})
 
         force_authenticate(request, self.user_1, token=self.access_token_1)
 
@@ -131,3 +142,568 @@ class TestBarterRetrieve(TestCase):
             response = views.retrieve(request, barter_type=barter_type, barter_id=invalid_barter_id)
             self.assertEqual(response.data['errors'][0], f"No barter found of type '{barter_type}' with id {invalid_barter_id}.")
 
+
+    def test_retrieve_list_paginated(self):
+        # walk every page of 10 following the 'next' cursors
+        seen = []
+        cursor = None
+        pages = 0
+        while True:
+            params = {'page_size': 10}
+            if cursor:
+                params['cursor'] = cursor
+            request = self.generate_request(params=params)
+            response = views.retrieve(request)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [barter['uuid'] for barter in response.data['barters']]
+            pages += 1
+
+            cursor = response.data['next']
+            if not cursor:
+                break
+
+        self.assertEqual(pages, 5)
+        self.assertEqual(len(seen), 45)
+        self.assertEqual(len(set(seen)), 45)
+
+        expected = list(
+            Barter.objects.order_by('-date_created', '-id').values_list('uuid', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_retrieve_list_paginated_prev(self):
+        request = self.generate_request(params={'page_size': 10})
+        first_page = views.retrieve(request)
+        self.assertIsNone(first_page.data['prev'])
+
+        request = self.generate_request(params={'page_size': 10, 'cursor': first_page.data['next']})
+        second_page = views.retrieve(request)
+        self.assertIsNotNone(second_page.data['prev'])
+
+        request = self.generate_request(params={'page_size': 10, 'cursor': second_page.data['prev']})
+        response = views.retrieve(request)
+
+        self.assertEqual(response.data['barters'], first_page.data['barters'])
+        self.assertIsNone(response.data['prev'])
+        self.assertEqual(response.data['next'], first_page.data['next'])
+
+    def test_retrieve_list_paginated_by_type(self):
+        for barter_type in BARTER_CONFIG:
+            request = self.generate_request(barter_type=barter_type, params={'page_size': 5})
+            response = views.retrieve(request, barter_type=barter_type)
+            self.assertEqual(len(response.data['barters']), 5)
+
+            request = self.generate_request(
+                barter_type=barter_type,
+                params={'page_size': 5, 'cursor': response.data['next']}
+            )
+            response = views.retrieve(request, barter_type=barter_type)
+            self.assertEqual(len(response.data['barters']), 4)
+            self.assertIsNone(response.data['next'])
+            for barter in response.data['barters']:
+                self.assertEqual(barter['barter_type'], barter_type)
+
+    def test_retrieve_list_paginated_invalid_cursor(self):
+        request = self.generate_request(params={'cursor': 'not-a-cursor'})
+        response = views.retrieve(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], ["Invalid cursor 'not-a-cursor'."])
+
+        request = self.generate_request(params={'page_size': 0})
+        response = views.retrieve(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], ["Invalid page size '0'."])
+
+    def test_retrieve_list_active(self):
+        expired_barter = SeedBarter.objects.first()
+        SeedBarter.objects.filter(id=expired_barter.id).update(
+            date_expires=timezone.now() - timedelta(days=1))
+
+        request = self.generate_request(params={'page_size': 50})
+        response = views.retrieve(request)
+        self.assertEqual(len(response.data['barters']), 44)
+        self.assertNotIn(expired_barter.uuid, [barter['uuid'] for barter in response.data['barters']])
+
+        response = views.retrieve(request, barter_type='seed')
+        self.assertEqual(len(response.data['barters']), 8)
+
+        # expired barters are still reachable on their own
+        response = views.retrieve(request, barter_type='seed', barter_id=expired_barter.uuid)
+        self.assertEqual(len(response.data['barters']), 1)
+
+        request = self.generate_request(params={'page_size': 50, 'active': 'false'})
+        response = views.retrieve(request)
+        self.assertEqual(len(response.data['barters']), 45)
+
+        # archived barters are never listed
+        SeedBarter.objects.filter(id=expired_barter.id).update(is_archived=True)
+        bump_version('seed')
+        response = views.retrieve(request)
+        self.assertEqual(len(response.data['barters']), 44)
+
+        request = self.generate_request(params={'active': 'maybe'})
+        response = views.retrieve(request)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], ["Invalid 'active' value 'maybe'. Choices are true, false."])
+
+    def test_retrieve_creator_private_fields(self):
+        request = self.generate_request()
+        response = views.retrieve(request)
+
+        creator = response.data['barters'][0]['creator']
+        self.assertIn('email', creator)
+        for field in ['password', 'user_permissions', 'groups', 'token_version']:
+            self.assertNotIn(field, creator)
+
+    def test_retrieve_query_count(self):
+        # the values() rows join the nested creator, so it doesn't cost a query per barter,
+        # the first query is the aggregate behind the ETag
+        for page_size in [1, 10, 45]:
+            request = self.generate_request(params={'page_size': page_size})
+            with self.assertNumQueries(2):
+                response = views.retrieve(request)
+            self.assertEqual(len(response.data['barters']), page_size)
+
+        for barter_type in BARTER_CONFIG:
+            request = self.generate_request(barter_type=barter_type, params={'page_size': 9})
+            with self.assertNumQueries(2):
+                views.retrieve(request, barter_type=barter_type)
+
+            barter_id = BARTER_CONFIG[barter_type]['model'].objects.first().uuid
+            request = self.generate_request(barter_type=barter_type, barter_id=barter_id)
+            with self.assertNumQueries(3):
+                views.retrieve(request, barter_type=barter_type, barter_id=barter_id)
+
+    def test_retrieve_cached(self):
+        request = self.generate_request(params={'page_size': 50})
+        response = views.retrieve(request)
+        self.assertEqual(len(response.data['barters']), 45)
+
+        with self.assertNumQueries(0):
+            cached_response = views.retrieve(request)
+        self.assertEqual(cached_response.data, response.data)
+
+        # different query strings are cached separately
+        request = self.generate_request(params={'page_size': 5})
+        with self.assertNumQueries(2):
+            response = views.retrieve(request)
+        self.assertEqual(len(response.data['barters']), 5)
+
+    def test_cache_versions_bumped_by_relevant_saves(self):
+        versions = get_versions(BARTER_TYPES + [CREATOR_VERSION])
+
+        # other models and user fields the listings don't show leave cached listings alone
+        PostalCode.objects.create(postal_code='99999', latitude=45.5, longitude=-122.6)
+        user = get_user_model().objects.get(id=self.user_1.id)
+        user.set_password('pass3413')
+        user.save()
+        user.revoke_tokens()
+        self.assertEqual(get_versions(BARTER_TYPES + [CREATOR_VERSION]), versions)
+
+        user.first_name = 'Renamed'
+        user.save()
+        self.assertNotEqual(get_versions([CREATOR_VERSION]), versions[-1:])
+        self.assertEqual(get_versions(BARTER_TYPES), versions[:-1])
+
+    def test_retrieve_cache_invalidated_by_type(self):
+        request = self.generate_request(params={'page_size': 50})
+        for barter_type in [None, 'seed', 'tool']:
+            views.retrieve(request, barter_type=barter_type)
+
+        seed_barter = SeedBarter.objects.first()
+        seed_barter.title = 'renamed seed barter'
+        seed_barter.save()
+
+        # listings that can contain seed barters are refreshed
+        with self.assertNumQueries(2):
+            response = views.retrieve(request)
+        self.assertIn('renamed seed barter', [barter['title'] for barter in response.data['barters']])
+
+        with self.assertNumQueries(2):
+            response = views.retrieve(request, barter_type='seed')
+        self.assertIn('renamed seed barter', [barter['title'] for barter in response.data['barters']])
+
+        # the tool listing is untouched
+        with self.assertNumQueries(0):
+            views.retrieve(request, barter_type='tool')
+
+        # re-typing a barter refreshes the listing it left
+        seed_barter = Barter.objects.get(id=seed_barter.id)
+        seed_barter.barter_type = 'tool'
+        seed_barter.save()
+        response = views.retrieve(request, barter_type='seed')
+        self.assertEqual(len(response.data['barters']), 8)
+        response = views.retrieve(request, barter_type='tool')
+        self.assertEqual(len(response.data['barters']), 10)
+
+        ToolBarter.objects.get(id=seed_barter.id).delete()
+        response = views.retrieve(request, barter_type='tool')
+        self.assertEqual(len(response.data['barters']), 9)
+
+    def test_retrieve_not_modified(self):
+        request = self.generate_request(params={'page_size': 5})
+        force_authenticate(request, self.user_1, token=self.access_token_1)
+        response = views.retrieve(request)
+        etag = response['ETag']
+
+        # an unchanged poll is answered from one aggregate query, before serializing
+        url = reverse('barters_app:retrieve')
+        request = self.factory.get(url, data={'page_size': 5}, HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, self.user_1, token=self.access_token_1)
+        with self.assertNumQueries(1):
+            response = views.retrieve(request)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # date_updated misses deletes and expiry, so If-Modified-Since alone isn't answered
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        # the ETag comes from the database alone, so another worker or a cold cache gives the same one
+        cache.clear()
+        request = self.generate_request(params={'page_size': 5})
+        force_authenticate(request, self.user_1, token=self.access_token_1)
+        self.assertEqual(views.retrieve(request)['ETag'], etag)
+
+        # cached anonymous responses keep their validators
+        for i in range(2):
+            request = self.factory.get(url, data={'page_size': 5}, HTTP_IF_NONE_MATCH=etag)
+            response = views.retrieve(request)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response['ETag'], etag)
+
+        # archiving changes the count, editing changes date_updated
+        barter = SeedBarter.objects.first()
+        Barter.objects.filter(id=barter.id).update(is_archived=True)
+        request = self.factory.get(url, data={'page_size': 5}, HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, self.user_1, token=self.access_token_1)
+        response = views.retrieve(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        barter = SeedBarter.objects.last()
+        barter.title = 'edited seed barter'
+        barter.save()
+        request = self.factory.get(url, data={'page_size': 5}, HTTP_IF_NONE_MATCH=etag)
+        response = views.retrieve(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        etag = response['ETag']
+
+        # listings nest the creator, so editing one changes the ETag and the cached data
+        barter.creator.first_name = 'edited'
+        barter.creator.save()
+        request = self.factory.get(url, data={'page_size': 5}, HTTP_IF_NONE_MATCH=etag)
+        response = views.retrieve(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertIn('edited', [barter['creator']['first_name'] for barter in response.data['barters']])
+
+    def test_retrieve_authenticated_not_cached(self):
+        request = self.generate_request(params={'page_size': 50})
+        force_authenticate(request, self.user_1, token=self.access_token_1)
+        views.retrieve(request)
+
+        with self.assertNumQueries(2):
+            views.retrieve(request)
+
+
+class TestBarterRetrieveNear(TestCase):
+    @classmethod
+    def setUpTestData(self):
+        self.factory = APIRequestFactory(enforce_csrf_checks=True)
+
+        user = get_user_model().objects.create_user(
+            email='user_near@gardenbarter.com',
+            password='pass3412'
+        )
+
+        self.places = {
+            'san francisco': (37.7749, -122.4194),
+            'oakland': (37.8044, -122.2712),
+            'san jose': (37.3382, -121.8863),
+            'taveuni east': (-16.85, 179.95),
+            'taveuni west': (-16.85, -179.95),
+            'no coordinates': ('', ''),
+        }
+
+        for title, (latitude, longitude) in self.places.items():
+            SeedBarter.objects.create(
+                creator=user,
+                title=title,
+                description=f'{title} barter description',
+                will_trade_for='item that will be traded',
+                is_free=False,
+                postal_code='77777',
+                latitude=latitude,
+                longitude=longitude,
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def retrieve_near(self, near, radius_km=None, barter_type=None):
+        params = {'near': near}
+        if radius_km is not None:
+            params['radius_km'] = radius_km
+        request = self.factory.get(reverse('barters_app:retrieve'), data=params)
+        return views.retrieve(request, barter_type=barter_type)
+
+    def test_retrieve_near(self):
+        response = self.retrieve_near('37.7749,-122.4194', 5)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([barter['title'] for barter in response.data['barters']], ['san francisco'])
+
+        response = self.retrieve_near('37.7749,-122.4194', 20, barter_type='seed')
+        self.assertEqual(
+            sorted(barter['title'] for barter in response.data['barters']),
+            ['oakland', 'san francisco']
+        )
+
+        response = self.retrieve_near('37.7749,-122.4194', 100)
+        self.assertEqual(len(response.data['barters']), 3)
+
+        # radius search across the antimeridian
+        response = self.retrieve_near('-16.85,180', 10)
+        self.assertEqual(
+            sorted(barter['title'] for barter in response.data['barters']),
+            ['taveuni east', 'taveuni west']
+        )
+
+    def test_retrieve_near_matches_haversine(self):
+        for near in [(37.7749, -122.4194), (37.5, -122.0), (-16.85, -179.99)]:
+            for radius_km in [1, 15, 50, 100]:
+                response = self.retrieve_near(f'{near[0]},{near[1]}', radius_km)
+                found = sorted(barter['title'] for barter in response.data['barters'])
+                expected = sorted(
+                    title for title, (latitude, longitude) in self.places.items()
+                    if latitude != '' and haversine_km(*near, latitude, longitude) <= radius_km
+                )
+                self.assertEqual(found, expected)
+
+    def test_retrieve_near_fail(self):
+        response = self.retrieve_near('37.7749')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], ["Invalid 'near' value '37.7749'. Expected 'latitude,longitude'."])
+
+        response = self.retrieve_near('97.7749,-122.4194')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.retrieve_near('37.7749,-122.4194', 500)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], ["'radius_km' must be greater than 0 and at most 100."])
+
+
+class TestBarterRetrieveSearch(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory(enforce_csrf_checks=True)
+
+        self.user = get_user_model().objects.create_user(
+            email='user_search@gardenbarter.com',
+            password='pass3412'
+        )
+
+        self.tomato_seeds = self.create_barter(SeedBarter, 'Tomato seeds', 'Heirloom seeds saved last fall')
+        self.tomato_plant = self.create_barter(PlantBarter, 'Cherry tomato starts', 'Healthy starts', common_name='tomato')
+        self.basil = self.create_barter(PlantBarter, 'Basil', 'Grows well next to tomatoes')
+        self.shovel = self.create_barter(ToolBarter, 'Shovel', 'Barely used', will_trade_for='tomato seedlings')
+        self.motherwort = self.create_barter(SeedBarter, 'Seed packet', 'Medicinal herb', genus='leonurus', species='cardiaca')
+
+    def create_barter(self, Model, title, description, will_trade_for='item that will be traded', **kwargs):
+        return Model.objects.create(
+            creator=self.user,
+            title=title,
+            description=description,
+            will_trade_for=will_trade_for,
+            is_free=False,
+            postal_code='77777',
+            **kwargs
+        )
+
+    def search(self, query, barter_type=None, **params):
+        request = self.factory.get(reverse('barters_app:retrieve'), data={'q': query, **params})
+        return views.retrieve(request, barter_type=barter_type)
+
+    def titles(self, response):
+        return [barter['title'] for barter in response.data['barters']]
+
+    def test_search(self):
+        response = self.search('tomato')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        titles = self.titles(response)
+        self.assertEqual(len(titles), 4)
+        # a match in the title outranks a match in the description
+        self.assertLess(titles.index('Tomato seeds'), titles.index('Basil'))
+
+        self.assertEqual(self.titles(self.search('leonurus cardiaca')), ['Seed packet'])
+        self.assertEqual(self.titles(self.search('tomato', barter_type='plant')), ['Cherry tomato starts', 'Basil'])
+
+        # the last word matches as a prefix while the user is typing
+        self.assertEqual(self.titles(self.search('sho')), ['Shovel'])
+
+        # search syntax typed by the user is ignored
+        self.assertEqual(self.titles(self.search('("shovel" -^')), ['Shovel'])
+
+    def test_search_index_follows_changes(self):
+        self.shovel.title = 'Spade'
+        self.shovel.will_trade_for = 'anything'
+        self.shovel.save()
+        self.basil.delete()
+
+        self.assertEqual(self.titles(self.search('shovel')), [])
+        self.assertEqual(self.titles(self.search('spade')), ['Spade'])
+        self.assertEqual(len(self.titles(self.search('tomato'))), 2)
+
+    def test_search_paginated(self):
+        expected = self.titles(self.search('tomato'))
+
+        seen = []
+        cursor = None
+        while True:
+            params = {'page_size': 1}
+            if cursor:
+                params['cursor'] = cursor
+            response = self.search('tomato', **params)
+            seen += self.titles(response)
+            cursor = response.data['next']
+            if not cursor:
+                break
+
+        self.assertEqual(seen, expected)
+
+        response = self.search('tomato', page_size=1, cursor=response.data['prev'])
+        self.assertEqual(self.titles(response), expected[-2:-1])
+
+    def test_search_fail(self):
+        response = self.search('!!!')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], ["Invalid search query '!!!'."])
+
+
+class TestBarterRetrieveFilters(TestCase):
+    @classmethod
+    def setUpTestData(self):
+        self.factory = APIRequestFactory(enforce_csrf_checks=True)
+
+        self.user_1 = get_user_model().objects.create_user(
+            email='user_filter_1@gardenbarter.com',
+            password='pass3412'
+        )
+        self.user_2 = get_user_model().objects.create_user(
+            email='user_filter_2@gardenbarter.com',
+            password='pass3412'
+        )
+
+        barters = [
+            (SeedBarter, self.user_1, True, 'PK', 'solanum'),
+            (SeedBarter, self.user_1, False, 'OZ', 'solanum'),
+            (SeedBarter, self.user_2, False, 'PK', 'ocimum'),
+            (PlantBarter, self.user_2, True, 'PL', 'ocimum'),
+            (ToolBarter, self.user_2, False, 'NA', None),
+        ]
+        for i, (Model, creator, is_free, quantity_units, genus) in enumerate(barters):
+            Model.objects.create(
+                creator=creator,
+                title=f'filter barter title {i}',
+                description=f'filter barter description {i}',
+                will_trade_for='item that will be traded',
+                is_free=is_free,
+                quantity_units=quantity_units,
+                postal_code='77777',
+                genus=genus,
+            )
+
+        # spread the creation dates one day apart, oldest first
+        for i, barter in enumerate(Barter.objects.order_by('id')):
+            Barter.objects.filter(id=barter.id).update(
+                date_created=timezone.make_aware(datetime(2022, 8, 1 + i, 12)))
+
+    def setUp(self):
+        cache.clear()
+
+    def retrieve(self, barter_type=None, **params):
+        request = self.factory.get(reverse('barters_app:retrieve'), data=params)
+        return views.retrieve(request, barter_type=barter_type)
+
+    def titles(self, response):
+        return sorted(int(barter['title'].split()[-1]) for barter in response.data['barters'])
+
+    def test_retrieve_filters(self):
+        self.assertEqual(self.titles(self.retrieve(is_free='true')), [0, 3])
+        self.assertEqual(self.titles(self.retrieve(is_free='false', barter_type='seed')), [1, 2])
+        self.assertEqual(self.titles(self.retrieve(quantity_units__in='PK,OZ')), [0, 1, 2])
+        # the unit labels shown in responses work as well as the stored codes
+        self.assertEqual(self.titles(self.retrieve(quantity_units='plant')), [3])
+        self.assertEqual(self.titles(self.retrieve(creator=self.user_2.id)), [2, 3, 4])
+        self.assertEqual(self.titles(self.retrieve(genus='solanum')), [0, 1])
+        self.assertEqual(self.titles(self.retrieve(date_created__gte='2022-08-03')), [2, 3, 4])
+        self.assertEqual(
+            self.titles(self.retrieve(date_created__gte='2022-08-02', date_created__lt='2022-08-04T12:00')),
+            [1, 2]
+        )
+        self.assertEqual(
+            self.titles(self.retrieve(is_free='false', quantity_units='PK', creator=self.user_2.id)),
+            [2]
+        )
+
+    def test_retrieve_filters_fail(self):
+        failures = {
+            'title': "Invalid filter 'title'.",
+            'genus__icontains': "Invalid filter 'genus__icontains'.",
+            'is_free': "Invalid 'is_free' value 'sometimes'.",
+            'quantity_units__in': "Invalid 'quantity_units' value 'XX'.",
+            'date_created__gte': "Invalid 'date_created' value 'yesterday'.",
+            'creator': "Invalid 'creator' value 'someone'.",
+        }
+        values = {
+            'title': 'test',
+            'genus__icontains': 'sol',
+            'is_free': 'sometimes',
+            'quantity_units__in': 'PK,XX',
+            'date_created__gte': 'yesterday',
+            'creator': 'someone',
+        }
+        for param, message in failures.items():
+            response = self.retrieve(**{param: values[param]})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertTrue(response.data['errors'][0].startswith(message), response.data['errors'][0])
+
+    def test_retrieve_filters_sql(self):
+        # every filter must compare the bare column so the database can use an index on it
+        with CaptureQueriesContext(connection) as queries:
+            self.retrieve(
+                barter_type='seed',
+                is_free='false',
+                quantity_units__in='PK,OZ',
+                creator=self.user_1.id,
+                date_created__gte='2022-08-01',
+            )
+
+        sql = queries.captured_queries[-1]['sql']
+        where = sql.split(' WHERE ')[1].split(' ORDER BY ')[0]
+
+        for predicate in [
+            '"barters_app_barter"."barter_type" = \'seed\'',
+            '"barters_app_barter"."is_free"',
+            '"barters_app_barter"."quantity_units" IN (',
+            '"barters_app_barter"."creator_id" = ',
+            '"barters_app_barter"."date_created" >= ',
+        ]:
+            self.assertIn(predicate, where)
+
+        for function in ['LIKE', 'LOWER(', 'UPPER(', 'CAST(', 'django_']:
+            self.assertNotIn(function, where)
+
+    def test_retrieve_filters_use_indexes(self):
+        now = timezone.now()
+        for field, lookups in BARTER_FILTERS.items():
+            value = {
+                'barter_type': 'seed', 'creator': self.user_1.id, 'is_free': True,
+                'quantity_units': 'PK', 'postal_code': '12345',
+                'genus': 'Solanum', 'species': 'lycopersicum', 'common_name': 'tomato',
+            }.get(field, now)
+            plan = Barter.objects.listed().filter(**{f'{field}__{lookups[0]}': value}).explain()
+            self.assertIn('USING INDEX barter_', plan, field)
@@ -161,3 +161,29 @@ class TestBarterUpdate(TestCase):
 
                 # self.assertIn('errors', response.data.keys())
                 # self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_barter_update_not_found(self):
+        barter_count = Barter.objects.count()
+        # the id of a tool barter isn't found as a seed barter
+        barter_id = ToolBarter.objects.first().id
+        request = self.generate_request('seed', barter_id, {'title': 'updated title'})
+        force_authenticate(request, user=self.user_1, token=self.access_token)
+
+        response = views.update(request, 'seed', barter_id)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['errors'], [f"No barter found of type 'seed' with id {barter_id}."])
+        # nothing is created in its place
+        self.assertEqual(Barter.objects.count(), barter_count)
+
+    def test_barter_update_retype(self):
+        barter_id = SeedBarter.objects.first().id
+        request = self.generate_request('seed', barter_id, {'barter_type': 'tool', 'dimensions': '1x1x5'})
+        force_authenticate(request, user=self.user_1, token=self.access_token)
+
+        response = views.update(request, 'seed', barter_id)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        barter = ToolBarter.objects.get(id=barter_id)
+        self.assertEqual(barter.dimensions, '1x1x5')
+        self.assertFalse(SeedBarter.objects.filter(id=barter_id).exists())
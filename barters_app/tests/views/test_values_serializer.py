@@ -0,0 +1,88 @@
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+from django.utils import timezone
+
+from barters_app.constants import BARTER_CONFIG
+from barters_app.models import BARTER_TYPE_CHOICES, QUANTITY_UNIT_CHOICES, Barter
+from barters_app.serializers import BarterSerializer, get_values_serializer
+from common.renderers import CamelCaseJSONRenderer
+from users_app.models import User
+
+# unicode, JSON escapes and separators, so byte level differences would show
+ALPHABET = 'abcXYZ019 _-"\\/\n\té€ 😀'
+
+
+class TestBarterValuesSerializer(TestCase):
+    '''the fast path renders the same bytes as the serializers for any barter'''
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.random = random.Random(2022)
+        creators = [cls.generate_user(i) for i in range(5)]
+        for i in range(200):
+            cls.generate_barter(i, cls.random.choice(creators))
+
+    @classmethod
+    def generate_text(cls, max_length=20, null=False):
+        if null and cls.random.random() < 0.3:
+            return None
+        return ''.join(cls.random.choice(ALPHABET) for _ in range(cls.random.randint(1, max_length)))
+
+    @classmethod
+    def generate_user(cls, i):
+        user = User.objects.create_user(email=f'user{i}@test.com', password='pass3412')
+        user.username = cls.generate_text(30, null=True)
+        user.first_name = cls.generate_text()
+        user.last_login = cls.random.choice([None, timezone.now() - timedelta(seconds=cls.random.randint(0, 10 ** 7))])
+        user.is_staff = cls.random.random() < 0.5
+        user.save()
+        return user
+
+    @classmethod
+    def generate_barter(cls, i, creator):
+        barter = Barter.objects.create(
+            creator=creator,
+            barter_type=cls.random.choice(BARTER_TYPE_CHOICES)[0],
+            title=cls.generate_text(),
+            description=cls.generate_text(200),
+            quantity=cls.random.choice([None, Decimal(cls.random.randint(0, 10 ** 6)) / 100]),
+            quantity_units=cls.random.choice(QUANTITY_UNIT_CHOICES)[0],
+            will_trade_for=cls.generate_text(),
+            is_free=cls.random.random() < 0.5,
+            postal_code=f'{cls.random.randint(0, 99999):05d}',
+            latitude=cls.random.choice([None, cls.random.uniform(-90, 90), 45.0, 1e-5]),
+            longitude=cls.random.choice([None, cls.random.uniform(-180, 180), -120]),
+            cross_street_1=cls.generate_text(null=True),
+            cross_street_2=cls.generate_text(null=True),
+            genus=cls.generate_text(null=True),
+            species=cls.generate_text(null=True),
+            common_name=cls.generate_text(null=True),
+            year_packaged=cls.random.choice([None, cls.random.randint(1990, 2022)]),
+            dimensions=cls.generate_text(null=True),
+        )
+        # date_expires is always set by save()
+        if cls.random.random() < 0.2:
+            Barter.objects.filter(id=barter.id).update(date_expires=None)
+
+    def assertSameOutput(self, serializer_class, barters):
+        values_serializer = get_values_serializer(serializer_class)
+        expected = serializer_class(barters.order_by('id'), many=True).data
+        data = values_serializer.serialize(values_serializer.get_values(barters.order_by('id')))
+
+        self.assertEqual(data, expected)
+        renderer = CamelCaseJSONRenderer()
+        self.assertEqual(renderer.render(data), renderer.render(expected))
+
+    def test_barter_serializer(self):
+        self.assertSameOutput(BarterSerializer, Barter.objects.all())
+
+    def test_typed_serializers(self):
+        for barter_type, config in BARTER_CONFIG.items():
+            with self.subTest(barter_type=barter_type):
+                self.assertSameOutput(config['serializer'], config['model'].objects.all())
+
+    def test_compiled_once(self):
+        self.assertIs(get_values_serializer(BarterSerializer), get_values_serializer(BarterSerializer))
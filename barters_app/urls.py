@@ -6,7 +6,10 @@ app_name="barters_app"
 
 urlpatterns=[
     path('create/', views.create, name='create'),
+    path('create/bulk/', views.bulk_create, name='bulk_create'), # create many barters in one transaction
     path('update/<str:barter_type>/<str:barter_id>/', views.update, name='update'), # retrieve a single barter of a single type
+    path('export/', views.export, name='export'), # stream all active barters
+    path('export/<str:barter_type>/', views.export, name='export'), # stream active barters of a single type
     path('', views.retrieve, name='retrieve'), # retrieve all barters of all types
     path('<str:barter_type>/', views.retrieve, name='retrieve'), # retrieve all barters of a single type
     path('<str:barter_type>/<str:barter_id>/', views.retrieve, name='retrieve'), # retrieve a single barter of a single type
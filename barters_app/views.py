@@ -1,22 +1,34 @@
 from datetime import timedelta
 
 from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max
 from django.utils import timezone
 from rest_framework import status
+from django.http import StreamingHttpResponse
 from rest_framework.decorators import (api_view, authentication_classes,
-                                       permission_classes)
+                                       permission_classes, renderer_classes)
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from barters_app.models import (Barter, SeedBarter, )
-from barters_app.serializers import BarterSerializer
+from barters_app.models import (Barter, PostalCode, SeedBarter, )
+from barters_app.serializers import BarterSerializer, get_values_serializer
 
+from barters_app.cache import bump_version, cache_anonymous_response
 from barters_app.constants import BARTER_CONFIG
+from barters_app.export import JSONLinesRenderer, export_barters
+from barters_app.filters import filter_barters
+from barters_app.geo import filter_near, parse_near
+from barters_app.search import filter_search
+from common.conditional import get_etag, get_not_modified_response, set_validators
+from common.pagination import CursorPaginator, InvalidCursor
+from common.renderers import CamelCaseJSONRenderer
 
 BARTER_REQUIRED_FIELDS = [
     field.name 
     for field in Barter._meta.fields
-    if not field.null and field.name not in ['id', 'barter_ptr']
+    if not field.null and field.name not in ['id', 'is_archived']
 ]
 
 @api_view(['POST'])
@@ -74,8 +86,100 @@ def create(request):
     return response
 
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_create(request):
+    '''
+    create many barters for the user in one transaction, from {'barters': [{'barterType': 'seed', ...}, ...]}.
+    Nothing is created unless every barter is valid, errors are listed per barter,
+    in the order they were sent, with {} for the valid ones.
+    '''
+    response = Response()
+
+    barters_data = request.data.get('barters')
+    max_barters = settings.BARTER_BULK_CREATE['MAX_BARTERS']
+
+    error = None
+    if not isinstance(barters_data, list) or not barters_data:
+        error = "Missing 'barters' list."
+    elif len(barters_data) > max_barters:
+        error = f"Too many barters, at most {max_barters} can be created at once."
+
+    if error:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        response.data = {
+            'errors': [error]
+        }
+        return response
+
+    # each barter type is validated by its own serializer, as a list
+    errors = [{} for _ in barters_data]
+    indexes_by_type = {}
+    for i, barter_data in enumerate(barters_data):
+        barter_type = barter_data.get('barter_type') if isinstance(barter_data, dict) else None
+        if barter_type in BARTER_CONFIG:
+            indexes_by_type.setdefault(barter_type, []).append(i)
+        else:
+            errors[i] = {
+                'barter_type': [f"Invalid 'barter_type': '{barter_type}'. Choices are {', '.join(BARTER_CONFIG)}."]
+            }
+
+    barters = [None for _ in barters_data]
+    for barter_type, indexes in indexes_by_type.items():
+        serializer = BARTER_CONFIG[barter_type]['serializer'](
+            data=[barters_data[i] for i in indexes], many=True)
+        if not serializer.is_valid():
+            for i, item_errors in zip(indexes, serializer.errors):
+                errors[i] = item_errors
+            continue
+
+        BarterModel = BARTER_CONFIG[barter_type]['model']
+        for i, validated_data in zip(indexes, serializer.validated_data):
+            barters[i] = BarterModel(**{**validated_data, 'barter_type': barter_type}, creator_id=request.user.id)
+
+    # bulk_create skips Barter.save(), so the barters are checked and completed here,
+    # with the postal code centroids for missing coordinates looked up together
+    centroids = PostalCode.get_centroids({barter.postal_code for barter in barters if barter})
+    for i, barter in enumerate(barters):
+        if barter:
+            try:
+                barter.prepare_for_save(centroids)
+            except ValueError as invalid_barter:
+                errors[i] = {'non_field_errors': [str(invalid_barter)]}
+
+    if any(errors):
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        response.data = {
+            'errors': errors
+        }
+        return response
+
+    with transaction.atomic():
+        for barter_type in indexes_by_type:
+            BARTER_CONFIG[barter_type]['model'].objects.bulk_create(
+                [barter for barter in barters if barter.barter_type == barter_type],
+                batch_size=settings.BARTER_BULK_CREATE['BATCH_SIZE'],
+            )
+
+    # bulk_create sends no post_save signals, so cached listings are invalidated here
+    for barter_type in indexes_by_type:
+        bump_version(barter_type)
+
+    creator = get_user_model().objects.get(id=request.user.id)
+    for barter in barters:
+        barter.creator = creator
+
+    response.status_code = status.HTTP_201_CREATED
+    response.data = {
+        'message': f'{len(barters)} barters created successfully!',
+        'barters': [BARTER_CONFIG[barter.barter_type]['serializer'](barter).data for barter in barters],
+    }
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@cache_anonymous_response
 def retrieve(request, barter_type=None, barter_id=None):
     response = Response()
 
@@ -102,6 +206,41 @@ def retrieve(request, barter_type=None, barter_id=None):
         if len(barters) == 0:
             error = f"No barter found of type '{barter_type}' with id {barter_id}."
 
+    # listings leave out expired barters unless they're asked for with active=false
+    active = request.query_params.get('active', 'true')
+    if not barter_id and not error:
+        if active == 'true':
+            barters = barters.active()
+        elif active == 'false':
+            barters = barters.listed()
+        else:
+            error = f"Invalid 'active' value '{active}'. Choices are true, false."
+
+    if not barter_id and not error:
+        try:
+            barters = filter_barters(barters, request.query_params)
+        except ValueError as invalid_filter:
+            error = str(invalid_filter)
+
+    near = request.query_params.get('near')
+    if near and not error:
+        try:
+            latitude, longitude, radius_km = parse_near(
+                near, request.query_params.get('radius_km'))
+            barters = filter_near(barters, latitude, longitude, radius_km)
+        except ValueError as invalid_near:
+            error = str(invalid_near)
+
+    # rank text search results by relevance instead of date
+    ordering = ('-date_created', '-id')
+    query = request.query_params.get('q')
+    if query and not error:
+        try:
+            barters = filter_search(barters, query, connection)
+            ordering = ('rank', 'id')
+        except ValueError as invalid_query:
+            error = str(invalid_query)
+
     if error:
         response.status_code = status.HTTP_400_BAD_REQUEST
         response.data = {
@@ -109,18 +248,62 @@ def retrieve(request, barter_type=None, barter_id=None):
         }
     
     else:
-        # apply query filters / pagination...
-        # 
-        barters=barters.order_by('-date_created')
+        # one aggregate over the filtered barters tells whether the client's copy is current,
+        # deletes, archiving and expiry change the count, edits move date_updated and
+        # edits to a creator move its date_updated. Only database state goes in,
+        # so every worker gives the same ETag. No Last-Modified is sent,
+        # since date_updated alone misses all but barter edits
+        validators = barters.aggregate(
+            date_updated=Max('date_updated'),
+            creator_updated=Max('creator__date_updated'),
+            count=Count('id'),
+        )
+        set_validators(
+            response,
+            get_etag(validators['count'], validators['date_updated'], validators['creator_updated']),
+        )
+        not_modified_response = get_not_modified_response(request, response)
+        if not_modified_response:
+            return not_modified_response
+
+        # listings are read only, so rows are built from values() dicts
+        # by the fast path instead of model instances going through the serializer
+        values_serializer = get_values_serializer(barter_serializer)
+
+        paginator = CursorPaginator(request, ordering=ordering)
+        try:
+            barters = paginator.paginate_queryset(values_serializer.get_values(barters, *paginator.fields))
+        except InvalidCursor as invalid_cursor:
+            response.status_code = status.HTTP_400_BAD_REQUEST
+            response.data = {
+                'errors': [str(invalid_cursor)]
+            }
+            return response
 
+        response.data = paginator.get_envelope('barters', values_serializer.serialize(barters))
 
-        barter_serializer = barter_serializer(barters, many=True)
+    return response
 
-        response.data = {
-            'barters': barter_serializer.data
-        }
 
-    return response
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@renderer_classes([CamelCaseJSONRenderer, JSONLinesRenderer])
+def export(request, barter_type=None):
+    '''
+    stream every active barter, as one JSON array or with ?format=jsonl as JSON Lines.
+    Rows are rendered as they are read, so memory use doesn't grow with the table.
+    '''
+    if barter_type and barter_type not in BARTER_CONFIG:
+        return Response(
+            {'errors': [f"Invalid 'barter_type': '{barter_type}'"]},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    renderer = request.accepted_renderer
+    return StreamingHttpResponse(
+        export_barters(barter_type, export_format=renderer.format),
+        content_type=renderer.media_type,
+    )
 
 
 @api_view(['POST'])
@@ -138,7 +321,20 @@ def update(request, barter_type, barter_id):
         BarterSerializer = BARTER_CONFIG[barter_type]['serializer']
 
         barter = BarterModel.objects.filter(id=barter_id).first()
-
+        if barter is None:
+            response.status_code = status.HTTP_404_NOT_FOUND
+            response.data = {
+                'errors': [f"No barter found of type '{barter_type}' with id {barter_id}."]
+            }
+            return response
+
+        # proxies save their own barter_type, so a re-typed barter is loaded
+        # as the new type's proxy, through the manager that doesn't filter on type
+        updated_barter_type = request.data.get('barter_type', barter_type)
+        if updated_barter_type != barter_type and updated_barter_type in BARTER_CONFIG:
+            BarterModel = BARTER_CONFIG[updated_barter_type]['model']
+            BarterSerializer = BARTER_CONFIG[updated_barter_type]['serializer']
+            barter = BarterModel._base_manager.get(id=barter_id)
 
         barter_serializer = BarterSerializer(barter, data=request.data, partial=True)
 
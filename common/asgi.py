@@ -0,0 +1,55 @@
+import django
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIHandler
+
+
+class StreamingASGIHandler(ASGIHandler):
+    '''
+    ASGIHandler that reads streaming responses off the event loop.
+
+    Django 4.0 iterates a StreamingHttpResponse inside the event loop, so content
+    generated from the database, like barter exports, raises SynchronousOnlyOperation.
+    Here each part is fetched with sync_to_async on the thread that ran the view,
+    which keeps using the view's database connection and leaves the loop free between parts.
+    '''
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': self.get_response_headers(response),
+        })
+
+        parts = iter(response)
+        next_part = sync_to_async(next, thread_sensitive=True)
+        while True:
+            part = await next_part(parts, None)
+            if part is None:
+                break
+            for chunk, _ in self.chunk_bytes(part):
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+        await send({'type': 'http.response.body'})
+
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+    def get_response_headers(self, response):
+        '''the response's headers and cookies as ASGI header pairs, as ASGIHandler sends them'''
+        response_headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+            response_headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            response_headers.append((b'Set-Cookie', cookie.output(header='').encode('ascii').strip()))
+        return response_headers
+
+
+def get_streaming_asgi_application():
+    '''get_asgi_application() serving a StreamingASGIHandler'''
+    django.setup(set_prefix=False)
+    return StreamingASGIHandler()
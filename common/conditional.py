@@ -0,0 +1,33 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+
+def get_etag(*parts):
+    '''return a quoted ETag built from the string form of each part'''
+    return quote_etag(hashlib.md5('|'.join(str(part) for part in parts).encode()).hexdigest())
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def get_not_modified_response(request, response):
+    '''
+    return a 304 carrying the validators set on the response when the
+    client's copy, named by If-None-Match or If-Modified-Since, is still current.
+    Otherwise return None. If-None-Match wins when both are sent, as in RFC 7232.
+    '''
+    conditional_response = get_conditional_response(
+        request,
+        etag=response.get('ETag'),
+        last_modified=parse_http_date_safe(response.get('Last-Modified')),
+        response=response,
+    )
+    if conditional_response is response:
+        return None
+    return conditional_response
@@ -0,0 +1,189 @@
+import base64
+import json
+from datetime import datetime
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import DateTimeField, Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class CursorPaginator:
+    '''
+    Keyset pagination over a queryset, newest first by (date_created, id) by default.
+
+    Cursors are opaque, url-safe strings encoding the position of the
+    row at the edge of a page and the direction to read in from there,
+    so every page is a single indexed range scan no matter how deep it is.
+
+    request - DRF Request; reads the 'cursor' and 'page_size' query params
+    ordering - tuple of field or annotation names in order_by() syntax, the last one must be unique
+    page_size - overrides settings.PAGINATION['PAGE_SIZE']
+    '''
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def __init__(self, request, ordering=('-date_created', '-id'), page_size=None):
+        self.request = request
+        self.ordering = ordering
+        self.page_size = page_size or settings.PAGINATION['PAGE_SIZE']
+        self.max_page_size = settings.PAGINATION['MAX_PAGE_SIZE']
+        self.next_cursor = None
+        self.prev_cursor = None
+
+    @property
+    def fields(self):
+        return [field.lstrip('-') for field in self.ordering]
+
+    def get_page_size(self):
+        page_size = self.request.query_params.get(self.page_size_query_param)
+        if page_size is None:
+            return self.page_size
+
+        try:
+            page_size = int(page_size)
+        except ValueError:
+            raise InvalidCursor(f"Invalid page size '{page_size}'.")
+
+        if page_size < 1:
+            raise InvalidCursor(f"Invalid page size '{page_size}'.")
+
+        return min(page_size, self.max_page_size)
+
+    def encode_cursor(self, item, reverse=False):
+        position = [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in self.get_position(item)
+        ]
+        data = json.dumps({'p': position, 'r': reverse}, separators=(',', ':')).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+    def decode_cursor(self, cursor, model):
+        try:
+            data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            cursor_data = json.loads(data)
+            position = cursor_data['p']
+            if len(position) != len(self.ordering):
+                raise ValueError
+
+            return (
+                [self.decode_value(model, field, value) for field, value in zip(self.fields, position)],
+                bool(cursor_data['r']),
+            )
+        except (TypeError, ValueError, KeyError):
+            raise InvalidCursor(f"Invalid cursor '{cursor}'.")
+
+    def decode_value(self, model, field, value):
+        try:
+            model_field = model._meta.get_field(field)
+        except FieldDoesNotExist:
+            # annotations such as search ranks are stored as plain JSON values
+            return value
+
+        if isinstance(model_field, DateTimeField):
+            return datetime.fromisoformat(value)
+        return value
+
+    def get_position(self, item):
+        '''return the ordering values of a model instance or values() dict'''
+        if isinstance(item, dict):
+            return [item[field] for field in self.fields]
+        return [getattr(item, field) for field in self.fields]
+
+    def get_keyset_filter(self, ordering, position):
+        '''rows strictly after the position when sorted by ordering'''
+        keyset_filter = Q()
+        for i, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal_fields = {
+                name.lstrip('-'): value
+                for name, value in zip(ordering[:i], position[:i])
+            }
+            keyset_filter |= Q(**equal_fields, **{f'{field.lstrip("-")}__{lookup}': position[i]})
+        return keyset_filter
+
+    def get_cursor(self, model):
+        '''return the position and direction the request asks to read from, position is None on the first page'''
+        cursor = self.request.query_params.get(self.cursor_query_param)
+        if cursor:
+            return self.decode_cursor(cursor, model)
+        return None, False
+
+    def paginate_queryset(self, queryset):
+        '''return a list with one page of the queryset and set next_cursor / prev_cursor'''
+        page_size = self.get_page_size()
+
+        position, reverse = self.get_cursor(queryset.model)
+        has_cursor = position is not None
+
+        ordering = list(self.ordering)
+        if reverse:
+            # walk back towards the start, then flip the page into display order
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+
+        if has_cursor:
+            queryset = queryset.filter(self.get_keyset_filter(ordering, position))
+        queryset = queryset.order_by(*ordering)
+
+        page = list(queryset[:page_size + 1])
+        has_more = len(page) > page_size
+        page = page[:page_size]
+
+        if reverse:
+            page.reverse()
+            has_next, has_prev = has_cursor, has_more
+        else:
+            has_next, has_prev = has_more, has_cursor
+
+        self.next_cursor = self.encode_cursor(page[-1]) if page and has_next else None
+        self.prev_cursor = self.encode_cursor(page[0], reverse=True) if page and has_prev else None
+
+        return page
+
+    def get_envelope(self, key, data):
+        '''wrap serialized page data with the cursors for the neighbouring pages'''
+        return {
+            key: data,
+            'next': self.next_cursor,
+            'prev': self.prev_cursor,
+        }
+
+
+class HistoryPaginator(CursorPaginator):
+    '''
+    Keyset pagination that pages back from the newest row, for histories such as messages.
+
+    Instead of a single 'cursor' param the request passes 'before' to read older rows
+    or 'after' to read newer ones. The envelope's 'after' always points at the newest
+    row on the page, so a client can poll it for rows added since.
+    '''
+
+    before_query_param = 'before'
+    after_query_param = 'after'
+
+    def get_cursor(self, model):
+        for query_param, reverse in [(self.before_query_param, False), (self.after_query_param, True)]:
+            cursor = self.request.query_params.get(query_param)
+            if cursor:
+                position, _ = self.decode_cursor(cursor, model)
+                return position, reverse
+        return None, False
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page:
+            self.prev_cursor = self.encode_cursor(page[0], reverse=True)
+        else:
+            self.prev_cursor = self.request.query_params.get(self.after_query_param)
+        return page
+
+    def get_envelope(self, key, data):
+        return {
+            key: data,
+            self.before_query_param: self.next_cursor,
+            self.after_query_param: self.prev_cursor,
+        }
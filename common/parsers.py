@@ -0,0 +1,93 @@
+import json
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+from djangorestframework_camel_case.settings import api_settings as camel_case_settings
+from djangorestframework_camel_case import util as camel_case_util
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import DataAndFiles, FormParser, JSONParser, MultiPartParser
+
+UNDERSCOREIZE_OPTIONS = camel_case_settings.JSON_UNDERSCOREIZE
+IGNORE_FIELDS = UNDERSCOREIZE_OPTIONS.get('ignore_fields') or ()
+UNDERSCOREIZE_RE = camel_case_util.get_underscoreize_re(UNDERSCOREIZE_OPTIONS)
+
+# request bodies carry the serializers' field names plus the keys of nested
+# objects such as formData, the bound keeps arbitrary client keys from growing it without limit
+UNDERSCOREIZE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=UNDERSCOREIZE_CACHE_SIZE)
+def underscoreize_key(key):
+    '''camelCase to snake_case, the same conversion as djangorestframework_camel_case'''
+    return UNDERSCOREIZE_RE.sub(r'\1_\2', key).lower()
+
+
+def underscoreize(data):
+    '''
+    return parsed request data with every key snake_cased. Gives the same
+    result as djangorestframework_camel_case.util.underscoreize, looking
+    each key up in a memoized map instead of running the regex on it again.
+    '''
+    if isinstance(data, (str, int, float, bool, type(None))):
+        return data
+
+    if type(data) is dict:
+        underscoreized = {}
+        for key, value in data.items():
+            new_key = underscoreize_key(key) if isinstance(key, str) else key
+            if IGNORE_FIELDS and (key in IGNORE_FIELDS or new_key in IGNORE_FIELDS):
+                underscoreized[new_key] = value
+            else:
+                underscoreized[new_key] = underscoreize(value)
+        return underscoreized
+
+    if type(data) is list:
+        return [underscoreize(item) for item in data]
+
+    if type(data) is QueryDict:
+        underscoreized = QueryDict(mutable=True)
+        for key, values in data.lists():
+            underscoreized.setlist(underscoreize_key(key), values)
+        return underscoreized
+
+    if type(data) is MultiValueDict:
+        underscoreized = MultiValueDict()
+        for key, values in data.lists():
+            underscoreized.setlist(underscoreize_key(key), values)
+        return underscoreized
+
+    # anything else, e.g. a dict subclass, takes the library's general path
+    return camel_case_util.underscoreize(data, **UNDERSCOREIZE_OPTIONS)
+
+
+class CamelCaseJSONParser(JSONParser):
+    '''
+    Drop-in replacement for djangorestframework_camel_case's CamelCaseJSONParser
+    giving the same data. The body is still parsed by json: orjson reads integers
+    over 64 bits as floats, and the keys, not the parsing, were the slow part.
+    '''
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            return underscoreize(json.loads(stream.read().decode(encoding)))
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
+
+
+class CamelCaseFormParser(FormParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        return underscoreize(super().parse(stream, media_type, parser_context))
+
+
+class CamelCaseMultiPartParser(MultiPartParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        data_and_files = super().parse(stream, media_type, parser_context)
+        return DataAndFiles(
+            underscoreize(data_and_files.data),
+            underscoreize(data_and_files.files),
+        )
@@ -0,0 +1,103 @@
+from functools import lru_cache
+from math import isfinite
+
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from djangorestframework_camel_case.settings import api_settings as camel_case_settings
+from djangorestframework_camel_case.util import camelize_re, underscore_to_camel
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# responses only use a few hundred distinct keys, the bound keeps
+# keys taken from user data from growing the cache without limit
+CAMELIZE_CACHE_SIZE = 4096
+
+# types json encodes as they are, checked before anything slower
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+
+@lru_cache(maxsize=CAMELIZE_CACHE_SIZE)
+def camelize_key(key):
+    '''snake_case to camelCase, the same conversion as djangorestframework_camel_case'''
+    if '_' not in key:
+        return key
+    return camelize_re.sub(underscore_to_camel, key)
+
+
+def camelize(data, ignore_fields=(), allow_nan=True):
+    '''
+    return data with every dict key camelCased, as plain dicts and lists.
+    Gives the same keys and values as djangorestframework_camel_case.util.camelize
+    without its per-key regex, OrderedDict copies and iterability checks.
+    With allow_nan=False, NaN and infinite floats raise ValueError like json.dumps does.
+    '''
+    if isinstance(data, SCALAR_TYPES):
+        if not allow_nan and data.__class__ is float and not isfinite(data):
+            raise ValueError('Out of range float values are not JSON compliant')
+        return data
+
+    if isinstance(data, dict):
+        camelized = {}
+        for key, value in data.items():
+            if isinstance(key, Promise):
+                key = force_str(key)
+            new_key = camelize_key(key) if isinstance(key, str) else key
+            if ignore_fields and (key in ignore_fields or new_key in ignore_fields):
+                camelized[new_key] = value
+            else:
+                camelized[new_key] = camelize(value, ignore_fields, allow_nan)
+        return camelized
+
+    if isinstance(data, (list, tuple)):
+        return [camelize(item, ignore_fields, allow_nan) for item in data]
+
+    if isinstance(data, Promise):
+        return force_str(data)
+
+    try:
+        items = iter(data)
+    except TypeError:
+        # dates, decimals, uuids... are left to the encoder
+        return data
+    return [camelize(item, ignore_fields, allow_nan) for item in items]
+
+
+class CamelCaseJSONRenderer(JSONRenderer):
+    '''
+    Drop-in replacement for djangorestframework_camel_case's CamelCaseJSONRenderer
+    rendering the same bytes: keys are converted once each and memoized,
+    and the payload is encoded with orjson when it's installed. The one difference
+    is orjson spelling float exponents without the sign or padding, 1e16 for 1e+16.
+    orjson writes NaN and infinity as null, so under STRICT_JSON they're rejected
+    while camelizing, raising ValueError as JSONRenderer does, and without it
+    the standard library renders them.
+    '''
+    ignore_fields = camel_case_settings.JSON_UNDERSCOREIZE.get('ignore_fields') or ()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        if orjson is None or not self.strict or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(camelize(data, self.ignore_fields), accepted_media_type, renderer_context)
+
+        data = camelize(data, self.ignore_fields, allow_nan=False)
+
+        try:
+            # orjson's own datetime format differs from DRF's, so those go through the DRF encoder
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+            )
+        except orjson.JSONEncodeError:
+            # e.g. integers too big for 64 bits, which the standard library handles
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # escaped like JSONRenderer does, they end lines in javascript string literals
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
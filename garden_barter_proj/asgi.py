@@ -9,8 +9,28 @@ https://docs.djangoproject.com/en/4.0/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+from common.asgi import get_streaming_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'garden_barter_proj.settings')
 
-application = get_asgi_application()
+# streams responses such as barter exports without touching the database from the event loop
+django_application = get_streaming_asgi_application()
+
+# imported once django is set up
+from messages_app.consumers import MessageSocket  # noqa: E402
+
+# websocket paths, everything else is served by django
+websocket_routes = {
+    '/inbox/ws/': MessageSocket(),
+}
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        websocket_application = websocket_routes.get(scope['path'])
+        if websocket_application is None:
+            await send({'type': 'websocket.close'})
+            return
+        return await websocket_application(scope, receive, send)
+
+    return await django_application(scope, receive, send)
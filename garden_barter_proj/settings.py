@@ -135,36 +135,118 @@ AUTH_USER_MODEL = 'users_app.User'
 # define default authentication method in DRF
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users_app.authentication.StatelessJWTAuthentication',
     ],
 
     'DEFAULT_RENDERER_CLASSES': (
-        'djangorestframework_camel_case.render.CamelCaseJSONRenderer',
+        'common.renderers.CamelCaseJSONRenderer',
         'djangorestframework_camel_case.render.CamelCaseBrowsableAPIRenderer',
     ),
 
     'DEFAULT_PARSER_CLASSES': (
-        'djangorestframework_camel_case.parser.CamelCaseFormParser',
-        'djangorestframework_camel_case.parser.CamelCaseMultiPartParser',
-        'djangorestframework_camel_case.parser.CamelCaseJSONParser',
+        'common.parsers.CamelCaseFormParser',
+        'common.parsers.CamelCaseMultiPartParser',
+        'common.parsers.CamelCaseJSONParser',
     ),
 }
 
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+# e.g. DJANGO_CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+#      DJANGO_CACHE_LOCATION=redis://127.0.0.1:6379
+
+CACHES = {
+    'default': {
+        'BACKEND': decouple.config(
+            'DJANGO_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': decouple.config('DJANGO_CACHE_LOCATION', default='garden-barter'),
+    }
+}
+
+# seconds an anonymous barter listing is cached for,
+# bounds how long a barter that just expired can still be listed.
+# Saves invalidate cached listings through version keys in the default cache. With the
+# process-local LocMemCache each process keeps its own versions and listings, so a save only
+# invalidates the listings cached by the process that made it, and the others serve theirs until
+# this timeout. Configure a shared backend above when running several processes
+BARTER_CACHE_TIMEOUT = 60
+
+# delivers new messages to open WebSockets, the in-process broker only
+# reaches clients connected to the same ASGI worker
+MESSAGES_BROKER = decouple.config(
+    'MESSAGES_BROKER', default='messages_app.realtime.InProcessBroker')
+
+# most seconds a long-poll for new messages is held open
+MESSAGES_LONG_POLL_TIMEOUT = 25
+
+# users_app.authentication.StatelessJWTAuthentication keeps the users it loads in memory,
+# TIMEOUT (seconds) bounds how long a change made by another process goes unseen
+USER_CACHE = {
+    'TIMEOUT': 30,
+    'MAX_SIZE': 1000,
+    # seconds a user's token version is cached for StatelessJWTAuthentication.
+    # Revoking deletes the cached version, which only reaches every process through a shared
+    # cache, so with the process-local default it's read from the database on each request
+    'TOKEN_VERSION_TIMEOUT': 0 if CACHES['default']['BACKEND'].endswith('LocMemCache') else 60,
+}
+
+# keyset pagination defaults for list endpoints (see common.pagination)
+PAGINATION = {
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 100,
+}
+
+# barters/create/bulk/ accepts at most MAX_BARTERS barters per request
+# and inserts them BATCH_SIZE rows per INSERT statement
+BARTER_BULK_CREATE = {
+    'MAX_BARTERS': 500,
+    'BATCH_SIZE': 100,
+}
+
+# token lifetimes, chosen with DJANGO_TOKEN_LIFETIME_PROFILE.
+# Every expired access token costs the client a token/refresh/ round trip and,
+# with BLACKLIST_AFTER_ROTATION, database writes; compare the profiles under load with
+#   python manage.py benchmark_token_refresh
+TOKEN_LIFETIME_PROFILES = {
+    'instant': {
+        'ACCESS_TOKEN_LIFETIME': timedelta(seconds=1),
+        'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    },
+    'short': {
+        'ACCESS_TOKEN_LIFETIME': timedelta(minutes=5),
+        'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    },
+    'standard': {
+        'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
+        'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    },
+}
+TOKEN_LIFETIME_PROFILE = decouple.config(
+    'DJANGO_TOKEN_LIFETIME_PROFILE', default='instant',
+    cast=decouple.Choices(list(TOKEN_LIFETIME_PROFILES)),
+)
+
 SIMPLE_JWT = {
-    # 'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
-    'ACCESS_TOKEN_LIFETIME': timedelta(seconds=1),
-    'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
+    **TOKEN_LIFETIME_PROFILES[TOKEN_LIFETIME_PROFILE],
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
     'AUTH_HEADER_TYPES': ('Bearer', ),
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken', ),
+    # token pairs carry email, is_active and token_version claims, see users_app.tokens
+    'TOKEN_OBTAIN_SERIALIZER': 'users_app.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users_app.serializers.ClaimsTokenRefreshSerializer',
 }
 
-# The blacklist app also provides a management command, 
-# flushexpiredtokens, which will delete any tokens from 
-# the outstanding list and blacklist that have expired. 
-# You should set up a cron job on your server or hosting 
-# platform which runs this command daily.
+# Expired tokens are pruned from the outstanding list and blacklist
+# by users_app.pruning, in a background thread of the web process,
+# at most once every INTERVAL seconds (0 disables it). Each run deletes
+# BATCH_SIZE tokens at a time until none are left or TIME_BUDGET seconds have passed.
+# The prune_tokens command does the same on demand.
+TOKEN_PRUNING = {
+    'INTERVAL': decouple.config('TOKEN_PRUNING_INTERVAL', default=300, cast=int),
+    'BATCH_SIZE': 500,
+    'TIME_BUDGET': 10,
+}
 
 
 # CSRF_USE_SESSIONS = False
@@ -0,0 +1,84 @@
+import asyncio
+import json
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from users_app.authentication import StatelessJWTAuthentication
+
+from .realtime import get_broker, get_user_channel
+
+# close codes in the 4000-4999 range are free for applications to use
+CLOSE_UNAUTHORIZED = 4401
+
+
+@sync_to_async
+def authenticate(raw_token):
+    '''
+    return the active user an access token belongs to and the validated token,
+    or (None, None) if it's invalid or revoked
+    '''
+    authentication = StatelessJWTAuthentication()
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token), validated_token
+    except AuthenticationFailed:
+        return None, None
+
+
+@sync_to_async
+def is_token_current(validated_token):
+    '''whether a token accepted earlier still hasn't expired or been revoked'''
+    try:
+        # a token's own current_time is when it was validated
+        validated_token.check_exp(current_time=aware_utcnow())
+        StatelessJWTAuthentication().get_user(validated_token)
+    except (TokenError, AuthenticationFailed):
+        return False
+    return True
+
+
+class MessageSocket:
+    '''
+    ASGI WebSocket application pushing each new message to its sender and recipient.
+
+    Browsers can't set headers on a WebSocket handshake,
+    so the access token is passed as ?token=<access token>.
+    Events are JSON text frames, e.g. {"type": "message", "message": {...}},
+    with the message shaped like the REST responses. The token is checked again
+    before each push, so the socket is closed once it expires or is revoked.
+    '''
+
+    async def __call__(self, scope, receive, send):
+        event = await receive()
+        if event['type'] != 'websocket.connect':
+            return
+
+        token = parse_qs(scope.get('query_string', b'').decode()).get('token', [''])[-1]
+        user, validated_token = await authenticate(token) if token else (None, None)
+        if user is None:
+            await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+            return
+
+        with get_broker().subscribe(get_user_channel(user.id)) as subscription:
+            await send({'type': 'websocket.accept'})
+
+            forward = asyncio.ensure_future(self.forward(subscription, send, validated_token))
+            try:
+                # clients only listen, anything they send is ignored until they disconnect
+                while (await receive())['type'] != 'websocket.disconnect':
+                    pass
+            finally:
+                forward.cancel()
+
+    async def forward(self, subscription, send, validated_token):
+        while True:
+            event = await subscription.get()
+            if not await is_token_current(validated_token):
+                await send({'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+                return
+            await send({'type': 'websocket.send', 'text': json.dumps(event, cls=JSONEncoder)})
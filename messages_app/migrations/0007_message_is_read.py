@@ -0,0 +1,18 @@
+# Generated by Django 4.0.4 on 2026-10-18 16:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messages_app', '0006_conversation_uuid_message_uuid'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='is_read',
+            field=models.BooleanField(default=False, verbose_name='is read'),
+        ),
+    ]
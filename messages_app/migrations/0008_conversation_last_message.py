@@ -0,0 +1,64 @@
+# Generated by Django 4.0.4 on 2026-10-18 16:33
+
+from django.db import migrations, models
+from django.db.models import Count, F, Q
+
+
+def fill_last_messages(apps, schema_editor):
+    '''set the new columns from the messages already in each conversation'''
+    Conversation = apps.get_model('messages_app', 'Conversation')
+    Message = apps.get_model('messages_app', 'Message')
+
+    conversations = Conversation.objects.annotate(
+        sender_unread=Count('messages', filter=Q(
+            messages__recipient=F('sender'), messages__is_read=False)),
+        recipient_unread=Count('messages', filter=Q(
+            messages__recipient=F('recipient'), messages__is_read=False)),
+    )
+    for conversation in conversations.iterator():
+        last_message = Message.objects.filter(
+            conversation=conversation).order_by('-date_received', '-id').first()
+        if not last_message:
+            continue
+
+        Conversation.objects.filter(id=conversation.id).update(
+            last_message_at=last_message.date_received,
+            last_message_preview=last_message.body[:100],
+            sender_unread_count=conversation.sender_unread,
+            recipient_unread_count=conversation.recipient_unread,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messages_app', '0007_message_is_read'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='last message at'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='last_message_preview',
+            field=models.CharField(blank=True, default='', max_length=100, verbose_name='last message preview'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='recipient_unread_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='recipient unread count'),
+        ),
+        migrations.AddField(
+            model_name='conversation',
+            name='sender_unread_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='sender unread count'),
+        ),
+        migrations.RunPython(fill_last_messages, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='conversation',
+            index=models.Index(fields=['inbox', '-last_message_at', '-id'], name='conversation_inbox_recent_idx'),
+        ),
+    ]
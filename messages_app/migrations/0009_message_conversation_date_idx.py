@@ -0,0 +1,17 @@
+# Generated by Django 4.0.4 on 2026-10-18 16:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messages_app', '0008_conversation_last_message'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['conversation', 'date_received', 'id'], name='message_conversation_date_idx'),
+        ),
+    ]
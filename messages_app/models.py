@@ -1,8 +1,12 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Case, F, Q, Value, When
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
 from common.utils import get_uuid_hex
 
+# characters of the newest message shown for each conversation in the inbox
+MESSAGE_PREVIEW_LENGTH = 100
+
 class Inbox(models.Model):
     user = models.OneToOneField(get_user_model(), verbose_name=_(
         'user'), on_delete=models.CASCADE, related_name='inbox')
@@ -23,6 +27,66 @@ class Conversation(models.Model):
     recipient = models.ForeignKey(get_user_model(),
         on_delete=models.CASCADE, verbose_name=_('recipient'), related_name="conversations")
 
+    # denormalised from the messages by Message.save so the inbox never aggregates them
+    last_message_at = models.DateTimeField(_('last message at'), null=True, blank=True)
+    last_message_preview = models.CharField(
+        _('last message preview'), max_length=MESSAGE_PREVIEW_LENGTH, blank=True, default='')
+    sender_unread_count = models.PositiveIntegerField(_('sender unread count'), default=0)
+    recipient_unread_count = models.PositiveIntegerField(_('recipient unread count'), default=0)
+
+    class Meta:
+        indexes = [
+            # the inbox pages newest first on (last_message_at, id) within one inbox
+            models.Index(
+                fields=['inbox', '-last_message_at', '-id'], name='conversation_inbox_recent_idx'),
+        ]
+
+    def get_unread_count_field(self, user):
+        '''name of the column counting the messages this participant hasn't read'''
+        if user.id == self.recipient_id:
+            return 'recipient_unread_count'
+        if user.id == self.sender_id:
+            return 'sender_unread_count'
+        return None
+
+    def get_unread_count(self, user):
+        field = self.get_unread_count_field(user)
+        return getattr(self, field) if field else 0
+
+    def record_message(self, message):
+        '''
+        move the last message columns to a new message and count it as unread for its recipient.
+        A single UPDATE of this row, so concurrent messages can't lose a count
+        and an older message saved late doesn't replace a newer preview.
+        '''
+        is_newest = Q(last_message_at__isnull=True) | Q(last_message_at__lte=message.date_received)
+        fields = {
+            'last_message_at': Case(
+                When(is_newest, then=Value(message.date_received)),
+                default=F('last_message_at'),
+            ),
+            'last_message_preview': Case(
+                When(is_newest, then=Value(message.body[:MESSAGE_PREVIEW_LENGTH])),
+                default=F('last_message_preview'),
+            ),
+        }
+
+        unread_count_field = self.get_unread_count_field(message.recipient)
+        if unread_count_field and not message.is_read:
+            fields[unread_count_field] = F(unread_count_field) + 1
+
+        Conversation.objects.filter(id=self.id).update(**fields)
+
+    def mark_read(self, user):
+        '''mark every message sent to the user as read and clear their unread count'''
+        with transaction.atomic():
+            self.messages.filter(recipient=user, is_read=False).update(is_read=True)
+
+            unread_count_field = self.get_unread_count_field(user)
+            if unread_count_field:
+                Conversation.objects.filter(id=self.id).update(**{unread_count_field: 0})
+                setattr(self, unread_count_field, 0)
+
 class Message(models.Model):
 
     uuid = models.CharField(_('uuid'), max_length=32, default=get_uuid_hex)
@@ -34,3 +98,22 @@ class Message(models.Model):
         'recipient'),  related_name="messages_received")
     date_received = models.DateTimeField(_('date received'), auto_now_add=True)
     body = models.TextField(_('body'), max_length=1000)
+    # set once the recipient opens the conversation
+    is_read = models.BooleanField(_('is read'), default=False)
+
+    class Meta:
+        indexes = [
+            # message history pages back from the newest on (date_received, id) within one conversation
+            models.Index(
+                fields=['conversation', 'date_received', 'id'], name='message_conversation_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+
+        # the conversation's counters change in the same transaction as the message is written
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+            if adding:
+                self.conversation.record_message(self)
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+from djangorestframework_camel_case.util import camelize
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+class BaseBroker:
+    '''
+    Delivers events published on a channel to everyone subscribed to it.
+
+    publish() is called from synchronous code, e.g. after a view's transaction commits,
+    subscribe() from the event loop that will await the events.
+    Set settings.MESSAGES_BROKER to the dotted path of a subclass
+    to deliver between processes, e.g. over Redis pub/sub.
+    '''
+
+    def publish(self, channel, event):
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        '''return a Subscription for the channel, must be called from a running event loop'''
+        raise NotImplementedError
+
+
+class Subscription:
+    '''events published on one channel since subscribing, in order'''
+
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+
+    def put(self, event):
+        # publishers run in other threads, so the queue is only touched from its own loop
+        try:
+            self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+        except RuntimeError:
+            # the subscriber's loop has already closed
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InProcessBroker(BaseBroker):
+    '''delivers events to subscribers in this process only, enough for one ASGI worker or tests'''
+
+    def __init__(self):
+        self.subscriptions = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def publish(self, channel, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+
+        for subscription in subscriptions:
+            subscription.put(event)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self.lock:
+            self.subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.subscriptions[subscription.channel]
+
+
+def get_broker():
+    global _broker
+
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.MESSAGES_BROKER)()
+        return _broker
+
+
+def get_user_channel(user_id):
+    return f'messages:user:{user_id}'
+
+
+def publish_message(message):
+    '''push a new message to its sender and recipient, shaped like the REST responses'''
+    from .serializers import MessageSerializer
+
+    event = camelize({
+        'type': 'message',
+        'message': MessageSerializer(message).data,
+    })
+
+    broker = get_broker()
+    for user_id in {message.sender_id, message.recipient_id}:
+        broker.publish(get_user_channel(user_id), event)
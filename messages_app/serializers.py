@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Inbox, Message, Conversation
+from .models import Message, Conversation
 from users_app.serializers import UserMessageSerializer
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -19,9 +19,35 @@ class ConversationSerializer(serializers.ModelSerializer):
         model = Conversation
         fields = ['uuid', 'messages', 'sender', 'recipient']
 
-class InboxSerializer(serializers.ModelSerializer):
-    conversations = ConversationSerializer(many=True)
-    user = UserMessageSerializer()
+class ConversationSummarySerializer(serializers.ModelSerializer):
+    '''
+    one row of the inbox, without its messages.
+    Expects a context with the requesting 'user' and the conversations' 'barters' keyed by id.
+    '''
+    counterpart = serializers.SerializerMethodField()
+    barter = serializers.SerializerMethodField()
+    unread_count = serializers.SerializerMethodField()
+
     class Meta:
-        model = Inbox
-        fields = '__all__'
+        model = Conversation
+        fields = ['id', 'uuid', 'counterpart', 'barter',
+                  'last_message_at', 'last_message_preview', 'unread_count']
+
+    def get_counterpart(self, conversation):
+        if conversation.sender_id == self.context['user'].id:
+            return UserMessageSerializer(conversation.recipient).data
+        return UserMessageSerializer(conversation.sender).data
+
+    def get_barter(self, conversation):
+        barter = self.context['barters'].get(conversation.barter_id)
+        if not barter:
+            return None
+
+        return {
+            'uuid': barter.uuid,
+            'title': barter.title,
+            'barter_type': barter.barter_type,
+        }
+
+    def get_unread_count(self, conversation):
+        return conversation.get_unread_count(self.context['user'])
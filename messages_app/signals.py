@@ -1,3 +1,6 @@
+from functools import partial
+
+from django.db import transaction
 from django.dispatch import receiver
 from django.db.models.signals import post_save
 # from garden_barter_proj.settings import AUTH_USER_MODEL
@@ -8,4 +11,13 @@ from django.contrib.auth import get_user_model
 def create_inbox(sender, instance, **kwargs):
     from .models import Inbox
 
-    Inbox.objects.get_or_create(user=instance)
\ No newline at end of file
+    Inbox.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender='messages_app.Message')
+def publish_new_message(sender, instance, created, **kwargs):
+    from .realtime import publish_message
+
+    # subscribers only hear about messages that were committed
+    if created:
+        transaction.on_commit(partial(publish_message, instance))
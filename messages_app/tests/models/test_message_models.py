@@ -25,3 +25,46 @@ class MessageTestCase(MessagesModelsBaseTestCase):
         self.assertIsNotNone(self.sender.inbox)
         self.assertIsNotNone(self.recipient.inbox)
 
+
+
+class ConversationCountersTestCase(MessagesModelsBaseTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.conversation = Conversation.objects.create(
+            inbox=self.recipient.inbox,
+            barter_id=1,
+            barter_type='seed',
+            sender=self.sender,
+            recipient=self.recipient
+        )
+
+    def send(self, sender, recipient, body):
+        return Message.objects.create(
+            body=body,
+            sender=sender,
+            recipient=recipient,
+            conversation=self.conversation
+        )
+
+    def test_conversation_counters_follow_messages(self):
+        self.send(self.sender, self.recipient, 'first offer')
+        last_message = self.send(self.sender, self.recipient, 'x' * 300)
+        self.send(self.recipient, self.sender, 'counter offer')
+
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.last_message_preview, 'counter offer')
+        self.assertEqual(self.conversation.recipient_unread_count, 2)
+        self.assertEqual(self.conversation.sender_unread_count, 1)
+        self.assertEqual(self.conversation.get_unread_count(self.recipient), 2)
+
+        # a message written late with an older date doesn't replace the newest one
+        last_message.conversation.record_message(last_message)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.last_message_preview, 'counter offer')
+
+        self.conversation.mark_read(self.recipient)
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.recipient_unread_count, 0)
+        self.assertEqual(self.conversation.sender_unread_count, 1)
+        self.assertFalse(
+            self.conversation.messages.filter(recipient=self.recipient, is_read=False).exists())
@@ -74,6 +74,10 @@ class TestBarterCreate(TestCase):
         
         conversation = self.recipient.inbox.conversations.first()
         self.assertEqual(conversation.messages.count(), 1)
+        self.assertEqual(conversation.last_message_at, conversation.messages.get().date_received)
+        self.assertEqual(conversation.last_message_preview, self.message_body)
+        self.assertEqual(conversation.recipient_unread_count, 1)
+        self.assertEqual(conversation.sender_unread_count, 0)
 
         self.assertEqual(self.seed_barter.conversations.count(), 1)
 
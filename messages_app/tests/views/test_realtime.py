@@ -0,0 +1,166 @@
+import asyncio
+import json
+import threading
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.test import TestCase, TransactionTestCase
+from rest_framework_simplejwt.tokens import AccessToken
+
+from barters_app.models import SeedBarter
+from messages_app.consumers import CLOSE_UNAUTHORIZED, MessageSocket
+from messages_app.models import Conversation, Message
+from messages_app.realtime import InProcessBroker
+
+
+class TestInProcessBroker(TestCase):
+    def test_publish_from_another_thread(self):
+        broker = InProcessBroker()
+
+        async def listen():
+            with broker.subscribe('channel') as subscription:
+                publisher = threading.Thread(target=broker.publish, args=('channel', {'n': 1}))
+                publisher.start()
+                event = await asyncio.wait_for(subscription.get(), 1)
+                publisher.join()
+                return event
+
+        self.assertEqual(async_to_sync(listen)(), {'n': 1})
+        # closed subscriptions are dropped
+        self.assertEqual(broker.subscriptions, {})
+
+
+class TestMessageSocket(TransactionTestCase):
+    # the socket looks users up from a worker thread, which only sees committed rows
+    def setUp(self):
+        self.sender = get_user_model().objects.create_user(
+            email='sender@gardenbarter.com',
+            password='pass3412'
+        )
+        self.recipient = get_user_model().objects.create_user(
+            email='recipient@gardenbarter.com',
+            password='pass3412'
+        )
+
+        barter = SeedBarter.objects.create(
+            creator=self.recipient,
+            title='test barter title',
+            description='test barter description',
+            will_trade_for='item that will be traded',
+            is_free=False,
+            postal_code='99999',
+        )
+        self.conversation = Conversation.objects.create(
+            inbox=self.recipient.inbox,
+            barter_id=barter.id,
+            barter_type=barter.barter_type,
+            sender=self.sender,
+            recipient=self.recipient
+        )
+
+    def get_communicator(self, user=None):
+        query_string = b''
+        if user:
+            token = AccessToken.for_user(user)
+            token.set_exp(lifetime=timedelta(minutes=5))
+            query_string = f'token={token}'.encode()
+
+        return ApplicationCommunicator(MessageSocket(), {
+            'type': 'websocket',
+            'path': '/inbox/ws/',
+            'query_string': query_string,
+        })
+
+    def send_message(self, body):
+        return Message.objects.create(
+            body=body,
+            sender=self.sender,
+            recipient=self.recipient,
+            conversation=self.conversation
+        )
+
+    def test_new_messages_pushed(self):
+        async def listen():
+            communicator = self.get_communicator(self.recipient)
+            await communicator.send_input({'type': 'websocket.connect'})
+            self.assertEqual(await communicator.receive_output(1), {'type': 'websocket.accept'})
+
+            message = await sync_to_async(self.send_message)("Let's trade!")
+
+            output = await communicator.receive_output(1)
+            self.assertEqual(output['type'], 'websocket.send')
+            event = json.loads(output['text'])
+            self.assertEqual(event['type'], 'message')
+            self.assertEqual(event['message']['uuid'], message.uuid)
+            self.assertEqual(event['message']['sender']['id'], self.sender.id)
+            self.assertIn('dateReceived', event['message'])
+
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': 1000})
+            await communicator.wait(1)
+
+        async_to_sync(listen)()
+
+    def test_unauthorized_closed(self):
+        async def connect(query_string):
+            communicator = self.get_communicator()
+            communicator.scope['query_string'] = query_string
+            await communicator.send_input({'type': 'websocket.connect'})
+            return await communicator.receive_output(1)
+
+        for query_string in [b'', b'token=not-a-token']:
+            output = async_to_sync(connect)(query_string)
+            self.assertEqual(output, {'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+
+    def test_revoked_token_closed(self):
+        token = AccessToken.for_user(self.recipient)
+        token.set_exp(lifetime=timedelta(minutes=5))
+        self.recipient.revoke_tokens()
+
+        async def connect():
+            communicator = self.get_communicator()
+            communicator.scope['query_string'] = f'token={token}'.encode()
+            await communicator.send_input({'type': 'websocket.connect'})
+            return await communicator.receive_output(1)
+
+        self.assertEqual(async_to_sync(connect)(), {'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+
+    def test_socket_closed_once_token_revoked(self):
+        async def listen():
+            communicator = self.get_communicator(self.recipient)
+            await communicator.send_input({'type': 'websocket.connect'})
+            self.assertEqual(await communicator.receive_output(1), {'type': 'websocket.accept'})
+
+            # logging out elsewhere revokes the token the socket was opened with
+            await sync_to_async(self.recipient.revoke_tokens)()
+            await sync_to_async(self.send_message)("Let's trade!")
+
+            output = await communicator.receive_output(1)
+            self.assertEqual(output, {'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': CLOSE_UNAUTHORIZED})
+            await communicator.wait(1)
+
+        async_to_sync(listen)()
+
+    def test_socket_closed_once_token_expires(self):
+        token = AccessToken.for_user(self.recipient)
+        token.set_exp(lifetime=timedelta(seconds=1))
+
+        async def listen():
+            communicator = self.get_communicator()
+            communicator.scope['query_string'] = f'token={token}'.encode()
+            await communicator.send_input({'type': 'websocket.connect'})
+            self.assertEqual(await communicator.receive_output(1), {'type': 'websocket.accept'})
+
+            await asyncio.sleep(1.1)
+            await sync_to_async(self.send_message)("Let's trade!")
+
+            output = await communicator.receive_output(1)
+            self.assertEqual(output, {'type': 'websocket.close', 'code': CLOSE_UNAUTHORIZED})
+
+            await communicator.send_input({'type': 'websocket.disconnect', 'code': CLOSE_UNAUTHORIZED})
+            await communicator.wait(1)
+
+        async_to_sync(listen)()
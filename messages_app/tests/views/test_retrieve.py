@@ -105,6 +105,89 @@ class TestRetrieveConversation(TestCase):
         self.assertEqual(response.data['errors'], [f"No conversation found with id {invalid_conversation_id}"])
         self.assertIn('errors',response.data.keys())
 
+        # a user outside the conversation can't read it or mark it read
+        outsider = get_user_model().objects.create_user(
+            email='outsider@gardenbarter.com',
+            password='pass3412'
+        )
+        request = self.generate_request('messages_app:conversations', conversation_id=self.conversation.id)
+        force_authenticate(request, user=outsider)
+
+        response = views.conversations(request, self.conversation.id)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], [f"No conversation found with id {self.conversation.id}"])
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.recipient_unread_count, 1)
+
+
+    def get_message_history(self, user, **params):
+        request = self.factory.get(
+            reverse('messages_app:message_history', kwargs={'conversation_id': self.conversation.id}),
+            data=params
+        )
+        force_authenticate(request, user=user)
+        return views.message_history(request, self.conversation.id)
+
+    def test_message_history(self):
+        for i in range(4):
+            Message.objects.create(
+                body=f'message {i}',
+                sender=self.sender,
+                recipient=self.recipient,
+                conversation=self.conversation
+            )
+        newest_first = list(
+            self.conversation.messages.order_by('-date_received', '-id').values_list('uuid', flat=True))
+
+        response = self.get_message_history(self.recipient, page_size=2)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([message['uuid'] for message in response.data['messages']], newest_first[:2])
+
+        # page back through older messages
+        uuids = [message['uuid'] for message in response.data['messages']]
+        before = response.data['before']
+        while before:
+            with self.assertNumQueries(2):
+                response = self.get_message_history(self.recipient, page_size=2, before=before)
+            uuids += [message['uuid'] for message in response.data['messages']]
+            before = response.data['before']
+        self.assertEqual(uuids, newest_first)
+
+        # poll for replies sent after the newest message seen
+        response = self.get_message_history(self.sender, page_size=2)
+        after = response.data['after']
+        response = self.get_message_history(self.sender, after=after)
+        self.assertEqual(response.data['messages'], [])
+        self.assertEqual(response.data['after'], after)
+
+        reply = Message.objects.create(
+            body='deal',
+            sender=self.recipient,
+            recipient=self.sender,
+            conversation=self.conversation
+        )
+        response = self.get_message_history(self.sender, after=after)
+        self.assertEqual([message['uuid'] for message in response.data['messages']], [reply.uuid])
+        self.assertNotEqual(response.data['after'], after)
+
+        # reading the history reads the messages
+        self.conversation.refresh_from_db()
+        self.assertEqual(self.conversation.recipient_unread_count, 0)
+        self.assertEqual(self.conversation.sender_unread_count, 0)
+
+    def test_message_history_fail(self):
+        outsider = get_user_model().objects.create_user(
+            email='outsider@gardenbarter.com',
+            password='pass3412'
+        )
+        response = self.get_message_history(outsider)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], [f"No conversation found with id {self.conversation.id}"])
+
+        response = self.get_message_history(self.sender, before='not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], ["Invalid cursor 'not-a-cursor'."])
 
     def test_inbox_retrieve_success(self):
         request = self.generate_request(
@@ -118,5 +201,139 @@ class TestRetrieveConversation(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['inbox']['user']['id'], self.recipient.id)
     
+    def test_inbox_retrieve_not_modified(self):
+        request = self.generate_request('messages_app:inbox')
+        force_authenticate(request, user=self.recipient)
+        response = views.inbox(request)
+        etag = response['ETag']
+
+        request = self.factory.get(reverse('messages_app:inbox'), HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=self.recipient)
+        with self.assertNumQueries(1):
+            response = views.inbox(request)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        # reading doesn't move last_message_at, so If-Modified-Since alone isn't answered
+        self.assertFalse(response.has_header('Last-Modified'))
+
+        # a new message changes the inbox
+        Message.objects.create(
+            body='How about tomorrow?',
+            sender=self.sender,
+            recipient=self.recipient,
+            conversation=self.conversation
+        )
+        request = self.factory.get(reverse('messages_app:inbox'), HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=self.recipient)
+        response = views.inbox(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        etag = response['ETag']
+
+        # so does reading one, which updates the unread badges
+        self.conversation.mark_read(self.recipient)
+        request = self.factory.get(reverse('messages_app:inbox'), HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, user=self.recipient)
+        response = views.inbox(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_inbox_retrieve_summary(self):
+        other_sender = get_user_model().objects.create_user(
+            email='other_sender@gardenbarter.com',
+            password='pass3412'
+        )
+        other_conversation = Conversation.objects.create(
+            inbox=self.recipient.inbox,
+            barter_id=self.seed_barter.id,
+            barter_type=self.seed_barter.barter_type,
+            sender=other_sender,
+            recipient=self.recipient
+        )
+        for i in range(3):
+            Message.objects.create(
+                body=f'offer {i} ' + 'x' * 200,
+                sender=other_sender,
+                recipient=self.recipient,
+                conversation=other_conversation
+            )
+
+        request = self.generate_request('messages_app:inbox')
+        force_authenticate(request, user=self.recipient)
+        response = views.inbox(request)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        conversations = response.data['inbox']['conversations']
+        self.assertEqual(
+            [conversation['id'] for conversation in conversations],
+            [other_conversation.id, self.conversation.id]
+        )
+
+        summary = conversations[0]
+        self.assertEqual(summary['counterpart']['id'], other_sender.id)
+        self.assertEqual(summary['barter']['uuid'], self.seed_barter.uuid)
+        self.assertEqual(summary['unread_count'], 3)
+        self.assertEqual(len(summary['last_message_preview']), 100)
+        self.assertTrue(summary['last_message_preview'].startswith('offer 2 '))
+        self.assertNotIn('messages', summary)
+
+        # opening a conversation marks its messages read
+        request = self.generate_request('messages_app:conversations', conversation_id=other_conversation.id)
+        force_authenticate(request, user=self.recipient)
+        views.conversations(request, other_conversation.id)
+
+        request = self.generate_request('messages_app:inbox')
+        force_authenticate(request, user=self.recipient)
+        response = views.inbox(request)
+        self.assertEqual(response.data['inbox']['conversations'][0]['unread_count'], 0)
+
+    def test_inbox_retrieve_paginated(self):
+        for i in range(4):
+            sender = get_user_model().objects.create_user(
+                email=f'sender_{i}@gardenbarter.com',
+                password='pass3412'
+            )
+            conversation = Conversation.objects.create(
+                inbox=self.recipient.inbox,
+                barter_id=self.seed_barter.id,
+                barter_type=self.seed_barter.barter_type,
+                sender=sender,
+                recipient=self.recipient
+            )
+            Message.objects.create(
+                body=f'message {i}',
+                sender=sender,
+                recipient=self.recipient,
+                conversation=conversation
+            )
+
+        conversation_ids = []
+        cursor = None
+        while True:
+            params = {'page_size': 2}
+            if cursor:
+                params['cursor'] = cursor
+            request = self.factory.get(reverse('messages_app:inbox'), data=params)
+            force_authenticate(request, user=self.recipient)
+            with self.assertNumQueries(3):
+                response = views.inbox(request)
+
+            inbox = response.data['inbox']
+            conversation_ids += [conversation['id'] for conversation in inbox['conversations']]
+            cursor = inbox['next']
+            if not cursor:
+                break
+
+        self.assertEqual(
+            conversation_ids,
+            list(Conversation.objects.order_by('-id').values_list('id', flat=True))
+        )
+
     def test_inbox_retrieve_fail(self):
-        pass
\ No newline at end of file
+        request = self.factory.get(reverse('messages_app:inbox'), data={'cursor': 'not-a-cursor'})
+        force_authenticate(request, user=self.recipient)
+        response = views.inbox(request)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'], ["Invalid cursor 'not-a-cursor'."])
\ No newline at end of file
@@ -0,0 +1,140 @@
+import threading
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+
+from barters_app.models import SeedBarter
+from messages_app.models import Conversation, Message
+
+
+class TestWaitForMessages(TransactionTestCase):
+    # messages are sent from another thread while the request waits, which needs committed rows
+    def setUp(self):
+        self.sender = get_user_model().objects.create_user(
+            email='sender@gardenbarter.com',
+            password='pass3412'
+        )
+        self.recipient = get_user_model().objects.create_user(
+            email='recipient@gardenbarter.com',
+            password='pass3412'
+        )
+
+        barter = SeedBarter.objects.create(
+            creator=self.recipient,
+            title='test barter title',
+            description='test barter description',
+            will_trade_for='item that will be traded',
+            is_free=False,
+            postal_code='99999',
+        )
+        self.conversation = Conversation.objects.create(
+            inbox=self.recipient.inbox,
+            barter_id=barter.id,
+            barter_type=barter.barter_type,
+            sender=self.sender,
+            recipient=self.recipient
+        )
+
+    def send_message(self, body):
+        return Message.objects.create(
+            body=body,
+            sender=self.sender,
+            recipient=self.recipient,
+            conversation=self.conversation
+        )
+
+    def send_message_later(self, body, delay):
+        def send():
+            time.sleep(delay)
+            try:
+                self.send_message(body)
+            finally:
+                connection.close()
+
+        thread = threading.Thread(target=send)
+        thread.start()
+        return thread
+
+    def wait(self, user, **params):
+        token = AccessToken.for_user(user)
+        token.set_exp(lifetime=timedelta(minutes=5))
+        return self.client.get(
+            reverse('messages_app:wait_for_messages'),
+            data=params,
+            HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+
+    def test_wait_returns_pending_messages(self):
+        first_message = self.send_message('first')
+        response = self.wait(self.recipient, timeout=0.1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # without a cursor only messages sent after the request count
+        self.assertEqual(response.json()['messages'], [])
+        since = response.json()['since']
+
+        second_message = self.send_message('second')
+        third_message = self.send_message('third')
+        start = time.monotonic()
+        response = self.wait(self.recipient, since=since)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(
+            [message['uuid'] for message in response.json()['messages']],
+            [second_message.uuid, third_message.uuid]
+        )
+        self.assertIn('dateReceived', response.json()['messages'][0])
+        self.assertNotIn(first_message.uuid, [message['uuid'] for message in response.json()['messages']])
+
+        # the returned cursor moves past what was delivered
+        response = self.wait(self.recipient, since=response.json()['since'], timeout=0.1)
+        self.assertEqual(response.json()['messages'], [])
+
+    def test_wait_woken_by_new_message(self):
+        self.send_message('first')
+        since = self.wait(self.sender, timeout=0.1).json()['since']
+
+        thread = self.send_message_later('reply', 0.3)
+        start = time.monotonic()
+        response = self.wait(self.sender, since=since, timeout=5)
+        thread.join()
+
+        self.assertLess(time.monotonic() - start, 4)
+        self.assertEqual([message['body'] for message in response.json()['messages']], ['reply'])
+
+    def test_wait_times_out(self):
+        start = time.monotonic()
+        response = self.wait(self.recipient, timeout=0.2)
+        self.assertGreaterEqual(time.monotonic() - start, 0.2)
+        self.assertEqual(response.json(), {'messages': [], 'since': None})
+
+    def test_wait_fail(self):
+        response = self.client.get(reverse('messages_app:wait_for_messages'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.wait(self.recipient, since='not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.json()['errors'], ["Invalid cursor 'not-a-cursor'."])
+
+        response = self.wait(self.recipient, timeout=600)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(
+            response.json()['errors'],
+            ["Invalid 'timeout' value '600'. It must be greater than 0 and at most 25."]
+        )
+
+    def test_wait_refuses_revoked_token(self):
+        token = AccessToken.for_user(self.recipient)
+        token.set_exp(lifetime=timedelta(minutes=5))
+        self.recipient.revoke_tokens()
+
+        response = self.client.get(
+            reverse('messages_app:wait_for_messages'),
+            data={'timeout': 0.1},
+            HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
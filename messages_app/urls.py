@@ -7,7 +7,9 @@ app_name="messages_app"
 urlpatterns=[
     path('', views.inbox, name='inbox'),
     path('messages/create/', views.create, name="create"),
+    path('messages/wait/', views.wait_for_messages, name="wait_for_messages"),
     # path('messages/<int:message_id>/', views.inbox, name='message_detail'),
     path('conversations/find/', views.find_conversation, name="find_conversation"),
-    path('conversations/<int:conversation_id>/', views.conversations, name='conversations')
+    path('conversations/<int:conversation_id>/', views.conversations, name='conversations'),
+    path('conversations/<int:conversation_id>/messages/', views.message_history, name='message_history'),
 ]
\ No newline at end of file
@@ -1,13 +1,28 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, render
+from djangorestframework_camel_case.util import camelize
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from rest_framework.response import Response
+from users_app.authentication import StatelessJWTAuthentication
 from users_app.serializers import UserMessageSerializer
-from .serializers import InboxSerializer, MessageSerializer, ConversationSerializer
+from .serializers import (ConversationSerializer, ConversationSummarySerializer,
+                          MessageSerializer)
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
 from barters_app.constants import BARTER_CONFIG
-from .models import Conversation
+from barters_app.models import Barter
+from common.conditional import get_etag, get_not_modified_response, set_validators
+from common.pagination import CursorPaginator, HistoryPaginator, InvalidCursor
+from .models import Conversation, Message
+from .realtime import get_broker, get_user_channel
 
 
 @api_view(['POST'])
@@ -57,33 +72,35 @@ def create(request):
             'errors': [error]
         }
     else:
-        conversation, created = Conversation.objects.get_or_create(
-            inbox=barter.creator.inbox,
-            barter_id=barter.id,
-            barter_type=barter_type,
-            sender=request.user,
-            recipient=barter.creator
-        )
-
-        message_serializer = MessageSerializer(data={
-            'body': form_data.get('message_body'),
-            'conversation': conversation.id
-        })
-
-        if message_serializer.is_valid():
-            message_serializer.save(sender=sender, recipient=barter.creator)
-            barter.conversations.add(conversation)
-            response.status_code = status.HTTP_201_CREATED
-            response.data = {
-                'message': "Message created!",
-                'conversationId': conversation.id 
-            }
-
-        else:
-            response.status_code = status.HTTP_400_BAD_REQUEST
-            response.data = {
-                'errors': message_serializer.errors
-            }
+        # the message and the conversation's last message and unread columns are written together
+        with transaction.atomic():
+            conversation, created = Conversation.objects.get_or_create(
+                inbox=barter.creator.inbox,
+                barter_id=barter.id,
+                barter_type=barter_type,
+                sender=request.user,
+                recipient=barter.creator
+            )
+
+            message_serializer = MessageSerializer(data={
+                'body': form_data.get('message_body'),
+                'conversation': conversation.id
+            })
+
+            if message_serializer.is_valid():
+                message_serializer.save(sender=sender, recipient=barter.creator)
+                barter.conversations.add(conversation)
+                response.status_code = status.HTTP_201_CREATED
+                response.data = {
+                    'message': "Message created!",
+                    'conversationId': conversation.id 
+                }
+
+            else:
+                response.status_code = status.HTTP_400_BAD_REQUEST
+                response.data = {
+                    'errors': message_serializer.errors
+                }
 
     return response
 
@@ -93,9 +110,16 @@ def create(request):
 def conversations(request, conversation_id):
     response = Response()
 
-    conversation = Conversation.objects.filter(id=conversation_id).first()
+    # only the participants can open a conversation
+    conversation = Conversation.objects.filter(
+        Q(sender=request.user) | Q(recipient=request.user),
+        id=conversation_id
+    ).first()
 
     if conversation:
+        # opening a conversation reads the messages sent to the user
+        conversation.mark_read(request.user)
+
         conversation_serializer = ConversationSerializer(conversation)
 
         response.data = {'conversation': conversation_serializer.data}
@@ -108,6 +132,50 @@ def conversations(request, conversation_id):
     return response
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def message_history(request, conversation_id):
+    '''
+    a page of a conversation's messages, newest first.
+    Pass the 'before' cursor from a response to read older messages,
+    or its 'after' cursor to read any sent since.
+    '''
+    response = Response()
+
+    conversation = Conversation.objects.filter(
+        Q(sender=request.user) | Q(recipient=request.user),
+        id=conversation_id
+    ).first()
+
+    if not conversation:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        response.data = {
+            'errors': [f"No conversation found with id {conversation_id}"]
+        }
+        return response
+
+    if conversation.get_unread_count(request.user):
+        conversation.mark_read(request.user)
+
+    messages = conversation.messages.select_related('sender', 'recipient')
+
+    paginator = HistoryPaginator(request, ordering=('-date_received', '-id'))
+    try:
+        messages = paginator.paginate_queryset(messages)
+    except InvalidCursor as invalid_cursor:
+        response.status_code = status.HTTP_400_BAD_REQUEST
+        response.data = {
+            'errors': [str(invalid_cursor)]
+        }
+        return response
+
+    message_serializer = MessageSerializer(messages, many=True)
+
+    response.data = paginator.get_envelope('messages', message_serializer.data)
+
+    return response
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def find_conversation(request):
@@ -180,13 +248,63 @@ def find_conversation(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def inbox(request):
+    '''
+    a page of the user's conversations, most recently active first.
+    Each one is summarised by its counterpart, barter, a preview of the
+    newest message and the number of unread messages;
+    the messages themselves load per conversation from views.conversations.
+    '''
     response = Response()
 
     try:
-        inbox_serializer = InboxSerializer(request.user.inbox)
+        inbox = request.user.inbox
+
+        conversations = inbox.conversations.filter(last_message_at__isnull=False)
+
+        # new messages move last_message_at and the counts, reading moves the unread counts,
+        # so together they tell whether the page changed. No Last-Modified is sent,
+        # since reading a conversation doesn't move last_message_at
+        validators = conversations.aggregate(
+            last_message_at=Max('last_message_at'),
+            conversation_count=Count('id'),
+            unread_count=Sum('sender_unread_count') + Sum('recipient_unread_count'),
+        )
+        set_validators(
+            response,
+            get_etag(
+                validators['conversation_count'],
+                validators['unread_count'],
+                validators['last_message_at'],
+            ),
+        )
+        not_modified_response = get_not_modified_response(request, response)
+        if not_modified_response:
+            return not_modified_response
+
+        conversations = conversations.select_related('sender', 'recipient')
+
+        paginator = CursorPaginator(request, ordering=('-last_message_at', '-id'))
+        conversations = paginator.paginate_queryset(conversations)
 
+        barters = Barter.objects.in_bulk([conversation.barter_id for conversation in conversations])
+
+        conversation_serializer = ConversationSummarySerializer(
+            conversations,
+            many=True,
+            context={'user': request.user, 'barters': barters}
+        )
+
+        response.data = {
+            'inbox': {
+                'id': inbox.id,
+                'user': UserMessageSerializer(request.user).data,
+                **paginator.get_envelope('conversations', conversation_serializer.data),
+            }
+        }
+    except InvalidCursor as invalid_cursor:
+        response.status_code = status.HTTP_400_BAD_REQUEST
         response.data = {
-            'inbox': inbox_serializer.data
+            'errors': [str(invalid_cursor)]
         }
     except:
         response.status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -195,3 +313,106 @@ def inbox(request):
         }
 
     return response
+
+
+@sync_to_async
+def authenticate_jwt(request):
+    '''return the user of the request's access token, or None if it's invalid or revoked'''
+    try:
+        user_token = StatelessJWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return None
+    return user_token[0] if user_token else None
+
+
+def get_user_messages(user):
+    return Message.objects.filter(Q(sender=user) | Q(recipient=user))
+
+
+@sync_to_async
+def get_newest_message(user):
+    return get_user_messages(user).order_by('-date_received', '-id').first()
+
+
+@sync_to_async
+def get_messages_since(user, paginator, position):
+    '''return the serialized messages to or from the user after the position, oldest first, and the last one'''
+    messages = get_user_messages(user)
+    if position is not None:
+        messages = messages.filter(
+            paginator.get_keyset_filter(['date_received', 'id'], position))
+
+    messages = list(
+        messages.select_related('sender', 'recipient')
+        .order_by('date_received', 'id')[:settings.PAGINATION['MAX_PAGE_SIZE']]
+    )
+    return MessageSerializer(messages, many=True).data, messages[-1] if messages else None
+
+
+async def wait_for_messages(request):
+    '''
+    long-poll for new messages to or from the user, for clients that can't hold a WebSocket.
+    Responds at once if there are messages after the 'since' cursor,
+    otherwise holds the request until one is sent or 'timeout' seconds pass.
+    Pass the 'since' cursor from each response to the next request;
+    without one, only messages sent after the request are returned.
+    Served from the event loop under ASGI, so a waiting request holds no thread.
+    '''
+    user = await authenticate_jwt(request)
+    if user is None:
+        return JsonResponse(
+            {'detail': 'Authentication credentials were not provided or are invalid.'},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+
+    paginator = CursorPaginator(request, ordering=('-date_received', '-id'))
+
+    error = None
+    timeout_param = request.GET.get('timeout', settings.MESSAGES_LONG_POLL_TIMEOUT)
+    try:
+        timeout = float(timeout_param)
+        if not 0 < timeout <= settings.MESSAGES_LONG_POLL_TIMEOUT:
+            raise ValueError
+    except ValueError:
+        error = (
+            f"Invalid 'timeout' value '{timeout_param}'. "
+            f"It must be greater than 0 and at most {settings.MESSAGES_LONG_POLL_TIMEOUT}."
+        )
+
+    since = request.GET.get('since')
+    position = None
+    if since and not error:
+        try:
+            position, _ = paginator.decode_cursor(since, Message)
+        except InvalidCursor as invalid_cursor:
+            error = str(invalid_cursor)
+
+    if error:
+        return JsonResponse({'errors': [error]}, status=status.HTTP_400_BAD_REQUEST)
+
+    # subscribe before reading so a message sent in between still wakes the request
+    with get_broker().subscribe(get_user_channel(user.id)) as subscription:
+        messages, last_message = [], None
+        if since:
+            messages, last_message = await get_messages_since(user, paginator, position)
+        else:
+            newest_message = await get_newest_message(user)
+            if newest_message:
+                since = paginator.encode_cursor(newest_message)
+                position = paginator.get_position(newest_message)
+
+        if not messages:
+            try:
+                await asyncio.wait_for(subscription.get(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                messages, last_message = await get_messages_since(user, paginator, position)
+
+    if last_message:
+        since = paginator.encode_cursor(last_message)
+
+    return JsonResponse(camelize({
+        'messages': messages,
+        'since': since,
+    }))
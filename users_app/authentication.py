@@ -1,82 +1,111 @@
-import jwt
-from rest_framework.authentication import BaseAuthentication
-from django.middleware.csrf import CsrfViewMiddleware
+import copy
+
 from rest_framework import exceptions
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from rest_framework.response import Response
 from rest_framework import status
 from django.middleware.csrf import get_token as generate_csrf_token
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
 
-
-class CSRFCheck(CsrfViewMiddleware):
-    def _reject(self, request, reason):
-        # Return the failure reason instead of an HttpResponse
-        return reason
+from common.ttl_cache import TTLCache
+from .tokens import TOKEN_VERSION_CLAIM, get_token_version
 
 
-class SafeJWTAuthentication(BaseAuthentication):
-    '''
-        custom authentication class for DRF and JWT
-        https://github.com/encode/django-rest-framework/blob/master/rest_framework/authentication.py
-    '''
+# users recently loaded by StatelessJWTAuthentication, by id.
+# signals.py drops a user whenever they're saved or deleted,
+# the TTL bounds how long another process can see a stale copy
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE['MAX_SIZE'],
+    ttl=settings.USER_CACHE['TIMEOUT'],
+)
 
-    def authenticate(self, request):
-        
-        User = get_user_model()
-        _authorization_header = request.headers.get('Authorization')
 
-        if not _authorization_header:
-            return None
-        try:
-            # header = 'Token xxxxxxxxxxxxxxxxxxxxxxxx'
-            access_token = _authorization_header.split(' ')[1]
-            payload = jwt.decode(
-                access_token, settings.ACCESS_TOKEN_SECRET, algorithms=['HS256'])
-
-        # if token is expired
-        except jwt.ExpiredSignatureError:
-            raise exceptions.AuthenticationFailed(
-                detail={
-                    'msg': 'Access token expired',
-                }
-            )
-        # if token doesn't exist
-        except IndexError:
-            raise exceptions.AuthenticationFailed('Token prefix missing')
-
-        # get the user associated with the token
-        user = User.objects.filter(id=payload['user_id']).first()
+def get_cached_user(user_id):
+    '''return the user with the id, from user_cache when possible, or None'''
+    user = user_cache.get(user_id)
+    if user is None:
+        user = get_user_model().objects.filter(id=user_id).first()
         if user is None:
-            raise exceptions.AuthenticationFailed('User not found')
+            return None
+        user_cache.set(user_id, user)
+
+    # each request gets its own copy, so attributes set on it don't leak into other requests
+    return copy.copy(user)
 
-        if not user.is_active:
-            raise exceptions.AuthenticationFailed('user is inactive')
 
-        # check CSRF Cookie
-        self.enforce_csrf(request)
+class TokenUser(SimpleLazyObject):
+    '''
+    The user named by a validated access token.
+
+    id, pk, email and is_active are read from the token's claims. Touching any
+    other attribute, including an isinstance() check or using it in a query,
+    loads the User row once and proxies to it from then on.
+    '''
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        super().__init__(lambda: self.load_user(user_id))
+
+        # set directly so they're found without loading the wrapped user
+        self.__dict__.update(
+            token=token,
+            id=user_id,
+            pk=user_id,
+            email=token.get('email'),
+            is_active=token.get('is_active'),
+        )
+
+    @staticmethod
+    def load_user(user_id):
+        user = get_cached_user(user_id)
+        if user is None:
+            raise get_user_model().DoesNotExist(f'No user with id {user_id}')
+        return user
 
-        # return the authenticated user object
-        return (user, None)
+    def __bool__(self):
+        return True
 
-    def enforce_csrf(self, request):
-        """
-        Enforce CSRF validation
-        """
-        def dummy_get_response(request):  # pragma: no cover
-            return request
-        # # populates request.META['CSRF_COOKIE'], which is used in process_view()
-        
-        check = CSRFCheck(dummy_get_response)
+    def __str__(self):
+        return self.email
 
-        # request.COOKIES['CSRF_COOKIE'] = request.headers.get('X-CSRFToken')
 
-        check.process_request(request)
+class StatelessJWTAuthentication(JWTAuthentication):
+    '''
+    JWTAuthentication without the per-request user lookup.
 
-        reason = check.process_view(request, None, (), {})
-        if reason:
-            # CSRF failed, bail with explicit error message
-            raise exceptions.PermissionDenied('CSRF Failed: %s' % reason)
+    Tokens issued by ClaimsTokenObtainPairSerializer carry the user's email, is_active
+    and token version, so a request costs a signature check and a cached token version
+    lookup, and request.user is a TokenUser that only queries the database if a view
+    needs more of the user. Tokens without the claims fall back to loading the user.
+    Users are loaded through user_cache either way, so repeat requests skip the query.
+    '''
 
-# Thanks to Ahmed Atalla for this code
-# https://dev.to/a_atalla/django-rest-framework-custom-jwt-authentication-5n5
\ No newline at end of file
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        # tokens issued before versions were added count as version 0
+        if validated_token.get(TOKEN_VERSION_CLAIM, 0) != get_token_version(user_id):
+            raise exceptions.AuthenticationFailed('Token has been revoked', code='token_revoked')
+
+        if 'is_active' not in validated_token:
+            user = get_cached_user(user_id)
+            if user is None:
+                raise exceptions.AuthenticationFailed('User not found', code='user_not_found')
+            if not user.is_active:
+                raise exceptions.AuthenticationFailed('User is inactive', code='user_inactive')
+            return user
+
+        if not validated_token['is_active']:
+            raise exceptions.AuthenticationFailed('User is inactive', code='user_inactive')
+
+        return TokenUser(validated_token)
@@ -0,0 +1,150 @@
+import math
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.views import TokenRefreshView
+
+from common.utils import get_uuid_hex
+from users_app.models import User
+from users_app.tokens import ClaimsRefreshToken
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+class Command(BaseCommand):
+    help = (
+        'Simulate clients calling the API every --call-interval seconds and refreshing '
+        'their access token whenever it has expired, then print the refresh request rate, '
+        'database writes per minute and p99 refresh latency for each token lifetime profile '
+        'in settings.TOKEN_LIFETIME_PROFILES. Each profile is also run for real: '
+        '--clients threads post to token/refresh/ at the modelled rate for --duration seconds.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--clients', type=int, default=50)
+        parser.add_argument('--call-interval', type=float, default=5.0)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument(
+            '--profile', action='append', dest='profiles', choices=list(settings.TOKEN_LIFETIME_PROFILES),
+            help='profile to benchmark, can be repeated. Defaults to all of them.'
+        )
+
+    def handle(self, *args, **options):
+        if options['clients'] < 1 or options['call_interval'] <= 0 or options['duration'] <= 0:
+            raise CommandError('--clients, --call-interval and --duration must be greater than 0.')
+
+        users = [
+            User.objects.create_user(email=f'benchmark_{get_uuid_hex()}@gardenbarter.com', password='pass3412')
+            for _ in range(options['clients'])
+        ]
+        try:
+            writes_per_refresh = self.count_writes(users[0])
+            self.stdout.write(f'{writes_per_refresh} database writes per refresh')
+
+            for name in options['profiles'] or settings.TOKEN_LIFETIME_PROFILES:
+                self.benchmark_profile(name, users, writes_per_refresh, options)
+        finally:
+            # the outstanding tokens' user foreign key is SET_NULL, they would outlive the users
+            OutstandingToken.objects.filter(user__in=users).delete()
+            User.objects.filter(id__in=[user.id for user in users]).delete()
+
+    def count_writes(self, user):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.refresh(str(ClaimsRefreshToken.for_user(user)))[0]
+        if response.status_code != 200:
+            raise CommandError(f'token refresh failed: {response.data}')
+
+        return len([
+            query for query in queries.captured_queries
+            if query['sql'].lstrip().upper().startswith(WRITE_STATEMENTS)
+        ])
+
+    def refresh(self, refresh_token):
+        '''post a refresh token to token/refresh/, return the response and its latency'''
+        request = APIRequestFactory().post('/users/token/refresh/', {'refresh': refresh_token}, format='json')
+        start = time.perf_counter()
+        response = TokenRefreshView.as_view()(request)
+        return response, time.perf_counter() - start
+
+    def get_refresh_period(self, access_lifetime, call_interval):
+        '''
+        seconds between one client's refreshes: the first call
+        after its access token expires has to refresh it first
+        '''
+        return max(math.ceil(access_lifetime / call_interval), 1) * call_interval
+
+    def benchmark_profile(self, name, users, writes_per_refresh, options):
+        lifetime = settings.TOKEN_LIFETIME_PROFILES[name]['ACCESS_TOKEN_LIFETIME'].total_seconds()
+        period = self.get_refresh_period(lifetime, options['call_interval'])
+        modelled_rate = len(users) / period
+
+        # the cost of one refresh doesn't depend on the lifetime,
+        # so the storm replays the profile's refresh rate with the configured tokens
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+        threads = [
+            threading.Thread(
+                target=self.run_client,
+                args=(user, period, i * min(period, options['duration']) / len(users),
+                      options['duration'], latencies, errors, lock)
+            )
+            for i, user in enumerate(users)
+        ]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{name} (access tokens live {lifetime:g}s)'))
+        self.stdout.write(f'  refreshes/s: {modelled_rate:.3f} modelled, {len(latencies) / elapsed:.2f} replayed')
+        self.stdout.write(f'  database writes/min: {modelled_rate * 60 * writes_per_refresh:.1f}')
+        if latencies:
+            self.stdout.write(
+                f'  latency: p50 {statistics.median(latencies) * 1000:.1f} ms, '
+                f'p99 {self.get_percentile(latencies, 99) * 1000:.1f} ms '
+                f'over {len(latencies)} refreshes'
+            )
+        if errors:
+            self.stdout.write(self.style.ERROR(f'  {len(errors)} failed refreshes, e.g. {errors[0]}'))
+
+    def run_client(self, user, period, offset, duration, latencies, errors, lock):
+        '''refresh every period seconds from offset until duration has passed, at least once'''
+        try:
+            refresh_token = str(ClaimsRefreshToken.for_user(user))
+            start = time.perf_counter()
+            due = offset
+            while True:
+                time.sleep(max(due - (time.perf_counter() - start), 0))
+                try:
+                    response, latency = self.refresh(refresh_token)
+                except Exception as e:
+                    # e.g. SQLite's 'database is locked' under concurrent writes
+                    with lock:
+                        errors.append(repr(e))
+                else:
+                    with lock:
+                        if response.status_code == 200:
+                            latencies.append(latency)
+                            refresh_token = response.data['refresh']
+                        else:
+                            errors.append(f'{response.status_code} {response.data}')
+
+                due += period
+                if due >= duration:
+                    break
+        finally:
+            connection.close()
+
+    def get_percentile(self, values, percentile):
+        values = sorted(values)
+        return values[min(math.ceil(len(values) * percentile / 100), len(values)) - 1]
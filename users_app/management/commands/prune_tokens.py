@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users_app.pruning import prune_expired_tokens
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete expired outstanding and blacklisted JWTs in small batches. '
+        'The web process already does this every TOKEN_PRUNING["INTERVAL"] seconds; '
+        'use this to catch up on a large backlog.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--time-budget', type=float, default=None,
+                            help='seconds after which to stop between batches, by default run until done')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        total = prune_expired_tokens(options['batch_size'], options['time_budget'])
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(f'Pruned {total} expired tokens in {elapsed:.2f}s'))
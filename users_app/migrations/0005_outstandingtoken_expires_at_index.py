@@ -0,0 +1,22 @@
+from django.db import migrations
+
+INDEX_NAME = 'token_blacklist_outstandingtoken_expires_at_idx'
+
+
+class Migration(migrations.Migration):
+    '''
+    Index the expiry of simplejwt's outstanding tokens so pruning is a range scan.
+    The table belongs to a third party app, so the index is created with SQL here.
+    '''
+
+    dependencies = [
+        ('users_app', '0004_user_token_version'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            f'CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON token_blacklist_outstandingtoken (expires_at)',
+            f'DROP INDEX IF EXISTS {INDEX_NAME}',
+        ),
+    ]
@@ -55,14 +55,53 @@ class User(AbstractUser):
     # optional username
     username = models.CharField(_('username'), max_length=30, null=True, blank=True)
 
+    # carried in every JWT, bumping it revokes all the user's tokens (see users_app.tokens)
+    token_version = models.PositiveIntegerField(_('token version'), default=0, editable=False)
+
+    # barter listings nest their creator, so their ETag includes the newest of these
+    date_updated = models.DateTimeField(_('date updated'), auto_now=True)
+
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
 
     objects = UserManager()
 
+    # field values as loaded or last saved, so signal receivers can tell what a save changed
+    loaded_values = None
+
     def __str__(self):
         return self.email
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self.loaded_values = {field.attname: getattr(self, field.attname) for field in self._meta.concrete_fields}
+
+    @property
+    def loaded_is_active(self):
+        return (self.loaded_values or {}).get('is_active')
+
+    def get_changed_fields(self):
+        '''attnames of the fields changed since the user was loaded or saved, every field for a new user'''
+        loaded_values = self.loaded_values or {}
+        return {
+            field.attname for field in self._meta.concrete_fields
+            if field.attname not in loaded_values or loaded_values[field.attname] != getattr(self, field.attname)
+        }
+
+    def revoke_tokens(self):
+        '''invalidate every access and refresh token issued to the user so far'''
+        from .tokens import forget_token_version
+
+        User.objects.filter(id=self.id).update(token_version=models.F('token_version') + 1)
+        self.refresh_from_db(fields=['token_version'])
+        forget_token_version(self.id)
+
 class RefreshToken(models.Model):
     user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='refresh_token')
     token = models.CharField(max_length=200)
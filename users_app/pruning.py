@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+logger = logging.getLogger(__name__)
+
+
+def prune_expired_tokens(batch_size=500, time_budget=None):
+    '''
+    delete expired outstanding tokens and their blacklist entries, oldest first,
+    in batches that each run in their own short transaction, until none are left
+    or time_budget seconds have passed. Returns the number deleted.
+    An expired token can't be used whether it's blacklisted or not, so nothing is lost.
+    '''
+    start = time.monotonic()
+    now = aware_utcnow()
+    # a range scan over the expires_at index added in users_app migration 0005
+    expired_tokens = OutstandingToken.objects.filter(expires_at__lte=now).order_by('expires_at')
+
+    total = 0
+    while True:
+        with transaction.atomic():
+            token_ids = list(expired_tokens.values_list('id', flat=True)[:batch_size])
+            if not token_ids:
+                break
+
+            BlacklistedToken.objects.filter(token_id__in=token_ids).delete()
+            OutstandingToken.objects.filter(id__in=token_ids).delete()
+
+        total += len(token_ids)
+        # a run over budget stops between batches, the rest is left for the next one
+        if time_budget is not None and time.monotonic() - start >= time_budget:
+            break
+
+    return total
+
+
+class TokenPruner:
+    '''
+    Prunes expired tokens in a background thread at most once every interval seconds.
+
+    maybe_start() is cheap enough to call on every token request, so pruning keeps pace
+    with the refreshes that fill the tables without a cron job or a separate worker.
+    Each run keeps deleting batches until the backlog is gone or time_budget seconds
+    have passed, so a large backlog is cleared without one run holding the database for long.
+    '''
+
+    def __init__(self, interval, batch_size, time_budget):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.time_budget = time_budget
+        # the first run waits one interval after startup
+        self.last_run = time.monotonic()
+        self.running = threading.Lock()
+
+    def maybe_start(self):
+        '''start a run if one is due and none is in progress, return whether one started'''
+        if not self.interval or time.monotonic() - self.last_run < self.interval:
+            return False
+        if not self.running.acquire(blocking=False):
+            return False
+
+        self.last_run = time.monotonic()
+        self.start()
+        return True
+
+    def start(self):
+        threading.Thread(target=self.run, name='token-pruner', daemon=True).start()
+
+    def run(self):
+        try:
+            return prune_expired_tokens(self.batch_size, self.time_budget)
+        except Exception:
+            # e.g. 'database is locked' while requests write to SQLite. Nothing waits on the thread,
+            # so log it and leave the tokens for the next run
+            logger.exception('Pruning expired tokens failed')
+        finally:
+            # the thread's own connection
+            connection.close()
+            self.running.release()
+
+
+token_pruner = TokenPruner(
+    interval=settings.TOKEN_PRUNING['INTERVAL'],
+    batch_size=settings.TOKEN_PRUNING['BATCH_SIZE'],
+    time_budget=settings.TOKEN_PRUNING['TIME_BUDGET'],
+)
@@ -1,6 +1,10 @@
 # users/serializers.py
 from django.contrib.auth import get_user_model
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+
+from .pruning import token_pruner
+from .tokens import ClaimsRefreshToken
 
 class UserCreateSerializer(serializers.ModelSerializer):
 
@@ -42,7 +46,7 @@ class UserUpdateSerializer(serializers.ModelSerializer):
 class UserDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
-        exclude = ['password', 'user_permissions', 'groups']
+        exclude = ['password', 'user_permissions', 'groups', 'token_version', 'date_updated']
 
 
 class UserMessageSerializer(serializers.ModelSerializer):
@@ -50,3 +54,23 @@ class UserMessageSerializer(serializers.ModelSerializer):
     class Meta:
         model = get_user_model()
         fields = ['id','email','username']
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    '''issue token pairs carrying the claims used by StatelessJWTAuthentication'''
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        token_pruner.maybe_start()
+        return data
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = ClaimsRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        # every rotation adds outstanding and blacklisted tokens
+        token_pruner.maybe_start()
+        return data
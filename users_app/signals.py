@@ -0,0 +1,19 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    from .authentication import user_cache
+
+    # covers deactivation, which is a save of is_active
+    user_cache.delete(instance.id)
+
+
+@receiver(post_save, sender=get_user_model())
+def revoke_inactive_user_tokens(sender, instance, created, **kwargs):
+    # tokens carry is_active, so deactivating a user has to revoke the ones already issued
+    if not created and instance.loaded_is_active and not instance.is_active:
+        instance.revoke_tokens()
@@ -0,0 +1,205 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.db.models import F
+from rest_framework import exceptions, status
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from common.ttl_cache import TTLCache
+from users_app.authentication import StatelessJWTAuthentication, user_cache
+from users_app.tokens import ClaimsRefreshToken
+from users_app.utils import Token
+
+
+# as with a shared cache, where token versions are cached
+@override_settings(USER_CACHE=dict(settings.USER_CACHE, TOKEN_VERSION_TIMEOUT=60))
+class StatelessJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        self.factory = APIRequestFactory()
+        self.user = get_user_model().objects.create_user(
+            email='stateless_user@test.com',
+            password='pass3412'
+        )
+
+    def get_access_token(self, refresh=None):
+        access = (refresh or ClaimsRefreshToken.for_user(self.user)).access_token
+        access.set_exp(lifetime=timedelta(minutes=5))
+        return access
+
+    def authenticate(self, access):
+        request = self.factory.get('/user/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        return StatelessJWTAuthentication().authenticate(request)
+
+    def test_token_claims(self):
+        response = self.client.post(
+            reverse('users_app:token_obtain_pair'),
+            {'email': self.user.email, 'password': 'pass3412'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        access = AccessToken(response.data['access'], verify=False)
+        self.assertEqual(access['email'], self.user.email)
+        self.assertTrue(access['is_active'])
+        self.assertEqual(access['token_version'], 0)
+
+    def test_user_loaded_lazily(self):
+        access = self.get_access_token()
+
+        # the token version is looked up once, then cached
+        with self.assertNumQueries(1):
+            self.authenticate(access)
+
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate(access)
+            self.assertEqual(user.id, self.user.id)
+            self.assertEqual(user.email, self.user.email)
+            self.assertTrue(user.is_authenticated)
+            self.assertTrue(user)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(user.date_joined, self.user.date_joined)
+            self.assertIsInstance(user, get_user_model())
+
+    def test_loaded_users_cached(self):
+        access = self.get_access_token()
+        self.authenticate(access)
+
+        user, _ = self.authenticate(access)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.date_joined, self.user.date_joined)
+
+        # later requests load the user from user_cache
+        user, _ = self.authenticate(access)
+        with self.assertNumQueries(0):
+            self.assertEqual(user.date_joined, self.user.date_joined)
+
+    def test_tokens_without_claims_use_cached_user(self):
+        # issued before the claims were added, so the user has to be loaded
+        access = AccessToken.for_user(self.user)
+        access.set_exp(lifetime=timedelta(minutes=5))
+
+        with self.assertNumQueries(2):
+            user, _ = self.authenticate(access)
+        self.assertEqual(user, self.user)
+
+        with self.assertNumQueries(0):
+            self.authenticate(access)
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(access)
+
+    def test_cached_user_invalidated(self):
+        access = AccessToken.for_user(self.user)
+        access.set_exp(lifetime=timedelta(minutes=5))
+        self.authenticate(access)
+
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate(access)
+        self.assertEqual(user.first_name, 'Renamed')
+
+        self.user.delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(access)
+
+    def test_views_use_token_user(self):
+        response = self.client.get(
+            reverse('messages_app:inbox'),
+            HTTP_AUTHORIZATION=f'Bearer {self.get_access_token()}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['inbox']['user']['email'], self.user.email)
+
+    def test_revoked_tokens_rejected(self):
+        refresh = ClaimsRefreshToken.for_user(self.user)
+        access = self.get_access_token(refresh)
+        self.authenticate(access)
+
+        self.user.revoke_tokens()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(access)
+
+        response = self.client.post(reverse('users_app:token_refresh'), {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # new tokens carry the new version
+        self.authenticate(self.get_access_token())
+
+    @override_settings(USER_CACHE=dict(settings.USER_CACHE, TOKEN_VERSION_TIMEOUT=0))
+    def test_revocation_seen_without_shared_cache(self):
+        access = self.get_access_token()
+        self.authenticate(access)
+
+        # revoked by another process, whose cache this one can't see
+        get_user_model().objects.filter(id=self.user.id).update(token_version=F('token_version') + 1)
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(access)
+
+    def test_reactivated_user_tokens_kept(self):
+        self.user.is_active = False
+        self.user.save()
+        self.user.is_active = True
+        self.user.save()
+        access = self.get_access_token()
+
+        # only deactivating revokes, saving an active user again keeps the tokens
+        user = get_user_model().objects.get(id=self.user.id)
+        user.first_name = 'Renamed'
+        user.save()
+        self.authenticate(access)
+
+        # and saving an inactive user again doesn't revoke a second time
+        user.is_active = False
+        user.save()
+        token_version = get_user_model().objects.get(id=self.user.id).token_version
+        user.save()
+        self.assertEqual(get_user_model().objects.get(id=self.user.id).token_version, token_version)
+
+    def test_deactivated_user_rejected(self):
+        access = self.get_access_token()
+        self.authenticate(access)
+
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.authenticate(access)
+
+    def test_refresh_updates_claims(self):
+        refresh = ClaimsRefreshToken.for_user(self.user)
+        self.user.email = 'stateless_user_renamed@test.com'
+        self.user.save()
+
+        response = self.client.post(reverse('users_app:token_refresh'), {'refresh': str(refresh)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'], verify=False)['email'], self.user.email)
+
+
+class TTLCacheTestCase(TestCase):
+    def test_size_bounded(self):
+        cache = TTLCache(max_size=2, ttl=60)
+        cache.set(1, 'a')
+        cache.set(2, 'b')
+        cache.get(1)
+        cache.set(3, 'c')
+
+        # the least recently used entry makes room
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get(2))
+        self.assertEqual(cache.get(1), 'a')
+        self.assertEqual(cache.get(3), 'c')
+
+    def test_entries_expire(self):
+        cache = TTLCache(max_size=2, ttl=0)
+        cache.set(1, 'a')
+        self.assertIsNone(cache.get(1))
+        self.assertEqual(len(cache), 0)
@@ -0,0 +1,97 @@
+import threading
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.test import TestCase
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from users_app.pruning import TokenPruner, prune_expired_tokens
+
+
+class SynchronousTokenPruner(TokenPruner):
+    def start(self):
+        self.pruned = prune_expired_tokens(self.batch_size, self.time_budget)
+        self.running.release()
+
+
+class PruneTokensTestCase(TestCase):
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email='pruned_user@test.com',
+            password='pass3412'
+        )
+
+        now = aware_utcnow()
+        for i in range(10):
+            expired = i < 7
+            token = OutstandingToken.objects.create(
+                user=user,
+                jti=f'jti-{i}',
+                token=f'token-{i}',
+                expires_at=now + timedelta(days=-1 if expired else 1),
+            )
+            if i % 2:
+                BlacklistedToken.objects.create(token=token)
+
+    def test_prune_expired_tokens(self):
+        # a backlog larger than one batch is cleared in one run
+        self.assertEqual(prune_expired_tokens(batch_size=2, time_budget=60), 7)
+        self.assertEqual(
+            sorted(OutstandingToken.objects.values_list('jti', flat=True)),
+            ['jti-7', 'jti-8', 'jti-9']
+        )
+        self.assertEqual(BlacklistedToken.objects.count(), 2)
+
+    def test_prune_time_budget(self):
+        # an exhausted budget stops the run after its first batch
+        self.assertEqual(prune_expired_tokens(batch_size=2, time_budget=0), 2)
+        self.assertEqual(OutstandingToken.objects.count(), 8)
+
+        self.assertEqual(prune_expired_tokens(batch_size=2), 5)
+        self.assertEqual(OutstandingToken.objects.count(), 3)
+
+    def test_prune_uses_expiry_index(self):
+        plan = OutstandingToken.objects.filter(
+            expires_at__lte=aware_utcnow()).order_by('expires_at').explain()
+        self.assertIn('token_blacklist_outstandingtoken_expires_at_idx', plan)
+
+    def test_pruner_interval(self):
+        pruner = SynchronousTokenPruner(interval=60, batch_size=2, time_budget=60)
+
+        # not due until one interval after startup
+        self.assertFalse(pruner.maybe_start())
+
+        pruner.last_run -= 60
+        self.assertTrue(pruner.maybe_start())
+        self.assertEqual(pruner.pruned, 7)
+        self.assertFalse(pruner.maybe_start())
+
+        # never two runs at once
+        pruner.last_run -= 60
+        pruner.running.acquire()
+        self.assertFalse(pruner.maybe_start())
+
+    def test_pruner_disabled(self):
+        pruner = SynchronousTokenPruner(interval=0, batch_size=500, time_budget=60)
+        pruner.last_run -= 60
+        self.assertFalse(pruner.maybe_start())
+
+    def test_pruner_logs_failed_run(self):
+        pruner = TokenPruner(interval=60, batch_size=2, time_budget=60)
+        pruner.running.acquire()
+
+        with mock.patch('users_app.pruning.prune_expired_tokens',
+                        side_effect=OperationalError('database is locked')):
+            with self.assertLogs('users_app.pruning', 'ERROR') as logs:
+                # on its own thread, as maybe_start runs it, so closing the connection
+                # doesn't touch the test's
+                thread = threading.Thread(target=pruner.run)
+                thread.start()
+                thread.join()
+
+        self.assertIn('database is locked', logs.output[0])
+        # the next run can still start
+        self.assertTrue(pruner.running.acquire(blocking=False))
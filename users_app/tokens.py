@@ -0,0 +1,67 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+TOKEN_VERSION_CLAIM = 'token_version'
+
+
+def get_token_version_key(user_id):
+    return f'users:token_version:{user_id}'
+
+
+def get_token_version(user_id):
+    '''return the user's current token version, or None if the user is gone'''
+    timeout = settings.USER_CACHE['TOKEN_VERSION_TIMEOUT']
+    key = get_token_version_key(user_id)
+    token_version = cache.get(key) if timeout else None
+    if token_version is None:
+        token_version = get_user_model().objects.filter(
+            id=user_id).values_list('token_version', flat=True).first()
+        if token_version is None:
+            return None
+        if timeout:
+            cache.set(key, token_version, timeout=timeout)
+    return token_version
+
+
+def forget_token_version(user_id):
+    cache.delete(get_token_version_key(user_id))
+
+
+def set_user_claims(token, user):
+    '''copy what StatelessJWTAuthentication needs to know about the user into the token'''
+    token['email'] = user.email
+    token['is_active'] = user.is_active
+    token[TOKEN_VERSION_CLAIM] = user.token_version
+
+
+class ClaimsRefreshToken(RefreshToken):
+    '''
+    A refresh token carrying the user's email, is_active and token version,
+    which it copies into each access token made from it.
+    The claims are read again from the database whenever an access token is made,
+    so a refresh picks up changes and fails once the user is deactivated or revoked.
+    '''
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        set_user_claims(token, user)
+        return token
+
+    @property
+    def access_token(self):
+        user = get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: self.payload.get(api_settings.USER_ID_CLAIM)}
+        ).first()
+
+        # tokens issued before versions were added count as version 0
+        if (user is None or not user.is_active
+                or self.payload.get(TOKEN_VERSION_CLAIM, 0) != user.token_version):
+            raise TokenError('Token is invalid or has been revoked')
+
+        set_user_claims(self, user)
+        return super().access_token
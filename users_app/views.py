@@ -16,7 +16,6 @@ from rest_framework.decorators import (
     authentication_classes
 )
 
-from .authentication import SafeJWTAuthentication
 from .models import User, RefreshToken
 from .serializers import UserCreateSerializer, UserDetailSerializer, UserUpdateSerializer
 from .utils import Token